@@ -0,0 +1,43 @@
+from PyQt6.QtWidgets import QLabel
+from PyQt6.QtCore import Qt, QRectF
+from PyQt6.QtGui import QPainter, QColor, QFont
+
+
+class LedIndicator(QLabel):
+    """
+    Indicador ON/OFF pintado a mano: cambiar de estado solo repinta el
+    widget, sin reemplazar hojas de estilo (que obligan a recalcular el
+    estilo y el layout en cada cambio). Mismo aspecto que
+    AppStyles.LABEL_LED_ON_STYLE / LABEL_LED_OFF_STYLE.
+    """
+    ON_COLOR = QColor("#2ecc71")    # Verde para ON
+    OFF_COLOR = QColor("#e74c3c")   # Rojo para OFF
+    RADIUS = 8
+
+    def __init__(self, on: bool = False, parent=None):
+        super().__init__("ON" if on else "OFF", parent)
+        self._on = on
+        font = QFont(self.font())
+        font.setBold(True)
+        self.setFont(font)
+        self.setContentsMargins(8, 3, 8, 3)
+        self.setMinimumWidth(60)
+
+    def is_on(self) -> bool:
+        return self._on
+
+    def set_on(self, on: bool):
+        if on == self._on:
+            return
+        self._on = on
+        self.setText("ON" if on else "OFF")   # mismo ancho de texto: sin relayout apreciable
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(self.ON_COLOR if self._on else self.OFF_COLOR)
+        painter.drawRoundedRect(QRectF(self.rect()), self.RADIUS, self.RADIUS)
+        painter.setPen(QColor("#ffffff"))
+        painter.setFont(self.font())
+        painter.drawText(self.contentsRect(), int(self.alignment()), self.text())
@@ -0,0 +1,133 @@
+"""
+Parseo por lotes del flujo RX.
+
+En vez de separar cada lectura en líneas `str` y pasarlas una a una por
+`ProgramEngine.process_uart_line` (split + partition por token), cada
+lectura completa se recorre con una sola expresión compilada sobre bytes y
+los eventos conocidos salen como registros compactos
+`(dispositivo, valor, t_arrival_ns)`. El motor los recibe juntos en un
+`EventBatch` (`ProgramEngine.process_batch`).
+
+Las líneas que no son solo eventos (respuestas OK:/ERROR:, ecos como
+DISP:1, el arranque del ESP) siguen llegando como texto en `lines`, para
+el TxScheduler y el conteo de tokens desconocidos.
+"""
+import re
+from collections import namedtuple
+
+from main.core.binary_protocol import StreamDecoder, PROTO_BIN_ACK
+from main.core.protocol_schema import EVENT_DEVICES_BYTES, EVENT_PREFIX_PATTERN
+from main.enums.program_enums import ParseMode
+
+# Prefijo ASCII -> código de dispositivo (del esquema del protocolo)
+TOKEN_DEVICES = EVENT_DEVICES_BYTES
+
+_PREFIXES = EVENT_PREFIX_PATTERN
+# Token de evento separado por espacios o fin de línea: P01:1
+_EVENT_RE = re.compile(rb"(?<!\S)(" + _PREFIXES + rb"):(\d+)(?!\S)")
+# Líneas no vacías que no están formadas solo por tokens de evento
+_OTHER_LINE_RE = re.compile(
+    rb"^(?![ \t]*(?:(?:" + _PREFIXES + rb"):\d+[ \t]*)+\r?$)[ \t]*(\S[^\n]*?)[ \t\r]*$",
+    re.MULTILINE,
+)
+
+# Eventos [(dispositivo, valor, t_arrival_ns)] y demás líneas de una lectura
+EventBatch = namedtuple('EventBatch', 'events lines')
+
+
+class BatchScanner:
+    """
+    Escanea de una vez todo lo que ya terminó en '\\n' y guarda la línea
+    incompleta para la siguiente lectura (como LineFramer, con el mismo
+    límite para basura sin fin de línea).
+    """
+
+    def __init__(self, max_pending: int = 256):
+        self._pending = b""
+        self.max_pending = max_pending
+        self.events = 0
+        self.lines = 0
+        self.dropped_bytes = 0
+
+    def feed(self, data, t_arrival_ns: int) -> EventBatch:
+        if not isinstance(data, bytes):
+            data = bytes(data)
+        end = data.rfind(b"\n")
+        if end < 0:
+            self._pending += data
+            if len(self._pending) > self.max_pending:
+                self.dropped_bytes += len(self._pending)
+                self._pending = b""
+            return EventBatch([], [])
+
+        region = self._pending + data[:end + 1] if self._pending else data[:end + 1]
+        self._pending = data[end + 1:]
+
+        devices = TOKEN_DEVICES
+        events = [(devices[prefix], int(value), t_arrival_ns)
+                  for prefix, value in _EVENT_RE.findall(region)]
+        if len(events) == region.count(b"\n") and b" " not in region and b"\t" not in region:
+            lines = []   # caso común: solo un evento por línea, no hace falta el segundo pase
+        else:
+            lines = [str(line, 'utf-8', 'ignore') for line in _OTHER_LINE_RE.findall(region)]
+        self.events += len(events)
+        self.lines += len(lines)
+        return EventBatch(events, lines)
+
+    def reset(self) -> None:
+        self._pending = b""
+
+    def get_stats(self) -> dict:
+        return {
+            "events": self.events,
+            "lines": self.lines,
+            "dropped_bytes": self.dropped_bytes,
+        }
+
+
+class BatchStreamDecoder(StreamDecoder):
+    """
+    StreamDecoder que entrega, por cada lectura, un solo
+    `(EventBatch, t_arrival_ns)` en lugar de un item por línea o trama.
+    La negociación PROTO:BIN y la vuelta a ASCII no cambian.
+    """
+
+    def __init__(self, negotiation_timeout_ms: int = 500):
+        super().__init__(negotiation_timeout_ms)
+        self.scanner = BatchScanner()
+
+    def reset(self) -> None:
+        super().reset()
+        self.scanner.reset()
+
+    def _feed_ascii(self, data, t_arrival_ns: int, out: list) -> None:
+        batch = self.scanner.feed(data, t_arrival_ns)
+        if self._negotiation_deadline_ns and PROTO_BIN_ACK.decode() in batch.lines:
+            # Es la última línea de lo recibido (ver _feed_negotiating)
+            batch.lines.remove(PROTO_BIN_ACK.decode())
+            self._switch_to_binary()
+        if batch.events or batch.lines:
+            out.append((batch, t_arrival_ns))
+
+    def _feed_binary(self, data, t_arrival_ns: int, out: list) -> None:
+        records = self.binary.feed(data)
+        if records:
+            events = [(r.device, r.value, t_arrival_ns) for r in records]
+            out.append((EventBatch(events, []), t_arrival_ns))
+
+    def _switch_to_binary(self) -> None:
+        super()._switch_to_binary()
+        self.scanner.reset()
+
+    def get_stats(self) -> dict:
+        return {
+            **super().get_stats(),
+            **{f"batch_{k}": v for k, v in self.scanner.get_stats().items()},
+        }
+
+
+def create_decoder(parse_mode: ParseMode = ParseMode.LINE) -> StreamDecoder:
+    """Decodificador RX según el modo de parseo."""
+    if parse_mode == ParseMode.BATCH:
+        return BatchStreamDecoder()
+    return StreamDecoder()
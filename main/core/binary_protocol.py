@@ -0,0 +1,254 @@
+"""
+Protocolo binario opcional para los eventos del dispositivo.
+
+Trama (little-endian, 13 bytes):
+
+    SYNC(0xA5) | tipo(u8) | dispositivo(u8) | valor(u16) | t_disp_us(u32) | seq(u16) | crc16(u16)
+
+El CRC es CRC-16/CCITT-FALSE (binascii.crc_hqx, semilla 0xFFFF) sobre los
+bytes tipo..seq. Al conectar, el host envía la línea ASCII `PROTO:BIN`; si el
+firmware la soporta responde `PROTO:BIN:OK` y desde ahí transmite tramas
+binarias. Si no responde a tiempo, o si el flujo deja de tener tramas válidas
+(p. ej. el equipo se reinició), se sigue/vuelve a ASCII automáticamente.
+Los comandos host → dispositivo siguen siendo ASCII.
+"""
+import time
+import struct
+import binascii
+from collections import namedtuple
+from typing import List, Tuple, Any
+
+from main.core.line_framer import LineFramer
+
+SYNC = 0xA5
+_HEADER = struct.Struct('<BBBHIH')   # sync, tipo, dispositivo, valor, t_disp_us, seq
+_CRC = struct.Struct('<H')
+FRAME_SIZE = _HEADER.size + _CRC.size
+
+# Tipos de mensaje
+MSG_EVENT = 0x01
+
+# Identificadores de dispositivo (equivalentes a los tokens ASCII)
+DEV_L01 = 0x01   # L01: estado LED 01
+DEV_L02 = 0x02   # L02: estado LED 02
+DEV_P01 = 0x03   # P01: palanca 01
+DEV_P02 = 0x04   # P02: palanca 02
+DEV_IR1 = 0x05   # IR1: sensor de recompensa
+DEV_R01 = 0x06   # R01: refuerzo decidido por el firmware (palanca 01)
+DEV_R02 = 0x07   # R02: refuerzo decidido por el firmware (palanca 02)
+
+PROTO_BIN_REQUEST = b"PROTO:BIN\n"
+PROTO_BIN_ACK = b"PROTO:BIN:OK"
+
+BinaryRecord = namedtuple('BinaryRecord', 'msg_type device value device_ts_us seq')
+
+
+def encode_frame(msg_type: int, device: int, value: int, device_ts_us: int, seq: int) -> bytes:
+    """Codifica una trama (lo usa el firmware simulado y las pruebas)."""
+    head = _HEADER.pack(SYNC, msg_type, device, value & 0xFFFF,
+                        device_ts_us & 0xFFFFFFFF, seq & 0xFFFF)
+    return head + _CRC.pack(binascii.crc_hqx(head[1:], 0xFFFF))
+
+
+class BinaryFrameDecoder:
+    """
+    Decodificador incremental de tramas binarias con resincronización por
+    SYNC + CRC y detección de pérdidas por número de secuencia.
+
+    Una trama cuya distancia hacia adelante `(seq - esperada) & 0xFFFF`
+    supera 0x8000 quedó atrás de la esperada (retransmitida o fuera de
+    orden): se descarta y se cuenta en `duplicate_frames`, no en
+    `lost_frames`, para que una presión no llegue dos veces al motor.
+    """
+
+    JUNK_LIMIT = 256
+
+    def __init__(self):
+        self._buf = bytearray()
+        self._junk = bytearray()       # bytes descartados desde la última trama válida
+        self._expected_seq = None
+        self.frames = 0
+        self.crc_errors = 0
+        self.lost_frames = 0
+        self.duplicate_frames = 0
+        self.skipped_bytes = 0
+        self.consecutive_skipped = 0   # bytes descartados desde la última trama válida
+
+    def feed(self, data) -> List[BinaryRecord]:
+        buf = self._buf
+        buf += data
+        records = []
+        pos = 0
+        end = len(buf)
+
+        while end - pos >= FRAME_SIZE:
+            if buf[pos] != SYNC:
+                nxt = buf.find(SYNC, pos + 1)
+                skipped = (nxt if nxt >= 0 else end) - pos
+                self._skip(buf[pos:pos + skipped])
+                if nxt < 0:
+                    pos = end
+                    break
+                pos = nxt
+                continue
+
+            _, msg_type, device, value, ts_us, seq = _HEADER.unpack_from(buf, pos)
+            (crc,) = _CRC.unpack_from(buf, pos + _HEADER.size)
+            if binascii.crc_hqx(buf[pos + 1:pos + _HEADER.size], 0xFFFF) != crc:
+                self.crc_errors += 1
+                self._skip(buf[pos:pos + 1])
+                pos += 1
+                continue
+
+            self.consecutive_skipped = 0
+            self._junk.clear()
+            pos += FRAME_SIZE
+
+            if self._expected_seq is not None:
+                gap = (seq - self._expected_seq) & 0xFFFF
+                if gap > 0x8000:
+                    self.duplicate_frames += 1
+                    continue
+                self.lost_frames += gap
+            self._expected_seq = (seq + 1) & 0xFFFF
+
+            records.append(BinaryRecord(msg_type, device, value, ts_us, seq))
+            self.frames += 1
+
+        del buf[:pos]
+        return records
+
+    def _skip(self, data) -> None:
+        self.skipped_bytes += len(data)
+        self.consecutive_skipped += len(data)
+        self._junk += data
+        if len(self._junk) > self.JUNK_LIMIT:
+            del self._junk[:-self.JUNK_LIMIT]
+
+    def take_buffer(self) -> bytes:
+        """Devuelve y vacía los bytes descartados recientes más los aún no decodificados."""
+        data = bytes(self._junk) + bytes(self._buf)
+        self._junk.clear()
+        self._buf.clear()
+        return data
+
+    def reset(self) -> None:
+        self._buf.clear()
+        self._junk.clear()
+        self._expected_seq = None
+        self.consecutive_skipped = 0
+
+    def get_stats(self) -> dict:
+        return {
+            "frames": self.frames,
+            "crc_errors": self.crc_errors,
+            "lost_frames": self.lost_frames,
+            "duplicate_frames": self.duplicate_frames,
+            "skipped_bytes": self.skipped_bytes,
+        }
+
+
+class StreamDecoder:
+    """
+    Decodificador del flujo RX: líneas ASCII por defecto y tramas binarias
+    después de negociar `PROTO:BIN`. `feed()` devuelve una lista de
+    (payload, t_arrival_ns) donde payload es `str` (línea ASCII) o
+    `BinaryRecord`.
+    """
+    # Bytes consecutivos sin una trama válida antes de volver a ASCII
+    FALLBACK_BYTES = 64
+
+    def __init__(self, negotiation_timeout_ms: int = 500):
+        self.framer = LineFramer()
+        self.binary = BinaryFrameDecoder()
+        self.is_binary = False
+        self.negotiation_timeout_ms = negotiation_timeout_ms
+        self._negotiation_deadline_ns = 0
+        self.fallbacks = 0
+
+    def start_negotiation(self) -> bytes:
+        """Empieza a esperar `PROTO:BIN:OK`; devuelve la petición a enviar."""
+        self._negotiation_deadline_ns = time.perf_counter_ns() + self.negotiation_timeout_ms * 1_000_000
+        return PROTO_BIN_REQUEST
+
+    def is_negotiating(self) -> bool:
+        return (self._negotiation_deadline_ns != 0
+                and time.perf_counter_ns() < self._negotiation_deadline_ns)
+
+    def reset(self) -> None:
+        """Vuelve a ASCII (p. ej. al reabrir el puerto)."""
+        self.framer.reset()
+        self.binary.reset()
+        self.is_binary = False
+        self._negotiation_deadline_ns = 0
+
+    def feed(self, data, t_arrival_ns: int) -> List[Tuple[Any, int]]:
+        out: List[Tuple[Any, int]] = []
+
+        if not self.is_binary and self._negotiation_deadline_ns:
+            if not self.is_negotiating():
+                self._negotiation_deadline_ns = 0   # sin respuesta: se queda en ASCII
+            else:
+                data = self._feed_negotiating(data, t_arrival_ns, out)
+                if not self.is_binary:
+                    return out
+
+        if self.is_binary:
+            self._feed_binary(data, t_arrival_ns, out)
+            if self.binary.consecutive_skipped > self.FALLBACK_BYTES:
+                self._fallback_to_ascii(t_arrival_ns, out)
+        else:
+            self._feed_ascii(data, t_arrival_ns, out)
+        return out
+
+    def _feed_negotiating(self, data, t_arrival_ns: int, out: list) -> bytes:
+        """
+        Mientras se espera el ACK se entrega el ASCII línea por línea, para
+        cortar la lectura justo al final del ACK aunque haya llegado partido
+        entre lecturas. Devuelve los bytes que siguen al ACK (ya binarios).
+        """
+        data = bytes(data)
+        start = 0
+        while start < len(data):
+            nl = data.find(b'\n', start)
+            stop = len(data) if nl < 0 else nl + 1
+            self._feed_ascii(data[start:stop], t_arrival_ns, out)
+            start = stop
+            if self.is_binary:
+                return data[start:]
+        return b""
+
+    def _feed_binary(self, data, t_arrival_ns: int, out: list) -> None:
+        for record in self.binary.feed(data):
+            out.append((record, t_arrival_ns))
+
+    def _feed_ascii(self, data, t_arrival_ns: int, out: list) -> None:
+        for frame in self.framer.feed(data):
+            line = str(frame, 'utf-8', 'ignore').strip()
+            if not line:
+                continue
+            if self._negotiation_deadline_ns and line == PROTO_BIN_ACK.decode():
+                # Es la última línea de lo recibido (ver _feed_negotiating)
+                self._switch_to_binary()
+                continue
+            out.append((line, t_arrival_ns))
+
+    def _switch_to_binary(self) -> None:
+        self.is_binary = True
+        self._negotiation_deadline_ns = 0
+        self.binary.reset()
+        self.framer.reset()
+
+    def _fallback_to_ascii(self, t_arrival_ns: int, out: list) -> None:
+        self.is_binary = False
+        self.fallbacks += 1
+        self._feed_ascii(self.binary.take_buffer(), t_arrival_ns, out)
+        self.binary.reset()
+
+    def get_stats(self) -> dict:
+        return {
+            "binary": self.is_binary,
+            "fallbacks": self.fallbacks,
+            **{f"ascii_{k}": v for k, v in self.framer.get_stats().items()},
+            **{f"bin_{k}": v for k, v in self.binary.get_stats().items()},
+        }
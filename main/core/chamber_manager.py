@@ -0,0 +1,109 @@
+import os
+from typing import Optional, Dict, List
+
+from PyQt6.QtCore import QObject, QTimer, QThread, Qt, pyqtSignal
+
+from main.core.serial_manager import SerialManager
+from main.core.serial_io_thread import create_io_thread
+from main.core.event_logger import EventLogger
+from main.core.session_journal import JOURNAL_DIR
+from main.core.port_discovery import PortDiscovery
+from main.core.qt_interval_driver import QtIntervalDriver
+from main.enums.program_enums import ParseMode
+
+
+class Chamber:
+    """
+    Recursos propios de una caja de Skinner: puerto, registro de eventos y
+    la vista/motor que se le asocie (la crea la capa de vistas).
+    """
+    def __init__(self, chamber_id: int, serial_manager: SerialManager, event_logger: EventLogger):
+        self.chamber_id = chamber_id
+        self.serial_manager = serial_manager
+        self.event_logger = event_logger
+        self.view = None   # PanelControlView de la cámara
+
+    @property
+    def name(self) -> str:
+        return f"Caja {self.chamber_id:02d}"
+
+    def __repr__(self):
+        return f"Chamber({self.chamber_id}, port={self.serial_manager.port_name!r})"
+
+
+class ChamberManager(QObject):
+    """
+    Ejecuta varias cajas en un solo proceso.
+
+    Cada cámara tiene su SerialManager, EventLogger y motor de programa;
+    lo compartido es lo caro de multiplicar:
+      - un grupo pequeño de hilos de E/S (`io_threads`), repartidos en
+        round-robin entre los puertos;
+      - el servicio de descubrimiento de puertos;
+      - un único tick de reloj (`tick`) para el tiempo de sesión, en vez de
+        un QTimer por cámara;
+      - un único planificador de plazos (`interval_scheduler`) para los
+        programas FI/VI de todas las cajas.
+
+    El RX se parsea por líneas (`ParseMode.LINE`); `ParseMode.BATCH` es
+    opcional y solo rinde más con ráfagas grandes por lectura.
+    """
+    tick = pyqtSignal()
+    chamber_added = pyqtSignal(int)   # chamber_id
+
+    def __init__(self, io_threads: int = 2, tick_ms: int = 1000,
+                 discovery: Optional[PortDiscovery] = None,
+                 parse_mode: ParseMode = ParseMode.LINE,
+                 journal_dir: Optional[str] = JOURNAL_DIR):
+        super().__init__()
+        self.discovery = discovery or PortDiscovery.instance()
+        self.parse_mode = parse_mode
+        self.journal_dir = journal_dir   # un subdirectorio por caja; None = sin diario
+        self.chambers: Dict[int, Chamber] = {}
+        self._io_threads: List[QThread] = [
+            create_io_thread(f"serial-io-{i}") for i in range(max(1, io_threads))
+        ]
+
+        self._tick_timer = QTimer(self)
+        self._tick_timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._tick_timer.timeout.connect(self.tick)
+        self._tick_timer.start(tick_ms)
+
+        self._interval_driver = QtIntervalDriver(parent=self)
+        self.interval_scheduler = self._interval_driver.scheduler
+
+    def add_chamber(self, chamber_id: Optional[int] = None) -> Chamber:
+        """Crea una cámara nueva con sus propios puerto y registro."""
+        if chamber_id is None:
+            chamber_id = max(self.chambers, default=0) + 1
+        if chamber_id in self.chambers:
+            raise ValueError(f"La cámara {chamber_id} ya existe")
+
+        io_thread = self._io_threads[len(self.chambers) % len(self._io_threads)]
+        chamber = Chamber(
+            chamber_id,
+            SerialManager(io_thread=io_thread, discovery=self.discovery, parse_mode=self.parse_mode),
+            EventLogger(journal_dir=self.journal_dir and os.path.join(self.journal_dir, f"caja_{chamber_id:02d}")),
+        )
+        self.chambers[chamber_id] = chamber
+        self.chamber_added.emit(chamber_id)
+        return chamber
+
+    def get_chamber(self, chamber_id: int) -> Optional[Chamber]:
+        return self.chambers.get(chamber_id)
+
+    def ports_in_use(self) -> List[str]:
+        return [c.serial_manager.port_name for c in self.chambers.values()
+                if c.serial_manager.port_name]
+
+    def shutdown(self) -> None:
+        """Cierra todos los puertos y detiene los hilos compartidos."""
+        self._tick_timer.stop()
+        self.interval_scheduler.clear()
+        for chamber in self.chambers.values():
+            chamber.serial_manager.shutdown()
+            chamber.event_logger.close()
+        for thread in self._io_threads:
+            thread.quit()
+            thread.wait(2000)
+        self._io_threads.clear()
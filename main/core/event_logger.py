@@ -1,14 +1,23 @@
 
 
+import os
+import time
 from datetime import datetime
 from enum import Enum, auto
-from typing import Optional, Dict, Union, Any
+from typing import Optional, Dict, List, Tuple, Union, Any
+import numpy as np
 import pandas as pd
 import json
-import warnings
 
 from PyQt6.QtCore import QObject, pyqtSignal
 
+from main.utils.logger import Logger
+from main.core.event_segments import SegmentStore
+from main.core.session_journal import (
+    SessionJournal, interrupted_journals, read_journal, mark_recovered,
+    TAG_HEADER, TAG_EVENT, TAG_METADATA, TAG_SESSION,
+)
+
 class EventType(Enum):
     LED_CHANGE = auto()
     LEVER_PRESS = auto()
@@ -29,12 +38,73 @@ class DeviceID(Enum):
     SYSTEM = "Sistema"
 
 
+# Códigos enteros de las columnas categóricas (posición en el enum)
+_EVENT_TYPES = tuple(EventType)
+_DEVICES = tuple(DeviceID)
+_EVENT_CODES = {event_type: code for code, event_type in enumerate(_EVENT_TYPES)}
+_DEVICE_CODES = {device: code for code, device in enumerate(_DEVICES)}
+_EVENT_NAMES = [event_type.name for event_type in _EVENT_TYPES]
+_DEVICE_NAMES = [device.name for device in _DEVICES]
+
+# Un evento = un registro de 27 bytes. `new_value` se guarda como entero si
+# lo es (también "12" como texto); cualquier otro valor (floats, textos) va
+# una sola vez a la tabla de textos como str(value) y `value` es su índice.
+EVENT_RECORD = np.dtype([
+    ("timestamp", np.int64),     # ns desde la época (datetime64[ns])
+    ("elapsed", np.float64),     # s desde el inicio de la sesión, a ms
+    ("value", np.int32),
+    ("session", np.int32),
+    ("event", np.int8),          # posición en EventType
+    ("device", np.int8),         # posición en DeviceID
+    ("kind", np.int8),           # _INT o _TEXT
+])
+_INT, _TEXT = range(2)
+_INT32_MAX = 2 ** 31 - 1
+_LED_CODES = [code for code, device in enumerate(_DEVICES) if device.name.startswith("LED_")]
+
+
 class EventLogger(QObject):
-    
-    session_ended = pyqtSignal(int)  # Señal que emite el ID de sesión finalizada
+    """
+    Registro de eventos de las sesiones.
+
+    Cada evento es un registro `EVENT_RECORD` (27 bytes, sin objetos de
+    Python) en un arreglo preasignado que crece al doble al llenarse:
+    agregar es O(1) amortizado y no toca pandas. Los textos de `new_value`
+    que no son números se guardan una sola vez en una tabla de textos, y los
+    metadatos (solo inicio/fin de sesión y eventos de sistema) en una tabla
+    aparte por número de evento. El DataFrame con las columnas de `_dtypes`
+    se arma solo al consultar (`get_events`, `get_last_event`,
+    `save_to_csv`, datos de fin de sesión), con los mismos valores de texto
+    que antes.
+
+    En memoria se conservan a lo sumo `max_entries` eventos: al pasarse,
+    la mitad más antigua se escribe a un segmento en disco (ver
+    event_segments, en `segment_dir` o en un directorio temporal) y su
+    espacio se recupera al crecer el buffer. Las consultas leen segmentos y
+    memoria, así que no se pierde ningún evento; los metadatos por evento
+    quedan siempre en memoria (son pocos).
+
+    Índices (se mantienen al registrar, en memoria):
+      - por sesión, su rango de números de evento (las sesiones son
+        consecutivas) y si su elapsed_sec viene ordenado;
+      - por dispositivo, los números de sus eventos (8 B por evento).
+    Así una sesión es una rebanada contigua (`session_records`, sin copia
+    si cae en un solo tramo), `get_last_event` es O(1) y las ventanas de
+    tiempo (`time_window`) se resuelven con búsqueda binaria en elapsed_sec.
+
+    Con `journal_dir` cada sesión se escribe además a un diario en disco
+    (ver session_journal) y al crear el registro se recuperan las sesiones
+    que quedaron interrumpidas en ese directorio: entran como sesiones
+    nuevas, cerradas con un SESSION_END `recovered`, y sus números quedan
+    en `recovered_sessions`. Llamar `close()` al salir.
+    """
+    INITIAL_CAPACITY = 4096
+
+    session_ended = pyqtSignal(object)  # Datos de la sesión finalizada (ver _process_session_data)
      
      
-    def __init__(self, max_entries: int = 100000):
+    def __init__(self, max_entries: int = 100000, journal_dir: Optional[str] = None,
+                 flush_interval_ms: int = 100, segment_dir: Optional[str] = None):
         super().__init__()  # Inicializa QObject
         self._dtypes = {
             'timestamp': 'datetime64[ns]',
@@ -46,11 +116,35 @@ class EventLogger(QObject):
             'metadata': 'object'
         }
 
-        self._log = pd.DataFrame({col: pd.Series(dtype=typ) for col, typ in self._dtypes.items()})
+        self._max_entries = max_entries
+        self._segments = SegmentStore(segment_dir)
+        self._reset_records()
         self._current_session = 0
         self._session_start = None
+        self._session_start_ns = 0     # perf_counter_ns al iniciar la sesión
+        self._session_start_wall = 0   # la misma hora de inicio en ns (datetime64)
         self._session_metadata: Dict[int, Dict[str, Any]] = {}
-        self._max_entries = max_entries
+
+        self._journal: Optional[SessionJournal] = None
+        self.recovered_sessions: List[int] = []
+        if journal_dir:
+            self._recover_journals(journal_dir)
+            self._journal = SessionJournal(journal_dir, flush_interval_ms)
+
+    def _reset_records(self) -> None:
+        self._records = np.zeros(self.INITIAL_CAPACITY, dtype=EVENT_RECORD)
+        self._texts: List[str] = []               # tabla de textos de new_value
+        self._text_codes: Dict[str, int] = {}
+        self._event_metadata: Dict[int, str] = {}  # número de evento -> JSON
+        self._base = 0      # número de evento de la fila 0 del buffer (cuenta los compactados)
+        self._start = 0     # primera fila en memoria (las anteriores están en segmentos)
+        self._count = 0     # filas escritas
+        self._segments.clear()
+
+        # sesión -> [primer evento, fin, máximo elapsed, elapsed ordenado]
+        self._session_rows: Dict[int, list] = {}
+        self._device_positions = [np.empty(1024, dtype=np.int64) for _ in _DEVICES]
+        self._device_counts = [0] * len(_DEVICES)
 
     # ----------------------------
     # Sesiones
@@ -62,7 +156,12 @@ class EventLogger(QObject):
 
         self._current_session += 1
         self._session_start = datetime.now()
+        self._session_start_ns = time.perf_counter_ns()
+        self._session_start_wall = pd.Timestamp(self._session_start).value
         self._session_metadata[self._current_session] = metadata or {}
+        if self._journal is not None:
+            self._journal.begin(self._current_session, self._session_start_wall,
+                                self._session_metadata[self._current_session])
 
         self._log_event(
             event_type=EventType.SESSION_START,
@@ -77,7 +176,7 @@ class EventLogger(QObject):
         if not self.is_session_active():
             return
         session_id = self._current_session
-        duration = (datetime.now() - self._session_start).total_seconds()
+        duration = (time.perf_counter_ns() - self._session_start_ns) / 1e9
 
         self._log_event(
             event_type=EventType.SESSION_END,
@@ -86,6 +185,8 @@ class EventLogger(QObject):
             metadata={"duration_sec": duration},
             allow_outside_session=True
         )
+        if self._journal is not None:
+            self._journal.end(duration)
         
         # Obtener y procesar datos de la sesión
         session_data = self._process_session_data(session_id, duration)
@@ -96,36 +197,32 @@ class EventLogger(QObject):
         
     def _process_session_data(self, session_id: int, duration: float) -> dict:
         """Procesa los datos de la sesión para el reporte"""
-        events = self.get_events(sessions=[session_id])
+        rows = self._session_rows.get(session_id, [0, 0])
+        records = self.session_records(session_id)
+        events = self._frame(records, np.arange(rows[0], rows[0] + len(records)))
         metadata = self.get_session_metadata(session_id)
-        
-        # Filtrar eventos relevantes
-        lever1 = events[
-            (events["device_id"] == DeviceID.LEVER_01.name) & 
-            (events["event_type"] == EventType.LEVER_PRESS.name)
-        ]
-        lever2 = events[
-            (events["device_id"] == DeviceID.LEVER_02.name) & 
-            (events["event_type"] == EventType.LEVER_PRESS.name)
-        ]
-        rewards = events[
-            events["event_type"].isin([EventType.FOOD_DISPENSE.name, EventType.FOOD_RECOMPENSE.name])
-        ]
-        led_changes = events[
-            events["device_id"].str.startswith("LED_") & 
-            (events["event_type"] == EventType.LED_CHANGE.name)
-        ]
-        
+
+        # Filtrar eventos relevantes sobre los códigos de los registros
+        event, device = records["event"], records["device"]
+        presses = event == _EVENT_CODES[EventType.LEVER_PRESS]
+        lever1 = np.flatnonzero(presses & (device == _DEVICE_CODES[DeviceID.LEVER_01]))
+        lever2 = np.flatnonzero(presses & (device == _DEVICE_CODES[DeviceID.LEVER_02]))
+        rewards = np.flatnonzero(np.isin(event, [_EVENT_CODES[EventType.FOOD_DISPENSE],
+                                                 _EVENT_CODES[EventType.FOOD_RECOMPENSE]]))
+        led_changes = np.flatnonzero(np.isin(device, _LED_CODES) & (event == _EVENT_CODES[EventType.LED_CHANGE]))
+        values = events["new_value"].to_numpy()
+        elapsed = records["elapsed"]
+
         return {
             "session_id": session_id,
             "duration": duration,
             "metadata": metadata,
-            "lever1_presses": lever1["new_value"].tolist(),
-            "lever1_times": lever1["elapsed_sec"].astype(float).tolist(),
-            "lever2_presses": lever2["new_value"].tolist(),
-            "lever2_times": lever2["elapsed_sec"].astype(float).tolist(),
-            "reward_times": rewards["elapsed_sec"].astype(float).tolist(),
-            "led_changes": led_changes[["device_id", "elapsed_sec", "new_value"]].to_dict('records'),
+            "lever1_presses": values[lever1].tolist(),
+            "lever1_times": elapsed[lever1].tolist(),
+            "lever2_presses": values[lever2].tolist(),
+            "lever2_times": elapsed[lever2].tolist(),
+            "reward_times": elapsed[rewards].tolist(),
+            "led_changes": events.iloc[led_changes][["device_id", "elapsed_sec", "new_value"]].to_dict('records'),
             "raw_events": events  # Datos crudos por si acaso
         }
         
@@ -138,6 +235,19 @@ class EventLogger(QObject):
     def get_session_metadata(self, session_id: int) -> Dict[str, Any]:
         return self._session_metadata.get(session_id, {})
 
+    def set_session_metadata(self, key: str, value: Any, session_id: Optional[int] = None) -> None:
+        """Agrega un dato a los metadatos de la sesión (la actual por defecto), p. ej. antes de cerrarla."""
+        session_id = self._current_session if session_id is None else session_id
+        self._session_metadata.setdefault(session_id, {})[key] = value
+        if self._journal is not None and session_id == self._current_session and self.is_session_active():
+            self._journal.session_metadata(key, value)
+
+    def close(self) -> None:
+        """Escribe a disco lo pendiente del diario, detiene su hilo y borra los segmentos."""
+        if self._journal is not None:
+            self._journal.close()
+        self._segments.close()
+
     # ----------------------------
     # Registro de eventos
     # ----------------------------
@@ -146,10 +256,15 @@ class EventLogger(QObject):
         event_type: EventType,
         device: DeviceID,
         value: Union[str, int, float],
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        t_arrival_ns: Optional[int] = None
     ) -> None:
-        """Registra un evento, solo si hay sesión activa."""
-        self._log_event(event_type, device, value, metadata)
+        """
+        Registra un evento, solo si hay sesión activa.
+        `t_arrival_ns` (time.perf_counter_ns) es el instante en que llegaron
+        los bytes del evento; si no se indica se usa el instante actual.
+        """
+        self._log_event(event_type, device, value, metadata, t_arrival_ns=t_arrival_ns)
 
     def _log_event(
         self,
@@ -157,73 +272,319 @@ class EventLogger(QObject):
         device: DeviceID,
         value: Union[str, int, float],
         metadata: Optional[Dict[str, Any]] = None,
-        allow_outside_session: bool = False
+        allow_outside_session: bool = False,
+        t_arrival_ns: Optional[int] = None
     ) -> None:
         """Método interno para registrar eventos."""
         if not self.is_session_active() and not allow_outside_session:
             raise RuntimeError(f"No hay sesión activa para registrar evento: {event_type.name}")
 
-        now = datetime.now()
-        elapsed = (now - self._session_start).total_seconds() if self.is_session_active() else 0.0
-
-        new_entry = {
-            'timestamp': pd.to_datetime(now),
-            'event_type': event_type.name,
-            'device_id': device.name,
-            'new_value': str(value),
-            'session_id': self._current_session,
-            'elapsed_sec': round(float(elapsed), 3),
-            'metadata': json.dumps(metadata) if metadata else None
-        }
-
-        with warnings.catch_warnings():
-            warnings.simplefilter("ignore", category=FutureWarning)
-
-            new_df = pd.DataFrame([new_entry]).astype({
-                'timestamp': 'datetime64[ns]',
-                'event_type': 'category',
-                'device_id': 'category'
-            })
-
-            self._log = pd.concat([self._log, new_df], ignore_index=True).astype(self._dtypes)
-
-        if len(self._log) > self._max_entries:
-            self._log = self._log.iloc[-self._max_entries:]
+        if self.is_session_active():
+            # Reloj monotónico: el tiempo del evento es el de llegada, no el de proceso
+            t_ns = t_arrival_ns if t_arrival_ns is not None else time.perf_counter_ns()
+            elapsed_ns = max(0, t_ns - self._session_start_ns)
+            timestamp = self._session_start_wall + elapsed_ns
+            elapsed = elapsed_ns / 1e9
+        else:
+            timestamp = pd.Timestamp(datetime.now()).value
+            elapsed = 0.0
+
+        number, kind = self._encode_value(value)
+        metadata = json.dumps(metadata) if metadata else None
+        i = self._append(timestamp, round(elapsed, 3), number, kind,
+                         _EVENT_CODES[event_type], _DEVICE_CODES[device], metadata)
+        if self._journal is not None:
+            self._journal.event(self._records[i].tobytes(),
+                                self._texts[number] if kind == _TEXT else None, metadata)
+
+    def _append(self, timestamp: int, elapsed: float, number: int, kind: int,
+                event: int, device: int, metadata: Optional[str] = None) -> int:
+        """Escribe un registro de la sesión actual; devuelve su fila en el buffer."""
+        if self._count == len(self._records):
+            self._grow()
+        i = self._count
+        self._records[i] = (timestamp, elapsed, number, self._current_session, event, device, kind)
+        position = self._base + i
+        if metadata:
+            self._event_metadata[position] = metadata
+        self._count = i + 1
+
+        rows = self._session_rows.get(self._current_session)
+        if rows is None:
+            self._session_rows[self._current_session] = [position, position + 1, elapsed, True]
+        else:
+            rows[1] = position + 1
+            if elapsed < rows[2]:
+                rows[3] = False     # llegó fuera de orden: esa sesión filtra el tiempo fila a fila
+            else:
+                rows[2] = elapsed
+        positions = self._device_positions[device]
+        n = self._device_counts[device]
+        if n == len(positions):
+            positions = self._device_positions[device] = np.concatenate([positions, np.empty_like(positions)])
+        positions[n] = position
+        self._device_counts[device] = n + 1
+
+        if self._count - self._start > self._max_entries:
+            self._spill()
+        return i
+
+    def _spill(self) -> None:
+        """Ventana llena: la mitad más antigua pasa a un segmento en disco."""
+        rows = max(1, self._max_entries // 2)
+        self._segments.spill(self._base + self._start, self._records[self._start:self._start + rows])
+        self._start += rows
+
+    def _encode_value(self, value) -> Tuple[int, int]:
+        """Valor del evento -> (número, kind); ver EVENT_RECORD."""
+        if type(value) is int and -_INT32_MAX <= value <= _INT32_MAX:
+            return value, _INT
+        text = str(value)
+        # isascii: isdigit() también acepta "²" o "١", que int() rechaza o convierte
+        if text.isascii() and text.isdigit() and len(text) < 10 and (text[0] != "0" or text == "0"):
+            return int(text), _INT
+        code = self._text_codes.get(text)
+        if code is None:
+            code = self._text_codes[text] = len(self._texts)
+            self._texts.append(text)
+        return code, _TEXT
+
+    def _decode_values(self, values: np.ndarray, kinds: np.ndarray) -> np.ndarray:
+        """Columna `new_value` como la dejaba str(value): objetos str."""
+        out = np.empty(len(values), dtype=object)
+        ints = kinds == _INT
+        out[ints] = values[ints].astype(str).tolist()
+        texts = ~ints
+        if texts.any():
+            out[texts] = np.array(self._texts, dtype=object)[values[texts]]
+        return out
+
+    def _grow(self) -> None:
+        """Buffer lleno: compacta si la mitad o más ya pasó a segmentos; si no, duplica."""
+        live = self._count - self._start
+        capacity = len(self._records)
+        if self._start and live <= capacity // 2:
+            self._records[:live] = self._records[self._start:self._count]
+        else:
+            grown = np.zeros(2 * capacity, dtype=EVENT_RECORD)
+            grown[:live] = self._records[self._start:self._count]
+            self._records = grown
+        self._base += self._start
+        self._start, self._count = 0, live
+
+    def _recover_journals(self, directory: str) -> None:
+        """Carga como sesiones cerradas los diarios sin fin limpio de `directory`."""
+        for path in interrupted_journals(directory):
+            records, valid_end = read_journal(path)
+            header = next((json.loads(p) for tag, p in records if tag == TAG_HEADER), None)
+            events = [p for tag, p in records if tag == TAG_EVENT]
+            info = {"events": len(events)}
+            if header is not None and events:
+                self._current_session += 1
+                metadata = dict(header["metadata"])
+                last = None
+                for tag, payload in records:
+                    if tag == TAG_EVENT:
+                        last = np.frombuffer(payload, dtype=EVENT_RECORD, count=1)[0]
+                        value = (payload[EVENT_RECORD.itemsize:].decode("utf-8")
+                                 if last["kind"] == _TEXT else int(last["value"]))
+                        i = self._append(int(last["timestamp"]), float(last["elapsed"]),
+                                         *self._encode_value(value), int(last["event"]), int(last["device"]))
+                        number = self._base + i
+                    elif tag == TAG_METADATA and last is not None:
+                        self._event_metadata[number] = payload.decode("utf-8")
+                    elif tag == TAG_SESSION:
+                        metadata.update(json.loads(payload))
+
+                # Cierre sintético: la duración es la del último evento que llegó a disco
+                duration = float(last["elapsed"])
+                info["duration_sec"] = duration
+                number, kind = self._encode_value(f"{duration:.2f}")
+                self._append(int(last["timestamp"]), duration, number, kind,
+                             _EVENT_CODES[EventType.SESSION_END], _DEVICE_CODES[DeviceID.SYSTEM],
+                             json.dumps({"duration_sec": duration, "recovered": True}))
+                metadata["recovered_from"] = os.path.basename(path)
+                self._session_metadata[self._current_session] = metadata
+                self.recovered_sessions.append(self._current_session)
+
+            logger = Logger("EventLogger")
+            logger.warning(f"Sesión interrumpida recuperada de {path}: {info}")
+            try:
+                mark_recovered(path, valid_end, info)
+            except OSError as e:
+                logger.error(f"No se pudo marcar {path} como recuperado: {e}")
+
+    @property
+    def event_count(self) -> int:
+        """Eventos registrados, en disco y en memoria (no se usa __len__: un registro vacío no debe ser falso)."""
+        return self._segments.rows + self._count - self._start
+
+    def _chunks(self, reverse: bool = False, first: int = 0, end: Optional[int] = None):
+        """
+        (primer número de evento, registros) de cada segmento en disco y de
+        la memoria, en orden; solo los tramos que tocan `first`...`end - 1`.
+        """
+        memory_first = self._base + self._start
+        memory = []
+        if self._count > self._start and (end is None or memory_first < end):
+            memory = [(memory_first, self._records[self._start:self._count])]
+        if reverse:
+            yield from memory
+            yield from self._segments.chunks(reverse=True, first=first, end=end)
+        else:
+            yield from self._segments.chunks(first=first, end=end)
+            yield from memory
+
+    def _range_records(self, first: int, end: int) -> np.ndarray:
+        """Registros de los eventos `first`...`end - 1`: vista si caen en un solo tramo, si no copia."""
+        views = []
+        for start, records in self._chunks(first=first, end=end):
+            lo, hi = max(first - start, 0), min(end - start, len(records))
+            if lo < hi:
+                views.append(records[lo:hi])
+        if len(views) == 1:
+            return views[0]
+        return np.concatenate(views) if views else self._records[:0]
+
+    def _take(self, numbers: np.ndarray) -> np.ndarray:
+        """Registros (copia) de los eventos `numbers`, ascendentes."""
+        if not len(numbers):
+            return self._records[:0].copy()
+        parts = []
+        for start, records in self._chunks(first=int(numbers[0]), end=int(numbers[-1]) + 1):
+            lo, hi = np.searchsorted(numbers, [start, start + len(records)])
+            if lo < hi:
+                parts.append(records[numbers[lo:hi] - start])
+        return np.concatenate(parts)
+
+    def _device_numbers(self, devices) -> np.ndarray:
+        """Números de evento (ascendentes) de los dispositivos, de sus listas de posiciones."""
+        codes = sorted({_DEVICE_CODES[d] for d in devices})
+        lists = [self._device_positions[c][:self._device_counts[c]] for c in codes]
+        if len(lists) == 1:
+            return lists[0]
+        return np.sort(np.concatenate(lists)) if lists else np.empty(0, dtype=np.int64)
+
+    def session_records(self, session_id: int) -> np.ndarray:
+        """
+        Registros EVENT_RECORD de la sesión (solo lectura): una vista sin
+        copia de la rebanada contigua si cae en un solo tramo (memoria o un
+        segmento), si no una copia.
+        """
+        rows = self._session_rows.get(session_id)
+        return self._range_records(rows[0], rows[1]) if rows else self._records[:0]
+
+    def _frame(self, records: np.ndarray, index: np.ndarray) -> pd.DataFrame:
+        """
+        DataFrame con las columnas de `_dtypes` de `records`; `index` son sus
+        números de evento (ascendentes) desde el inicio del registro (o
+        desde clear_log).
+        """
+        metadata = np.empty(len(index), dtype=object)
+        if self._event_metadata and len(index):
+            numbers = np.fromiter(self._event_metadata, dtype=np.int64, count=len(self._event_metadata))
+            positions = np.searchsorted(index, numbers)
+            found = positions < len(index)
+            found[found] = index[positions[found]] == numbers[found]
+            for position, number in zip(positions[found].tolist(), numbers[found].tolist()):
+                metadata[position] = self._event_metadata[number]
+
+        return pd.DataFrame({
+            'timestamp': records['timestamp'].view('datetime64[ns]'),
+            'event_type': pd.Categorical.from_codes(records['event'], categories=_EVENT_NAMES),
+            'device_id': pd.Categorical.from_codes(records['device'], categories=_DEVICE_NAMES),
+            'new_value': pd.Series(self._decode_values(records['value'], records['kind']),
+                                   dtype=object, index=index),
+            'session_id': records['session'],
+            'elapsed_sec': records['elapsed'],
+            'metadata': pd.Series(metadata, dtype=object, index=index),
+        }, index=index, copy=True)
 
     # ----------------------------
     # Consultas y exportación
     # ----------------------------
     def get_events(self, **filters) -> pd.DataFrame:
-        df = self._log.copy()
-
-        if 'event_types' in filters:
-            event_names = [et.name for et in filters['event_types']]
-            df = df[df['event_type'].isin(event_names)]
+        """
+        Eventos (copia, de disco y memoria), filtrados por `event_types`,
+        `devices`, `sessions` y/o `time_window=(desde, hasta)`: elapsed_sec
+        en [desde, hasta) dentro de cada sesión.
+
+        Sesiones y ventanas de tiempo salen del índice de rangos, los
+        dispositivos de sus listas de posiciones; solo `event_types` se
+        filtra fila a fila, sobre lo ya elegido.
+        """
+        if 'sessions' in filters:
+            sessions = [self._session_rows[s] for s in set(filters['sessions']) if s in self._session_rows]
+        else:
+            sessions = list(self._session_rows.values())
+        sessions.sort(key=lambda rows: rows[0])
+        ranges = [(rows[0], rows[1]) for rows in sessions]
+        numbers = None          # si no es None, reemplaza a `ranges`
+
+        if 'time_window' in filters:
+            t_from, t_to = filters['time_window']
+            ranges, picked = [], []
+            for first, end, _, ordered in sessions:
+                elapsed = self._range_records(first, end)['elapsed']
+                if ordered:
+                    lo, hi = np.searchsorted(elapsed, [t_from, t_to])
+                    ranges.append((first + lo, first + hi))
+                else:
+                    picked.append(first + np.flatnonzero((elapsed >= t_from) & (elapsed < t_to)))
+            if picked:
+                numbers = np.sort(np.concatenate(picked + [np.arange(a, b) for a, b in ranges]))
 
         if 'devices' in filters:
-            device_names = [d.name for d in filters['devices']]
-            df = df[df['device_id'].isin(device_names)]
+            positions = self._device_numbers(filters['devices'])
+            if numbers is not None:
+                numbers = numbers[np.isin(numbers, positions)]
+            else:
+                bounds = np.searchsorted(positions, np.array(ranges, dtype=np.int64).reshape(-1, 2))
+                numbers = np.concatenate([positions[lo:hi] for lo, hi in bounds] + [positions[:0]])
+
+        if numbers is None:
+            records = [self._range_records(a, b) for a, b in ranges]
+            records = records[0] if len(records) == 1 else np.concatenate(records + [self._records[:0]])
+            numbers = np.concatenate([np.arange(a, b) for a, b in ranges] + [np.empty(0, dtype=np.int64)])
+        else:
+            records = self._take(numbers)
 
-        if 'sessions' in filters:
-            df = df[df['session_id'].isin(filters['sessions'])]
+        if 'event_types' in filters:
+            codes = [_EVENT_CODES[et] for et in filters['event_types']]
+            keep = np.isin(records['event'], codes)
+            records, numbers = records[keep], numbers[keep]
 
-        return df
+        return self._frame(records, numbers)
 
     def get_last_event(self, session_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
         if session_id is None:
             session_id = self._current_session
 
-        df_session = self._log[self._log["session_id"] == session_id]
-        if df_session.empty:
+        rows = self._session_rows.get(session_id)
+        if rows is None:
             return None
+        last = rows[1] - 1
+        return self._frame(self._range_records(last, last + 1), np.array([last])).iloc[-1].to_dict()
 
-        return df_session.iloc[-1].to_dict()
+    def save_to_csv(self, filename) -> None:
+        """Exporta todos los eventos tramo por tramo, sin armar un único DataFrame."""
+        if not isinstance(filename, (str, os.PathLike)):
+            self._write_csv(filename)
+            return
+        with open(filename, "w", newline="", encoding="utf-8") as f:
+            self._write_csv(f)
 
-    def save_to_csv(self, filename: str) -> None:
-        self._log.to_csv(filename, index=False)
+    def _write_csv(self, f) -> None:
+        header = True
+        for first, records in self._chunks():
+            if len(records) or header:
+                self._frame(records, np.arange(first, first + len(records))).to_csv(f, index=False, header=header)
+                header = False
 
     def clear_log(self) -> None:
-        self._log = pd.DataFrame({col: pd.Series(dtype=typ) for col, typ in self._dtypes.items()})
+        self._reset_records()
         self._current_session = 0
         self._session_start = None
+        self._session_start_ns = 0
+        self._session_start_wall = 0
         self._session_metadata = {}
@@ -0,0 +1,115 @@
+"""
+Segmentos en disco del EventLogger.
+
+Cuando la ventana en memoria supera `max_entries`, los eventos más
+antiguos se escriben a un segmento (`seg_<primer evento>.npy`, un arreglo
+EVENT_RECORD tal cual) y salen de la RAM. Las consultas leen los
+segmentos con `np.load(mmap_mode="r")` (se mapea una vez por segmento):
+el sistema operativo trae del disco solo las páginas que se tocan.
+
+La escritura va a un hilo aparte para no bloquear a quien registra;
+hasta que termina, el segmento se lee de la copia en memoria, que se
+suelta en cuanto está en disco.
+"""
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+
+class SegmentStore:
+    """
+    Segmentos consecutivos de eventos desalojados de memoria.
+
+    Sin `directory` se usa un directorio temporal propio, que se borra en
+    `close()`; con `directory` los archivos de una sesión anterior no se
+    reutilizan (cada registro empieza en blanco y pisa los suyos).
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self._directory = directory
+        self._tmp: Optional[tempfile.TemporaryDirectory] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # [primer evento, filas, ruta, copia pendiente | None, future, mapeado | None]
+        self._segments: List[list] = []
+        self.rows = 0
+
+    @property
+    def directory(self) -> str:
+        if self._directory is None:
+            self._tmp = tempfile.TemporaryDirectory(prefix="skinner_segments_")
+            self._directory = self._tmp.name
+        os.makedirs(self._directory, exist_ok=True)
+        return self._directory
+
+    def __bool__(self) -> bool:
+        return bool(self._segments)
+
+    @property
+    def first_number(self) -> Optional[int]:
+        return self._segments[0][0] if self._segments else None
+
+    def spill(self, first_number: int, records: np.ndarray) -> None:
+        """Guarda una copia de `records` (eventos `first_number`...) como segmento nuevo."""
+        pending = records.copy()
+        path = os.path.join(self.directory, f"seg_{first_number:012d}.npy")
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="EventSegments")
+        future = self._executor.submit(np.save, path, pending, allow_pickle=False)
+        segment = [first_number, len(pending), path, pending, future, None]
+        self._segments.append(segment)
+        self.rows += len(pending)
+        future.add_done_callback(lambda f: self._written(segment, f))
+
+    @staticmethod
+    def _written(segment: list, future) -> None:
+        """Ya está en disco: se suelta la copia (si la escritura falló, se conserva)."""
+        if future.exception() is None:
+            segment[3] = None
+
+    def _records(self, segment: list) -> np.ndarray:
+        pending = segment[3]                # se lee antes: el callback puede soltarla
+        if pending is not None and not segment[4].done():
+            return pending
+        if segment[5] is None:
+            segment[4].result()             # propaga un error de escritura
+            segment[5] = np.load(segment[2], mmap_mode="r")
+        return segment[5]
+
+    def chunks(self, reverse: bool = False, first: int = 0,
+               end: Optional[int] = None) -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        (primer evento, registros) de cada segmento, del más antiguo al más
+        nuevo; solo los que tocan los eventos `first`...`end - 1`.
+        """
+        segments = reversed(self._segments) if reverse else self._segments
+        for segment in segments:
+            if segment[0] + segment[1] > first and (end is None or segment[0] < end):
+                yield segment[0], self._records(segment)
+
+    def flush(self) -> None:
+        """Espera a que todos los segmentos estén escritos."""
+        for segment in self._segments:
+            segment[4].result()
+
+    def clear(self) -> None:
+        """Descarta los segmentos y borra sus archivos."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        for segment in self._segments:
+            try:
+                os.remove(segment[2])
+            except OSError:
+                pass
+        self._segments = []
+        self.rows = 0
+
+    def close(self) -> None:
+        self.clear()
+        if self._tmp is not None:
+            self._tmp.cleanup()
+            self._tmp = None
+            self._directory = None
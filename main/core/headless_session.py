@@ -0,0 +1,287 @@
+"""
+Sesiones sin interfaz gráfica: el mismo ProgramEngine y EventLogger que usa
+el panel de control, manejados por un transporte asyncio.
+"""
+import asyncio
+import time
+from datetime import datetime
+from typing import Optional, Dict, Any
+
+from main.core.event_logger import EventLogger
+from main.core.batch_parser import EventBatch
+from main.core.program_engine import ProgramEngine
+from main.core.reinforcement import LeverSchedules
+from main.core.session_state import SessionState
+from main.core.schedule_offload import ScheduleOffload
+from main.core.latency_trace import LatencyTracer
+from main.core.interval_scheduler import IntervalScheduler
+from main.core import protocol_schema as protocol
+from main.core.transport import SerialTransport
+from main.enums.program_enums import ModoLuz, ModoPalanca, ScheduleSite
+
+
+class HeadlessProgramState:
+    """Configuración del programa con los mismos getters que ProgramControlBox."""
+
+    def __init__(self, pal1: ModoPalanca = ModoPalanca.CRF, pal1_value: int = 1,
+                 pal2: ModoPalanca = ModoPalanca.INHABILITADO, pal2_value: int = 1,
+                 led1: ModoLuz = ModoLuz.APAGADO, led1_value: int = 1,
+                 led2: ModoLuz = ModoLuz.APAGADO, led2_value: int = 1):
+        self.pal1, self.pal1_value = pal1, pal1_value
+        self.pal2, self.pal2_value = pal2, pal2_value
+        self.led1, self.led1_value = led1, led1_value
+        self.led2, self.led2_value = led2, led2_value
+        self.is_runing = False
+
+    def get_runing_state(self) -> bool:
+        return self.is_runing
+
+    def set_runing_state(self, is_running: bool):
+        self.is_runing = is_running
+
+    def get_led1_mode(self) -> ModoLuz:
+        return self.led1
+
+    def get_led2_mode(self) -> ModoLuz:
+        return self.led2
+
+    def get_pal1_mode(self) -> ModoPalanca:
+        return self.pal1
+
+    def get_pal2_mode(self) -> ModoPalanca:
+        return self.pal2
+
+    def get_led1_time(self) -> int:
+        return self.led1_value
+
+    def get_led2_time(self) -> int:
+        return self.led2_value
+
+    def get_pal1_time(self) -> int:
+        return self.pal1_value
+
+    def get_pal2_time(self) -> int:
+        return self.pal2_value
+
+    def get_program_config(self) -> dict:
+        return {
+            'experiment': 'Skinnerv01',
+            'time': datetime.now().strftime("%d/%m/%Y %H:%M:%S"),
+            'led_1c': self.led1.value,
+            'led_1v': self.led1_value,
+            'led_2c': self.led2.value,
+            'led_2v': self.led2_value,
+            'pal_1c': self.pal1.value,
+            'pal_1v': self.pal1_value,
+            'pal_2c': self.pal2.value,
+            'pal_2v': self.pal2_value,
+            'headless': True,
+        }
+
+
+class _NullLogger:
+    def debug(self, msg): pass
+    def info(self, msg): pass
+    def warning(self, msg): pass
+    def error(self, msg): pass
+
+
+class HeadlessSession:
+    """
+    Corre una sesión completa sin Qt: transporte asyncio -> ProgramEngine ->
+    EventLogger, con los mismos programas de refuerzo que el panel de
+    control; los plazos FI/VI se arman con `loop.call_later` al instante
+    exacto y el tick de 1 s solo lleva el tiempo transcurrido. Con
+    `ScheduleSite.DEVICE` el programa se envía compilado al firmware, que
+    decide los refuerzos (ver `main.core.schedule_offload`).
+    """
+
+    def __init__(self, transport: SerialTransport, program: HeadlessProgramState,
+                 event_logger: Optional[EventLogger] = None, logger=None, seed: Optional[int] = None,
+                 schedule_site: ScheduleSite = ScheduleSite.HOST):
+        self.transport = transport
+        self.program = program
+        self.event_logger = event_logger or EventLogger()
+        self.logger = logger or _NullLogger()
+        self.state = SessionState(self.event_logger)
+        self.schedule_site = schedule_site
+        self.offload = ScheduleOffload(self.send_cmd, logger=self.logger)
+        self.tracer = LatencyTracer()
+        self.engine = ProgramEngine(
+            send_cmd_callback=self.send_cmd,
+            check_event_palanc=self.check_palanca_num,
+            prog_section=self.program,
+            info_group=self.state,
+            logger=self.logger,
+            reply_callback=self.offload.on_device_line,
+            device_reinforcement_callback=self._on_device_reinforcement,
+        )
+        self.interval_scheduler = IntervalScheduler(on_rearm=self._arm_interval_timer)
+        self._interval_handle: Optional[asyncio.TimerHandle] = None
+        self.schedules = LeverSchedules(timer=self.interval_scheduler)
+        self.seed = seed
+        self.elapsed = 0
+        self._start_ns = 0
+        self._link_lost = asyncio.Event()
+
+        transport.on_items = self._on_items
+        transport.on_connection = self._on_connection
+
+    # ----------------------------
+    # Ciclo de la sesión
+    # ----------------------------
+    async def run(self, port_name: str, duration_s: float, baud_rate: int = 115200) -> Dict[str, Any]:
+        """Abre el puerto, ejecuta la sesión `duration_s` segundos y la cierra."""
+        self.transport.open(port_name, baud_rate)
+        self.start()
+        try:
+            deadline = time.monotonic() + duration_s
+            next_tick = time.monotonic() + 1.0
+            while not self._link_lost.is_set():
+                now = time.monotonic()
+                if now >= deadline:
+                    break
+                try:
+                    await asyncio.wait_for(self._link_lost.wait(),
+                                           timeout=max(0.0, min(next_tick, deadline) - now))
+                except asyncio.TimeoutError:
+                    pass
+                if time.monotonic() >= next_tick:
+                    next_tick += 1.0
+                    self.tick()
+        finally:
+            self.stop()
+            self.transport.close()
+        return self.summary()
+
+    def start(self):
+        self.state.reset_all()
+        self.tracer.reset()
+        config = self.program.get_program_config()
+        config['seed'] = self.schedules.new_seed(self.seed)
+        config['schedule_site'] = self.schedule_site.value
+        self.event_logger.start_session(config)
+        self._start_ns = time.perf_counter_ns()
+        self.state.start(self._start_ns)
+        self.elapsed = 0
+        self.program.set_runing_state(True)
+        self._configure_schedules()
+        self._send_led_config()
+        if self.schedule_site == ScheduleSite.DEVICE:
+            self.offload.push(config, self.schedules.seed)
+            try:
+                asyncio.get_running_loop().call_later(self.offload.ack_timeout_s, self.offload.check_timeout)
+            except RuntimeError:
+                pass   # fuera del bucle: check_timeout() se llama a mano
+        self.logger.info(f"Sesión {self.event_logger.get_current_session_id()} iniciada (headless)")
+
+    def stop(self):
+        if not self.program.get_runing_state():
+            return
+        self.program.set_runing_state(False)
+        self.schedules.stop()
+        self.offload.stop()
+        if self.event_logger.is_session_active():
+            self.event_logger.set_session_metadata("reinforcement_latency", self.tracer.summary())
+            self.event_logger.end_session()
+        self.send_cmd(protocol.led_command(1, False))
+        self.send_cmd(protocol.led_command(2, False))
+
+    def tick(self):
+        """Cada segundo: tiempo transcurrido."""
+        self.elapsed = int((time.perf_counter_ns() - self._start_ns) // 1_000_000_000)
+
+    def _arm_interval_timer(self, deadline: Optional[float]):
+        if self._interval_handle is not None:
+            self._interval_handle.cancel()
+            self._interval_handle = None
+        if deadline is None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return   # fuera del bucle (p. ej. pruebas): run_due() se llama a mano
+        delay = max(0.0, deadline - self.interval_scheduler.clock())
+        self._interval_handle = loop.call_later(delay, self.interval_scheduler.run_due)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'session_id': self.event_logger.get_current_session_id(),
+            'seed': self.schedules.seed,
+            'schedule_site': (ScheduleSite.DEVICE if self.offload.confirmed else ScheduleSite.HOST).value,
+            'elapsed_sec': self.elapsed,
+            'lever_01': self.state.lever_01,
+            'lever_02': self.state.lever_02,
+            'dispensed': self.state.dispensed,
+            'rewards': self.state.rewards,
+            'latency_s': self.state.latency_s,
+            'responses_per_minute': list(self.state.minute_bins),
+            'reinforcement_latency': self.tracer.summary(),
+        }
+
+    # ----------------------------
+    # E/S
+    # ----------------------------
+    def send_cmd(self, command: str):
+        if not self.transport.is_connected():
+            return
+        self.transport.write_line(command)
+        spec, value = protocol.decode_command(command)
+        if spec is not None and spec.name == "dispense":
+            self.tracer.written()      # sin cola TX: write_line escribe en el acto
+            if self.program.get_runing_state():
+                self.engine._handle_disp_food(value)
+
+    def _on_items(self, items, port_name: str):
+        for payload, t_arrival_ns in items:
+            try:
+                if isinstance(payload, str):
+                    self.engine.process_uart_line(payload, t_arrival_ns)
+                elif isinstance(payload, EventBatch):
+                    self.engine.process_batch(payload, t_arrival_ns)
+                else:
+                    self.engine.process_record(payload, t_arrival_ns)
+            except Exception as e:
+                self.logger.error(f"Error process line: {e}")
+
+    def _on_connection(self, connected: bool, port_name: str):
+        if not connected and self.program.get_runing_state():
+            self.logger.warning(f"Puerto {port_name} cerrado durante la sesión")
+            self._link_lost.set()
+
+    # ----------------------------
+    # Programas de refuerzo (mismas reglas que el panel de control)
+    # ----------------------------
+    def _send_led_config(self):
+        for num, mode in ((1, self.program.get_led1_mode()), (2, self.program.get_led2_mode())):
+            if mode in (ModoLuz.APAGADO, ModoLuz.ENCENDIDO):
+                self.send_cmd(protocol.led_command(num, mode == ModoLuz.ENCENDIDO))
+
+    def _configure_schedules(self):
+        self.schedules.configure(1, self.program.get_pal1_mode(), self.program.get_pal1_time())
+        self.schedules.configure(2, self.program.get_pal2_mode(), self.program.get_pal2_time())
+        self.schedules.start()
+
+    def check_palanca_num(self, num: int, t_arrival_ns: int = None):
+        if not self.program.get_runing_state() or self.offload.active:
+            return
+        if self.schedules.on_response(num, t_arrival_ns=t_arrival_ns):
+            self.tracer.begin(num, t_arrival_ns, self.engine.t_dispatch_ns)
+            self._reinforce(num)
+
+    def _on_device_reinforcement(self, num: int):
+        if num == 1:
+            self.state.set_last_p01_event(False)
+        else:
+            self.state.set_last_p02_event(False)
+
+    def _reinforce(self, num: int):
+        if self.transport.is_connected():
+            self.tracer.enqueued()
+            self.send_cmd(protocol.dispense_command())
+        else:
+            self.tracer.discard_open()
+        if num == 1:
+            self.state.set_last_p01_event(False)
+        else:
+            self.state.set_last_p02_event(False)
@@ -0,0 +1,107 @@
+"""
+Planificador de plazos absolutos sobre un reloj monótono.
+
+Cada plazo se guarda en un heap como instante absoluto (`time.perf_counter()`,
+el mismo reloj de los `t_arrival_ns` que estampan los lectores), no como
+"n ticks de 1 s": no se acumula deriva aunque la sesión dure horas y cada
+plazo se dispara en cuanto el driver despierta, sin esperar al siguiente
+segundo.
+
+El planificador no tiene temporizador propio. Avisa por `on_rearm(deadline)`
+cada vez que cambia el plazo más próximo y el driver (un QTimer de precisión
+en la GUI, `loop.call_at` en asyncio, o una prueba con reloj simulado) llama
+a `run_due()` al llegar ese instante:
+
+    scheduler = IntervalScheduler(on_rearm=driver.arm)
+    handle = scheduler.call_later(5.0, on_interval)
+    ...
+    scheduler.run_due()      # desde el driver
+"""
+import heapq
+import itertools
+import time
+from typing import Callable, Optional, List
+
+Clock = Callable[[], float]
+_UNARMED = object()
+
+
+class TimerHandle:
+    __slots__ = ("deadline", "callback", "args", "cancelled")
+
+    def __init__(self, deadline: float, callback: Callable, args: tuple):
+        self.deadline = deadline
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+
+class IntervalScheduler:
+    """Heap de plazos absolutos; cancelar es O(1) (se descartan al salir)."""
+
+    def __init__(self, clock: Clock = time.perf_counter,
+                 on_rearm: Optional[Callable[[Optional[float]], None]] = None):
+        self.clock = clock
+        self.on_rearm = on_rearm
+        self._heap: List[tuple] = []
+        self._seq = itertools.count()
+        self._armed = _UNARMED                # último plazo avisado al driver
+        self.fired = 0
+        self.max_lateness = 0.0               # peor retraso observado (s)
+
+    def call_at(self, deadline: float, callback: Callable, *args) -> TimerHandle:
+        handle = TimerHandle(deadline, callback, args)
+        heapq.heappush(self._heap, (deadline, next(self._seq), handle))
+        self._rearm()
+        return handle
+
+    def call_later(self, delay: float, callback: Callable, *args) -> TimerHandle:
+        return self.call_at(self.clock() + delay, callback, *args)
+
+    def cancel(self, handle: Optional[TimerHandle]) -> None:
+        if handle is not None:
+            handle.cancel()
+            self._rearm()
+
+    def clear(self) -> None:
+        for _, _, handle in self._heap:
+            handle.cancel()
+        self._heap.clear()
+        self._rearm()
+
+    def next_deadline(self) -> Optional[float]:
+        heap = self._heap
+        while heap and heap[0][2].cancelled:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    def run_due(self, now: float = None) -> int:
+        """Dispara los plazos vencidos, en orden; devuelve cuántos."""
+        now = self.clock() if now is None else now
+        heap = self._heap
+        fired = 0
+        while heap and heap[0][0] <= now:
+            deadline, _, handle = heapq.heappop(heap)
+            if handle.cancelled:
+                continue
+            handle.cancelled = True
+            self.max_lateness = max(self.max_lateness, now - deadline)
+            handle.callback(deadline, *handle.args)
+            fired += 1
+        self.fired += fired
+        self._armed = _UNARMED   # el driver ya despertó: hay que volver a avisarle
+        self._rearm()
+        return fired
+
+    def __len__(self) -> int:
+        return sum(1 for _, _, handle in self._heap if not handle.cancelled)
+
+    def _rearm(self) -> None:
+        deadline = self.next_deadline()
+        if deadline != self._armed:
+            self._armed = deadline
+            if self.on_rearm is not None:
+                self.on_rearm(deadline)
@@ -0,0 +1,192 @@
+"""
+Latencia respuesta -> refuerzo, por etapas.
+
+Para cada respuesta que el host refuerza se guardan los
+`time.perf_counter_ns()` de las etapas de `LatencyStage`:
+
+    ARRIVAL   bytes `P01:1` leídos del puerto (SerialReceiver / hilo de E/S)
+    DISPATCH  el DataProcessor entrega el item a ProgramEngine.process_*
+    DECISION  check_palanca_num: el programa de refuerzo decide reforzar
+    ENQUEUE   DISP:1 entra al TxScheduler (send_uart_cmd)
+    WRITE     DISP:1 sale del TxScheduler hacia SerialManager.send_data_str
+              (señal command_sent, solo el primer envío: un reintento no
+              cierra otra traza). Sin hilo de E/S es el write() del
+              QSerialPort; con `threaded` solo se entrega al hilo de E/S,
+              que escribe después, y el reporte lo indica (`write_point`).
+
+Uso:
+    tracer = LatencyTracer()
+    tracer.begin(num, t_arrival_ns, t_dispatch_ns)  # al decidir reforzar
+    tracer.enqueued()                                # antes de encolar DISP:1
+    tracer.written()                                 # DISP:1 salió por el puerto
+    tracer.summary()     # p50/p95/p99 por tramo y total, e histograma
+
+Las DISP salen en orden (misma prioridad, sin fusión), así que cada
+primer envío cierra la traza abierta más antigua; si se descarta la cola TX
+(desconexión) se descartan también las trazas abiertas (`discard_open`).
+Con `ScheduleSite.DEVICE` decide el firmware y el host no traza.
+"""
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from main.enums.program_enums import LatencyStage
+
+STAGES = tuple(LatencyStage)
+# Tramos entre etapas consecutivas ("arrival->dispatch", ...) y el total
+SEGMENTS = tuple(f"{a.value}->{b.value}" for a, b in zip(STAGES, STAGES[1:]))
+TOTAL = "total"
+PERCENTILES = (50, 95, 99)
+# Bordes fijos (ms): los histogramas de distintas sesiones se pueden comparar
+HISTOGRAM_EDGES_MS = (0, 0.25, 0.5, 1, 2, 5, 10, 20, 50, 100, 250, 500, 1000)
+
+_ARRIVAL, _DISPATCH, _DECISION, _ENQUEUE, _WRITE = range(len(STAGES))
+
+# Qué marca WRITE
+WRITE_PORT = "port"            # write() del puerto en el mismo hilo
+WRITE_IO_QUEUE = "io_queue"    # entrega al hilo de E/S (la escritura real es posterior)
+
+
+class LatencyTracer:
+    """Trazas por etapa de cada refuerzo decidido en el host (arreglos int64)."""
+
+    def __init__(self, capacity: int = 1024, clock: Callable[[], int] = time.perf_counter_ns,
+                 write_point: str = WRITE_PORT):
+        self.clock = clock
+        self.write_point = write_point
+        self._capacity = capacity
+        self.reset()
+
+    def reset(self) -> None:
+        self._stamps = np.zeros((self._capacity, len(STAGES)), dtype=np.int64)
+        self._levers = np.zeros(self._capacity, dtype=np.int8)
+        self.count = 0
+        self.discarded = 0
+        self.unmatched = 0          # escrituras DISP sin traza abierta (DISP manual)
+        self._open: deque = deque()
+
+    # ----------------------------
+    # Registro
+    # ----------------------------
+    def begin(self, lever: int, t_arrival_ns: Optional[int] = None, t_dispatch_ns: Optional[int] = None,
+              t_decision_ns: Optional[int] = None) -> None:
+        """Abre la traza de un refuerzo; una etapa sin sello toma el de la siguiente."""
+        decision = self.clock() if t_decision_ns is None else t_decision_ns
+        dispatch = decision if t_dispatch_ns is None else t_dispatch_ns
+        arrival = dispatch if t_arrival_ns is None else t_arrival_ns
+        self._open.append([lever, arrival, dispatch, decision, 0])
+
+    def enqueued(self, t_ns: Optional[int] = None) -> None:
+        if self._open:
+            self._open[-1][1 + _ENQUEUE] = self.clock() if t_ns is None else t_ns
+
+    def written(self, t_ns: Optional[int] = None) -> None:
+        """DISP:1 escrito: cierra la traza abierta más antigua."""
+        if not self._open:
+            self.unmatched += 1
+            return
+        t_write = self.clock() if t_ns is None else t_ns
+        lever, *stamps = self._open.popleft()
+        if not stamps[_ENQUEUE]:
+            stamps[_ENQUEUE] = t_write
+        stamps.append(t_write)
+
+        if self.count == len(self._levers):
+            self._stamps = np.concatenate([self._stamps, np.zeros_like(self._stamps)])
+            self._levers = np.concatenate([self._levers, np.zeros_like(self._levers)])
+        self._stamps[self.count] = stamps
+        self._levers[self.count] = lever
+        self.count += 1
+
+    def discard_open(self) -> None:
+        """La cola TX se vació sin escribir: esas DISP ya no saldrán."""
+        self.discarded += len(self._open)
+        self._open.clear()
+
+    # ----------------------------
+    # Lectura
+    # ----------------------------
+    @property
+    def stamps(self) -> np.ndarray:
+        """(n, etapas) en ns, columnas en el orden de `LatencyStage`."""
+        return self._stamps[:self.count]
+
+    @property
+    def levers(self) -> np.ndarray:
+        return self._levers[:self.count]
+
+    def durations_ms(self) -> Dict[str, np.ndarray]:
+        """Duración de cada tramo y del total, en ms."""
+        stamps = self.stamps
+        steps = np.diff(stamps, axis=1) / 1e6
+        durations = {name: steps[:, i] for i, name in enumerate(SEGMENTS)}
+        durations[TOTAL] = (stamps[:, _WRITE] - stamps[:, _ARRIVAL]) / 1e6
+        return durations
+
+    def percentiles(self) -> Dict[str, Dict[str, float]]:
+        if not self.count:
+            return {}
+        result = {}
+        for name, values in self.durations_ms().items():
+            pcts = np.percentile(values, PERCENTILES)
+            result[name] = {f"p{p}": round(float(v), 3) for p, v in zip(PERCENTILES, pcts)}
+            result[name]["max"] = round(float(values.max()), 3)
+        return result
+
+    def histogram(self) -> Dict[str, List]:
+        """Total presión -> DISP:1 en los bordes fijos; `overflow` = por encima del último."""
+        total = self.durations_ms()[TOTAL] if self.count else np.empty(0)
+        counts, _ = np.histogram(total, bins=HISTOGRAM_EDGES_MS)
+        return {
+            "edges_ms": list(HISTOGRAM_EDGES_MS),
+            "counts": counts.tolist(),
+            "overflow": int((total > HISTOGRAM_EDGES_MS[-1]).sum()),
+        }
+
+    def readout(self) -> str:
+        """Texto del indicador en vivo: p50 / p95 / p99 del total (ms)."""
+        if not self.count:
+            return "--"
+        p = self.percentiles()[TOTAL]
+        return f"{p['p50']:.2f} / {p['p95']:.2f} / {p['p99']:.2f}"
+
+    def summary(self) -> dict:
+        """Resumen para el reporte de la sesión (serializable a JSON)."""
+        return {
+            "count": self.count,
+            "discarded": self.discarded,
+            "write_point": self.write_point,
+            "percentiles_ms": self.percentiles(),
+            "histogram": self.histogram(),
+        }
+
+
+def histogram_lines(summary: dict, width: int = 30) -> List[str]:
+    """Histograma de `LatencyTracer.summary()` como texto, una barra por intervalo."""
+    if not summary or not summary.get("count"):
+        return ["Sin refuerzos decididos por el host"]
+    hist = summary["histogram"]
+    edges, counts = hist["edges_ms"], list(hist["counts"])
+    labels = [f"{lo:g}-{hi:g} ms" for lo, hi in zip(edges, edges[1:])]
+    if hist.get("overflow"):
+        labels.append(f"> {edges[-1]:g} ms")
+        counts.append(hist["overflow"])
+    while len(counts) > 1 and not counts[-1]:      # sin las barras vacías del final
+        counts.pop()
+        labels.pop()
+    peak = max(counts) or 1
+    pad = max(len(label) for label in labels)
+
+    total = summary["percentiles_ms"][TOTAL]
+    lines = [f"Presión -> DISP:1 (n={summary['count']}): p50 {total['p50']:.2f} ms, "
+             f"p95 {total['p95']:.2f} ms, p99 {total['p99']:.2f} ms, máx {total['max']:.2f} ms"]
+    if summary.get("write_point") == WRITE_IO_QUEUE:
+        lines.append("  (write = DISP:1 entregado al hilo de E/S, no la escritura en el puerto)")
+    for name in SEGMENTS:
+        p = summary["percentiles_ms"][name]
+        lines.append(f"  {name}: p50 {p['p50']:.3f} / p95 {p['p95']:.3f} / p99 {p['p99']:.3f} ms")
+    for label, n in zip(labels, counts):
+        lines.append(f"{label:>{pad}} | {'#' * round(width * n / peak):<{width}} {n}")
+    return lines
@@ -0,0 +1,105 @@
+from typing import List, Union
+
+
+class LineFramer:
+    """
+    Separador incremental de líneas terminadas en '\\n' sobre un buffer
+    `bytearray` preasignado que se reutiliza entre lecturas.
+
+    `feed()` devuelve solo tramas completas como `memoryview` sobre el buffer
+    (sin el '\\r\\n' final). Las vistas son válidas hasta la siguiente llamada
+    a `feed()`; quien necesite conservarlas debe copiarlas (`bytes(frame)`).
+    Los restos de una trama incompleta quedan en el buffer hasta que llegue
+    su '\\n'; al compactar solo se mueve ese resto, nunca tramas ya emitidas.
+    """
+
+    def __init__(self, capacity: int = 4096, max_frame: int = 256):
+        if capacity < 2 * max_frame:
+            raise ValueError("capacity debe ser al menos 2 * max_frame")
+
+        self._capacity = capacity
+        self._max_frame = max_frame
+        self._buf = bytearray(capacity)
+        self._view = memoryview(self._buf)
+        self._start = 0          # inicio de la trama pendiente
+        self._end = 0            # fin de los datos escritos
+        self._discarding = False
+
+        self.frames = 0          # tramas completas emitidas
+        self.partial_frames = 0  # tramas que llegaron partidas en varias lecturas
+        self.oversize_frames = 0 # tramas descartadas por superar max_frame
+
+    def feed(self, data: Union[bytes, bytearray, memoryview]) -> List[Union[memoryview, bytes]]:
+        """Agrega bytes recibidos y devuelve las tramas completas."""
+        frames: List[Union[memoryview, bytes]] = []
+        chunk = memoryview(data)
+        feed_start = self._end
+
+        while chunk:
+            room = self._capacity - self._end
+            if room < len(chunk) and self._start > 0:
+                # Las tramas ya emitidas en esta llamada ocupan la zona que se va
+                # a sobrescribir: solo en este caso (lecturas enormes) se copian.
+                frames[:] = [bytes(f) for f in frames]
+                feed_start -= self._start
+                self._compact()
+                room = self._capacity - self._end
+
+            n = min(room, len(chunk))
+            self._buf[self._end:self._end + n] = chunk[:n]
+            self._scan(self._end, self._end + n, feed_start, frames)
+            chunk = chunk[n:]
+
+        return frames
+
+    def pending(self) -> int:
+        """Bytes de una trama incompleta que esperan su '\\n'."""
+        return self._end - self._start
+
+    def reset(self) -> None:
+        """Descarta cualquier trama incompleta (p. ej. al reabrir el puerto)."""
+        self._start = self._end = 0
+        self._discarding = False
+
+    def get_stats(self) -> dict:
+        return {
+            "frames": self.frames,
+            "partial_frames": self.partial_frames,
+            "oversize_frames": self.oversize_frames,
+            "pending_bytes": self.pending(),
+        }
+
+    def _compact(self) -> None:
+        pending = self._end - self._start
+        self._buf[:pending] = self._buf[self._start:self._end]
+        self._start = 0
+        self._end = pending
+
+    def _scan(self, pos: int, end: int, feed_start: int, frames: list) -> None:
+        buf = self._buf
+        while True:
+            nl = buf.find(b'\n', pos, end)
+            if nl < 0:
+                break
+
+            if self._discarding:
+                self._discarding = False
+            else:
+                stop = nl - 1 if nl > self._start and buf[nl - 1] == 0x0D else nl
+                if stop - self._start > self._max_frame:
+                    self.oversize_frames += 1
+                elif stop > self._start:
+                    frames.append(self._view[self._start:stop])
+                    self.frames += 1
+                    if self._start < feed_start:
+                        self.partial_frames += 1
+
+            self._start = pos = nl + 1
+
+        self._end = end
+        if self._discarding:
+            self._start = self._end
+        elif self._end - self._start > self._max_frame:
+            self.oversize_frames += 1
+            self._discarding = True
+            self._start = self._end
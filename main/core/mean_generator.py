@@ -1,4 +1,7 @@
 import random
+import secrets
+
+import numpy as np
 
 class MeanTimeGeneratorMS:
     def __init__(self, target_ms=5000, range_pct=20, precision_ms=1):
@@ -280,6 +283,88 @@ class MeanTimeGeneratorInt:
         while True:
             yield self.next_value()
 
+# Whole-session VI/VR sequences (NumPy, seedable)
+FH_STEPS = 20   # intervals per Fleshler-Hoffman block
+
+
+def new_seed() -> int:
+    """Fresh 32-bit seed, to be stored with the session metadata."""
+    return secrets.randbits(32)
+
+
+def fleshler_hoffman(mean: float, steps: int = FH_STEPS) -> np.ndarray:
+    """
+    Fleshler & Hoffman (1962) progression, ascending:
+    t_n = mean * [1 + ln N + (N-n) ln(N-n) - (N-n+1) ln(N-n+1)], n = 1..N.
+    The block mean is exactly `mean`.
+    """
+    r = steps - np.arange(1, steps + 1, dtype=np.float64)     # N - n
+    return mean * (1 + np.log(steps) + r * np.log(np.maximum(r, 1)) - (r + 1) * np.log(r + 1))
+
+
+def integer_progression(values: np.ndarray, mean: float) -> np.ndarray:
+    """
+    Round a progression to integers >= 1 keeping its sum at mean * len
+    (largest remainders get the extra unit; clipping is paid by the largest values).
+    """
+    values = np.asarray(values, dtype=np.float64)
+    result = np.maximum(np.floor(values), 1).astype(np.int64)
+    diff = int(round(mean * len(values))) - int(result.sum())
+    if diff > 0:
+        fraction = values - np.floor(values)
+        result[np.argsort(-fraction, kind="stable")[:diff]] += 1
+    while diff < 0:
+        result[int(np.argmax(result))] -= 1
+        diff += 1
+    return result
+
+
+class IntervalSequence:
+    """
+    VI/VR sequence precomputed up front: blocks of the Fleshler-Hoffman
+    progression, each shuffled with a seeded NumPy generator, so every
+    block keeps the programmed mean, a lookup is an array index and the
+    same seed reproduces the session. Callable, so it can be passed as an
+    `interval_source` to the reinforcement schedules.
+    """
+
+    def __init__(self, mean: float, integer: bool = False, steps: int = FH_STEPS,
+                 blocks: int = 64, seed=None):
+        self.mean = mean
+        self.integer = integer
+        self.blocks = blocks
+        self.seed = new_seed() if seed is None else seed
+        self._rng = np.random.default_rng(self.seed)
+        base = fleshler_hoffman(mean, steps)
+        # Integer steps for VR (responses); VI intervals rounded to the millisecond
+        self.base = integer_progression(base, mean) if integer else np.round(base, 3)
+        self.values = self._generate()
+        self.index = 0
+
+    def _generate(self) -> np.ndarray:
+        return self._rng.permuted(np.tile(self.base, (self.blocks, 1)), axis=1).ravel()
+
+    def next_value(self):
+        """Next value of the sequence (a fresh batch of blocks when exhausted)."""
+        if self.index >= len(self.values):
+            self.values = self._generate()
+            self.index = 0
+        value = self.values[self.index]
+        self.index += 1
+        return value.item()
+
+    __call__ = next_value
+
+    def get_stats(self):
+        """Return the sequence parameters and position."""
+        return {
+            "seed": self.seed,
+            "mean": self.mean,
+            "steps": len(self.base),
+            "index": self.index,
+        }
+
+
 # Example usage
 if __name__ == "__main__":
     gen = MeanTimeGeneratorMS(target_ms=5000, range_pct=50, precision_ms=100)
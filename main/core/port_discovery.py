@@ -0,0 +1,129 @@
+import os
+from typing import Optional, Dict, List
+
+from PyQt6.QtCore import QObject, QTimer, QFileSystemWatcher, pyqtSignal
+from PyQt6.QtSerialPort import QSerialPortInfo
+
+
+def _port_identity(info: QSerialPortInfo) -> Optional[str]:
+    """Clave estable del adaptador USB (VID:PID:serie), o None si no es USB."""
+    if not info.hasVendorIdentifier():
+        return None
+    return (f"{info.vendorIdentifier():04X}:{info.productIdentifier():04X}:"
+            f"{info.serialNumber()}")
+
+
+class PortDiscovery(QObject):
+    """
+    Servicio único de descubrimiento de puertos seriales.
+
+    En Linux/macOS vigila `/dev` con QFileSystemWatcher (inotify/kqueue) y
+    solo vuelve a enumerar cuando cambia el directorio; donde no se puede
+    vigilar, enumera con un timer. En ambos casos la lista y los detalles de
+    cada puerto quedan en caché: las consultas no vuelven a recorrer el
+    sistema y las señales solo se emiten cuando algo cambió.
+
+    Se comparte por proceso mediante `PortDiscovery.instance()`.
+    """
+    ports_changed = pyqtSignal(list)     # nombres de puertos disponibles
+    port_added = pyqtSignal(dict)        # detalles del puerto conectado
+    port_removed = pyqtSignal(dict)      # detalles del puerto retirado
+
+    DEV_DIR = "/dev"
+    DEBOUNCE_MS = 250
+
+    _instance: Optional["PortDiscovery"] = None
+
+    @classmethod
+    def instance(cls) -> "PortDiscovery":
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, poll_interval_ms: int = 2000):
+        super().__init__()
+        self._ports: Dict[str, dict] = {}      # nombre -> detalles
+        self._by_identity: Dict[str, str] = {} # VID:PID:serie -> nombre
+        self.scans = 0
+
+        # Un enchufe genera varios eventos en /dev: se agrupan en un solo escaneo
+        self._debounce = QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.timeout.connect(self.refresh)
+
+        self._watcher: Optional[QFileSystemWatcher] = None
+        self._poll_timer: Optional[QTimer] = None
+        if os.path.isdir(self.DEV_DIR):
+            self._watcher = QFileSystemWatcher(self)
+            if self._watcher.addPath(self.DEV_DIR):
+                self._watcher.directoryChanged.connect(lambda _path: self._debounce.start(self.DEBOUNCE_MS))
+            else:
+                self._watcher = None
+
+        if self._watcher is None:
+            self._poll_timer = QTimer(self)
+            self._poll_timer.timeout.connect(self.refresh)
+            self._poll_timer.start(poll_interval_ms)
+
+        self.refresh()
+
+    # ----------------------------
+    # Consultas (desde la caché)
+    # ----------------------------
+    def get_port_names(self) -> List[str]:
+        return list(self._ports)
+
+    def get_ports_info(self) -> List[dict]:
+        return [dict(info) for info in self._ports.values()]
+
+    def get_port_details(self, port_name: str) -> dict:
+        info = self._ports.get(port_name)
+        return dict(info) if info else {}
+
+    def find_port(self, identity: str) -> Optional[str]:
+        """Nombre actual del adaptador con esa identidad (p. ej. tras re-enchufarlo)."""
+        return self._by_identity.get(identity)
+
+    def is_event_driven(self) -> bool:
+        return self._watcher is not None
+
+    # ----------------------------
+    # Enumeración
+    # ----------------------------
+    def refresh(self) -> None:
+        """Enumera los puertos y emite los cambios respecto a la caché."""
+        self.scans += 1
+        current: Dict[str, dict] = {}
+        for port in QSerialPortInfo.availablePorts():
+            name = port.portName()
+            cached = self._ports.get(name)
+            identity = _port_identity(port)
+            if cached is not None and cached['identity'] == identity:
+                current[name] = cached
+                continue
+            current[name] = {
+                'name': name,
+                'description': port.description(),
+                'manufacturer': port.manufacturer(),
+                'serial_number': port.serialNumber(),
+                'vendor_id': port.vendorIdentifier(),
+                'product_id': port.productIdentifier(),
+                'system_location': port.systemLocation(),
+                'identity': identity,
+            }
+
+        # Mismo nombre con otra identidad = otro adaptador: cuenta como quitar + agregar
+        removed = [info for name, info in self._ports.items() if current.get(name) is not info]
+        added = [info for name, info in current.items() if self._ports.get(name) is not info]
+        if not removed and not added:
+            return
+
+        self._ports = current
+        self._by_identity = {info['identity']: name for name, info in current.items()
+                             if info['identity']}
+
+        for info in removed:
+            self.port_removed.emit(dict(info))
+        for info in added:
+            self.port_added.emit(dict(info))
+        self.ports_changed.emit(self.get_port_names())
@@ -0,0 +1,194 @@
+import time
+
+from main.enums.indicators_enum import IndicatorKey
+from main.enums.program_enums import ModoPalanca
+from main.enums.protocol_enums import MessageKind
+from main.core.binary_protocol import DEV_L01, DEV_L02, DEV_P01, DEV_P02, DEV_IR1, DEV_R01, DEV_R02
+from main.core.protocol_schema import EVENT_DEVICES, RX_KINDS
+
+
+class ProgramEngine:
+    """
+    Lógica principal del programa: estados, modos y procesamiento de comandos recibidos por UART.
+
+    No depende de widgets: `prog_section` solo necesita los getters de
+    ProgramControlBox (get_runing_state, get_pal1_mode, ...) e `info_group`
+    es el SessionState de la sesión (update_value, ...), que el panel de
+    indicadores solo muestra; así el mismo motor corre con la GUI o sin ella
+    (ver `main.core.headless_session`).
+    """
+    # Prefijo ASCII -> dispositivo (del esquema; mismo código que en el protocolo binario)
+    TOKEN_DEVICES = EVENT_DEVICES
+    MAX_UNKNOWN_PREFIXES = 32
+    # Contador de palanca -> número de palanca, y modos en que se cuentan respuestas
+    _LEVERS = {IndicatorKey.LEVER_01_COUNT: 1, IndicatorKey.LEVER_02_COUNT: 2}
+    _ACTIVE_MODES = (ModoPalanca.CRF, ModoPalanca.FI, ModoPalanca.FR, ModoPalanca.VI, ModoPalanca.VR)
+
+    def __init__(self, 
+                 send_cmd_callback, 
+                 check_event_palanc,
+                 prog_section,
+                 info_group,
+                 
+                 logger,
+                 reply_callback=None,
+                 device_reinforcement_callback=None):
+        self.send_cmd = send_cmd_callback
+        self.reply_callback = reply_callback   # respuestas OK:/ERROR: del firmware
+        # Refuerzos decididos por el firmware (R01/R02, ver schedule_offload)
+        self.device_reinforcement_callback = device_reinforcement_callback
+        self.prog_section = prog_section
+        self.info_group = info_group
+        self.check_event_palanc = check_event_palanc
+        self.logger = logger
+
+        # Tramas binarias: dispositivo -> manejador (valor, t_arrival_ns)
+        self._record_handlers = {
+            DEV_L01: lambda v, t: self.info_group.update_value(
+                IndicatorKey.LED_01_STATE, v, increment=False, t_arrival_ns=t),
+            DEV_L02: lambda v, t: self.info_group.update_value(
+                IndicatorKey.LED_02_STATE, v, increment=False, t_arrival_ns=t),
+            DEV_P01: lambda v, t: self._handle_palanca(IndicatorKey.LEVER_01_COUNT, v, t),
+            DEV_P02: lambda v, t: self._handle_palanca(IndicatorKey.LEVER_02_COUNT, v, t),
+            DEV_IR1: lambda v, t: self._handle_recompensa_food(str(v), t),
+            DEV_R01: lambda v, t: self._handle_device_reinforcement(1, t),
+            DEV_R02: lambda v, t: self._handle_device_reinforcement(2, t),
+        }
+        # Tokens ASCII: prefijo -> el mismo manejador ya ligado (valor int, t_arrival_ns)
+        self._token_handlers = {
+            prefix: self._record_handlers[device] for prefix, device in self.TOKEN_DEVICES.items()
+        }
+        self.unknown_tokens = 0
+        self._unknown_prefixes = set()
+        # perf_counter_ns en que el DataProcessor entregó el item actual (ver latency_trace)
+        self.t_dispatch_ns = 0
+        # Tokens conocidos que no son eventos (ecos, botones, arranque del ESP)
+        self.other_tokens = {kind: 0 for kind in MessageKind}
+
+    def process_record(self, record, t_arrival_ns: int = None):
+        """
+        Procesa un evento recibido como trama binaria (BinaryRecord).
+        """
+        self.t_dispatch_ns = time.perf_counter_ns()
+        if not self.prog_section.get_runing_state():
+            return
+
+        handler = self._record_handlers.get(record.device)
+        if handler is None:
+            self.logger.warning(f"unknow device id: {record.device}")
+            return
+        handler(record.value, t_arrival_ns)
+
+
+    def process_uart_line(self, line, t_arrival_ns: int = None):
+        """
+        Procesa un mensaje recibido por UART.
+        `t_arrival_ns` es el perf_counter_ns de llegada de los bytes; se
+        propaga hasta el EventLogger para que el tiempo registrado sea el de
+        la respuesta y no el del procesamiento.
+
+        Cada token `PREFIJO:valor` se resuelve con una sola búsqueda en
+        `_token_handlers`; el resto se cuenta por tipo según el esquema
+        (`protocol_schema.RX_KINDS`) y solo los prefijos que no están en él
+        generan un aviso.
+        """
+        self.t_dispatch_ns = time.perf_counter_ns()
+        if self.reply_callback is not None and self.reply_callback(line):
+            return
+
+        if not self.prog_section.get_runing_state():
+            return
+
+        get_handler = self._token_handlers.get
+        for part in line.split():
+            prefix, _, value = part.partition(":")
+            handler = get_handler(prefix)
+            if handler is not None and value.isdigit():
+                handler(int(value), t_arrival_ns)
+            else:
+                self._count_other(prefix)
+
+    def process_batch(self, batch, t_arrival_ns: int = None):
+        """
+        Procesa un EventBatch (ver `main.core.batch_parser`): las líneas de
+        texto pasan primero por `reply_callback` y los eventos ya resueltos
+        `(dispositivo, valor, t_arrival_ns)` van directo a su manejador.
+        """
+        self.t_dispatch_ns = time.perf_counter_ns()
+        get_handler = self._token_handlers.get
+        running = self.prog_section.get_runing_state()
+        for line in batch.lines:
+            if self.reply_callback is not None and self.reply_callback(line):
+                continue
+            if not running:
+                continue
+            for part in line.split():
+                prefix, _, value = part.partition(":")
+                if get_handler(prefix) is None or not value.isdigit():
+                    self._count_other(prefix)   # los eventos de la línea ya están en batch.events
+
+        if not running:
+            return
+
+        handlers = self._record_handlers
+        for device, value, t in batch.events:
+            handler = handlers.get(device)
+            if handler is None:
+                self.logger.warning(f"unknow device id: {device}")
+                continue
+            handler(value, t)
+
+    def _count_other(self, prefix: str):
+        kind = RX_KINDS.get(prefix)
+        if kind is None or kind == MessageKind.EVENT:   # EVENT aquí = valor no numérico
+            self._count_unknown(prefix)
+        else:
+            self.other_tokens[kind] += 1
+
+    def _count_unknown(self, prefix: str):
+        self.unknown_tokens += 1
+        if prefix not in self._unknown_prefixes and len(self._unknown_prefixes) < self.MAX_UNKNOWN_PREFIXES:
+            # Solo se avisa la primera vez que aparece cada prefijo
+            self._unknown_prefixes.add(prefix)
+            self.logger.warning(f"unknow command prefix: {prefix}")
+
+    def get_stats(self) -> dict:
+        return {
+            **{f"{kind.value}_tokens": n for kind, n in self.other_tokens.items() if n},
+            "unknown_tokens": self.unknown_tokens,
+            "unknown_prefixes": sorted(self._unknown_prefixes),
+        }
+                
+        #----ACCIONES LUEGO DE PROCESAR ---------                
+    def _handle_palanca(self, key, value, t_arrival_ns: int = None):
+        """
+        Cuenta la respuesta si la palanca está activa y se la pasa a su
+        programa de refuerzo (`check_event_palanc(num, t_arrival_ns)`), que
+        decide si refuerza.
+        """
+        num = self._LEVERS.get(key)
+        if num is None:
+            return
+        modo = self.prog_section.get_pal1_mode() if num == 1 else self.prog_section.get_pal2_mode()
+        if modo in self._ACTIVE_MODES:
+            self.info_group.update_value(key, value, increment=True, t_arrival_ns=t_arrival_ns)
+            self.check_event_palanc(num, t_arrival_ns)
+
+    
+    def _handle_device_reinforcement(self, num, t_arrival_ns: int = None):
+        """El firmware ya dispensó: se cuenta como dispensa del host."""
+        self.info_group.update_value(IndicatorKey.DISPENSA_COUNT, 1, increment=True,
+                                     t_arrival_ns=t_arrival_ns)
+        if self.device_reinforcement_callback is not None:
+            self.device_reinforcement_callback(num)
+
+    def _handle_disp_food(self, value):
+        #self.logger.info(f"Comando DISP recibido: {value}")
+        if value.isdigit():
+            self.info_group.update_value(IndicatorKey.DISPENSA_COUNT, value, increment=True)
+            
+            # Agregar más comandos aquí
+    def _handle_recompensa_food(self, value, t_arrival_ns: int = None):
+        if value.isdigit():
+            self.info_group.update_value(IndicatorKey.RECONPENSA_COUNT  , value, increment=True,
+                                         t_arrival_ns=t_arrival_ns)
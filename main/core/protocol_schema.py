@@ -0,0 +1,135 @@
+"""
+Esquema del protocolo ASCII con la caja: cada mensaje se define una sola vez
+aquí y las tablas de parseo y codificación se arman al importar el módulo.
+
+Recepción (dispositivo -> host), una línea con tokens `PREFIJO:valor`:
+
+    P01:1  P02:1  L01:0  L02:1  IR1:1      eventos -> ProgramEngine
+    DISP:1  LED1:OFF  LED2:ON              eco de comandos del host
+    OK:DISP:1  ERROR:Command queue full    respuestas -> TxScheduler
+    BTN2:1  BTN3:1                         botones de la caja
+    R01:1  R02:1                           refuerzo decidido por el firmware
+    NEXT:1                                 pide más valores VR/VI (palanca 1)
+    ESP-ROM:esp32-...  rst:0x1 ...         arranque del ESP32
+
+Transmisión (host -> dispositivo): `LED1:ON|OFF`, `LED2:ON|OFF`, `DISP:n`,
+y para los programas en el firmware `SCHED:<modo1>,<v1>,<modo2>,<v2>` y
+`SEQ:<palanca>,<n1>,<n2>,...` (ver `main.core.schedule_offload`).
+
+Para agregar un mensaje del firmware basta con una fila en `RX_MESSAGES` o
+`TX_MESSAGES`; el motor, el parser por lotes y el planificador TX toman
+sus tablas de aquí.
+"""
+import re
+from collections import namedtuple
+from typing import Optional, Tuple
+
+from main.core.binary_protocol import DEV_L01, DEV_L02, DEV_P01, DEV_P02, DEV_IR1, DEV_R01, DEV_R02
+from main.enums.protocol_enums import MessageKind, TxPriority
+
+# ----------------------------
+# Definición
+# ----------------------------
+RxMessage = namedtuple('RxMessage', 'prefix kind device')
+TxMessage = namedtuple('TxMessage', 'name prefix values priority coalesce')
+
+RX_MESSAGES = (
+    RxMessage("L01", MessageKind.EVENT, DEV_L01),
+    RxMessage("L02", MessageKind.EVENT, DEV_L02),
+    RxMessage("P01", MessageKind.EVENT, DEV_P01),
+    RxMessage("P02", MessageKind.EVENT, DEV_P02),
+    RxMessage("IR1", MessageKind.EVENT, DEV_IR1),
+    RxMessage("R01", MessageKind.EVENT, DEV_R01),
+    RxMessage("R02", MessageKind.EVENT, DEV_R02),
+    RxMessage("DISP", MessageKind.ECHO, None),
+    RxMessage("LED1", MessageKind.ECHO, None),
+    RxMessage("LED2", MessageKind.ECHO, None),
+    RxMessage("SCHED", MessageKind.ECHO, None),
+    RxMessage("SEQ", MessageKind.ECHO, None),
+    RxMessage("NEXT", MessageKind.REQUEST, None),
+    RxMessage("OK", MessageKind.OK, None),
+    RxMessage("ERROR", MessageKind.ERROR, None),
+    RxMessage("BTN2", MessageKind.BUTTON, None),
+    RxMessage("BTN3", MessageKind.BUTTON, None),
+    RxMessage("ESP-ROM", MessageKind.BOOT, None),
+    RxMessage("rst", MessageKind.BOOT, None),
+    RxMessage("configsip", MessageKind.BOOT, None),
+    RxMessage("clk_drv", MessageKind.BOOT, None),
+    RxMessage("mode", MessageKind.BOOT, None),
+    RxMessage("load", MessageKind.BOOT, None),
+    RxMessage("entry", MessageKind.BOOT, None),
+)
+
+# values: None = entero >= 0; tupla = valores permitidos; LIST = enteros/códigos separados por coma
+LIST = "list"
+
+TX_MESSAGES = (
+    TxMessage("led1", "LED1", ("ON", "OFF"), TxPriority.LED, True),
+    TxMessage("led2", "LED2", ("ON", "OFF"), TxPriority.LED, True),
+    TxMessage("dispense", "DISP", None, TxPriority.REWARD, False),
+    TxMessage("schedule", "SCHED", LIST, TxPriority.CONTROL, False),
+    TxMessage("sequence", "SEQ", LIST, TxPriority.CONTROL, False),
+)
+
+# ----------------------------
+# Tablas generadas
+# ----------------------------
+# Prefijo -> código de dispositivo de los eventos (str y bytes)
+EVENT_DEVICES = {m.prefix: m.device for m in RX_MESSAGES if m.kind == MessageKind.EVENT}
+EVENT_DEVICES_BYTES = {prefix.encode(): device for prefix, device in EVENT_DEVICES.items()}
+# Prefijo -> tipo de mensaje de todo lo que puede llegar
+RX_KINDS = {m.prefix: m.kind for m in RX_MESSAGES}
+
+# Expresión de los tokens de evento para el parser por lotes
+EVENT_PREFIX_PATTERN = b"|".join(re.escape(p) for p in EVENT_DEVICES_BYTES)
+
+OK_PREFIX = "OK:"
+ERROR_PREFIX = "ERROR:"
+
+TX_BY_NAME = {m.name: m for m in TX_MESSAGES}
+TX_BY_PREFIX = {m.prefix: m for m in TX_MESSAGES}
+
+
+def classify(line: str) -> MessageKind:
+    """Tipo de una línea recibida según el prefijo de su primer token."""
+    return RX_KINDS.get(line.partition(":")[0].strip(), MessageKind.UNKNOWN)
+
+
+def encode(name: str, value) -> str:
+    """Arma un comando del host: encode("led1", "ON") -> "LED1:ON"."""
+    spec = TX_BY_NAME[name]
+    text = str(value)
+    if spec.values is None:
+        if not text.isdigit():
+            raise ValueError(f"{spec.prefix} espera un entero, no {value!r}")
+    elif spec.values == LIST:
+        if not all(item.isalnum() for item in text.split(",")):
+            raise ValueError(f"{spec.prefix} espera una lista separada por comas, no {value!r}")
+    elif text not in spec.values:
+        raise ValueError(f"{spec.prefix} acepta {spec.values}, no {value!r}")
+    return f"{spec.prefix}:{text}"
+
+
+def led_command(num: int, on: bool) -> str:
+    return encode(f"led{num}", "ON" if on else "OFF")
+
+
+def dispense_command(count: int = 1) -> str:
+    return encode("dispense", count)
+
+
+def decode_command(command: str) -> Tuple[Optional[TxMessage], str]:
+    """
+    Separa un comando del host en (mensaje del esquema, valor);
+    (None, texto) si no está en el esquema.
+    """
+    prefix, _, value = command.strip().partition(":")
+    return TX_BY_PREFIX.get(prefix), value
+
+
+def tx_route(command: str) -> Tuple[TxPriority, Optional[str]]:
+    """(prioridad, clave de fusión) con que el TxScheduler encola un comando."""
+    spec = TX_BY_PREFIX.get(command.partition(":")[0])
+    if spec is None:
+        return TxPriority.CONTROL, None
+    return spec.priority, spec.prefix if spec.coalesce else None
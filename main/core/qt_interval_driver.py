@@ -0,0 +1,36 @@
+import math
+from typing import Optional
+
+from PyQt6.QtCore import QObject, QTimer, Qt
+
+from main.core.interval_scheduler import IntervalScheduler
+
+
+class QtIntervalDriver(QObject):
+    """
+    Despierta un IntervalScheduler con un único QTimer de precisión armado
+    al plazo más próximo (redondeado hacia arriba al milisegundo). Si Qt
+    despierta antes de tiempo, `run_due()` no dispara nada y se vuelve a
+    armar con lo que falta.
+    """
+
+    def __init__(self, scheduler: IntervalScheduler = None, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._timer.timeout.connect(self._on_timeout)
+
+        self.scheduler = scheduler or IntervalScheduler()
+        self.scheduler.on_rearm = self.arm
+        self.arm(self.scheduler.next_deadline())
+
+    def arm(self, deadline: Optional[float]) -> None:
+        if deadline is None:
+            self._timer.stop()
+            return
+        delay_ms = math.ceil((deadline - self.scheduler.clock()) * 1000)
+        self._timer.start(max(0, delay_ms))
+
+    def _on_timeout(self) -> None:
+        self.scheduler.run_due()
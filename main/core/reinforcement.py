@@ -0,0 +1,292 @@
+"""
+Programas de refuerzo (CRF, FR, VR, FI, VI) sin dependencias de widgets.
+
+Cada palanca tiene su propio objeto de programa con sus contadores y el
+umbral del próximo refuerzo; `on_response()` es O(1) y devuelve True
+cuando corresponde reforzar. El mismo código sirve para el panel de
+control, la sesión headless o N palancas/cámaras:
+
+    schedules = LeverSchedules()
+    schedules.configure(1, ModoPalanca.FR, 5)
+    schedules.start()
+    if schedules.on_response(1):
+        send(dispense_command())
+
+Criterios (los usuales del análisis experimental de la conducta):
+  - CRF: cada respuesta se refuerza.
+  - FR n / VR n: se refuerza la respuesta que completa n respuestas desde el
+    último refuerzo (en VR, n se sortea alrededor de la media).
+  - FI t / VI t: se refuerza la primera respuesta emitida cuando pasaron t
+    segundos desde el último refuerzo (o desde el inicio); en VI, t se sortea.
+
+Con un `IntervalScheduler` (`timer`), FI/VI además arman su plazo absoluto
+y marcan el paso a "disponible" en el instante exacto (`on_available`).
+
+El reloj por omisión es `time.perf_counter`, el mismo con que los lectores
+estampan `t_arrival_ns`: `on_response(t_arrival_ns=...)` evalúa la
+respuesta en el instante en que llegó, no cuando se procesa (una respuesta
+que llegó antes del plazo FI/VI pero se procesa después, p. ej. en un
+lote, no se refuerza).
+
+VR/VI toman sus valores de una `IntervalSequence` (Fleshler-Hoffman,
+precalculada con NumPy); con `LeverSchedules.new_seed()` la semilla queda
+en los metadatos de la sesión y la secuencia se puede reproducir.
+"""
+import time
+from typing import Callable, Dict, Optional
+
+from main.core.interval_scheduler import IntervalScheduler
+from main.core.mean_generator import IntervalSequence, new_seed
+from main.enums.program_enums import ModoPalanca
+
+Clock = Callable[[], float]
+IntervalSource = Callable[[], float]
+
+
+class ReinforcementSchedule:
+    """Base: sin refuerzo (EXTINCIÓN / INHABILITADO)."""
+    mode: Optional[ModoPalanca] = None
+
+    def __init__(self, value: int = 1, clock: Clock = time.perf_counter):
+        self.value = max(1, int(value))
+        self.clock = clock
+        self.responses = 0          # respuestas de la sesión
+        self.reinforcements = 0     # refuerzos entregados
+        self.t_start = 0.0
+        self.t_last_reinforcement = 0.0
+        self.on_available: Optional[Callable[["ReinforcementSchedule", float], None]] = None
+
+    def start(self, now: float = None) -> None:
+        now = self.clock() if now is None else now
+        self.responses = 0
+        self.reinforcements = 0
+        self.t_start = self.t_last_reinforcement = now
+        self._arm(now)
+
+    def on_response(self, now: float = None, t_arrival_ns: int = None) -> bool:
+        self.responses += 1
+        return False
+
+    def _now(self, now: Optional[float], t_arrival_ns: Optional[int]) -> float:
+        if now is not None:
+            return now
+        if t_arrival_ns is not None:
+            return t_arrival_ns / 1e9
+        return self.clock()
+
+    def stop(self) -> None:
+        """Cancela los plazos pendientes (fin de sesión)."""
+
+    def _arm(self, now: float) -> None:
+        """Calcula el umbral del próximo refuerzo."""
+
+    def _reinforce(self, now: float) -> bool:
+        self.reinforcements += 1
+        self.t_last_reinforcement = now
+        self._arm(now)
+        return True
+
+    @property
+    def threshold(self):
+        """Umbral actual (respuestas o instante), para mostrar o registrar."""
+        return None
+
+    def get_stats(self) -> dict:
+        return {
+            "mode": self.mode.value if self.mode else None,
+            "value": self.value,
+            "responses": self.responses,
+            "reinforcements": self.reinforcements,
+            "threshold": self.threshold,
+        }
+
+
+class ContinuousSchedule(ReinforcementSchedule):
+    mode = ModoPalanca.CRF
+
+    def on_response(self, now: float = None, t_arrival_ns: int = None) -> bool:
+        self.responses += 1
+        return self._reinforce(self._now(now, t_arrival_ns))
+
+
+class RatioSchedule(ReinforcementSchedule):
+    """FR: `value` respuestas por refuerzo."""
+    mode = ModoPalanca.FR
+
+    def __init__(self, value: int = 1, clock: Clock = time.perf_counter):
+        super().__init__(value, clock)
+        self._count = 0          # respuestas desde el último refuerzo
+        self._required = self.value
+
+    def _next_requirement(self) -> int:
+        return self.value
+
+    def _arm(self, now: float) -> None:
+        self._count = 0
+        self._required = self._next_requirement()
+
+    def on_response(self, now: float = None, t_arrival_ns: int = None) -> bool:
+        self.responses += 1
+        self._count += 1
+        if self._count >= self._required:
+            return self._reinforce(self._now(now, t_arrival_ns))
+        return False
+
+    @property
+    def threshold(self):
+        return self._required
+
+
+class VariableRatioSchedule(RatioSchedule):
+    mode = ModoPalanca.VR
+
+    def __init__(self, value: int = 1, clock: Clock = time.perf_counter,
+                 interval_source: IntervalSource = None):
+        self._source = interval_source or IntervalSequence(max(1, int(value)), integer=True)
+        super().__init__(value, clock)
+
+    def _next_requirement(self) -> int:
+        return self._source()
+
+
+class IntervalSchedule(ReinforcementSchedule):
+    """FI: primera respuesta tras `value` segundos desde el último refuerzo."""
+    mode = ModoPalanca.FI
+
+    def __init__(self, value: int = 1, clock: Clock = time.perf_counter,
+                 timer: IntervalScheduler = None):
+        super().__init__(value, clock)
+        self.timer = timer
+        self.available = False
+        self._available_at = 0.0
+        self._handle = None
+
+    def _next_interval(self) -> float:
+        return self.value
+
+    def _arm(self, now: float) -> None:
+        self._available_at = now + self._next_interval()
+        self.available = False
+        if self.timer is not None:
+            self.timer.cancel(self._handle)
+            self._handle = self.timer.call_at(self._available_at, self._interval_elapsed)
+
+    def _interval_elapsed(self, deadline: float) -> None:
+        self._handle = None
+        self.available = True
+        if self.on_available is not None:
+            self.on_available(self, deadline)
+
+    def stop(self) -> None:
+        if self.timer is not None:
+            self.timer.cancel(self._handle)
+        self._handle = None
+
+    def on_response(self, now: float = None, t_arrival_ns: int = None) -> bool:
+        self.responses += 1
+        now = self._now(now, t_arrival_ns)
+        if now >= self._available_at:
+            return self._reinforce(now)
+        return False
+
+    def is_available(self, now: float = None) -> bool:
+        """True si la próxima respuesta será reforzada."""
+        return (self.clock() if now is None else now) >= self._available_at
+
+    @property
+    def threshold(self):
+        return self._available_at - self.t_start
+
+
+class VariableIntervalSchedule(IntervalSchedule):
+    mode = ModoPalanca.VI
+
+    def __init__(self, value: int = 1, clock: Clock = time.perf_counter,
+                 timer: IntervalScheduler = None, interval_source: IntervalSource = None):
+        self._source = interval_source or IntervalSequence(max(1, int(value)))
+        super().__init__(value, clock, timer)
+
+    def _next_interval(self) -> float:
+        return self._source()
+
+
+_SCHEDULES = {
+    ModoPalanca.CRF: ContinuousSchedule,
+    ModoPalanca.FR: RatioSchedule,
+    ModoPalanca.VR: VariableRatioSchedule,
+    ModoPalanca.FI: IntervalSchedule,
+    ModoPalanca.VI: VariableIntervalSchedule,
+}
+
+
+def create_schedule(mode: ModoPalanca, value: int = 1, clock: Clock = time.perf_counter,
+                    interval_source: IntervalSource = None,
+                    timer: IntervalScheduler = None) -> ReinforcementSchedule:
+    """Programa para un modo de palanca; EXTINCIÓN/INHABILITADO no refuerzan."""
+    cls = _SCHEDULES.get(mode, ReinforcementSchedule)
+    kwargs = {}
+    if issubclass(cls, IntervalSchedule):
+        kwargs["timer"] = timer
+    if interval_source is not None and cls in (VariableRatioSchedule, VariableIntervalSchedule):
+        kwargs["interval_source"] = interval_source
+    schedule = cls(value, clock, **kwargs)
+    schedule.mode = mode
+    return schedule
+
+
+class LeverSchedules:
+    """
+    Un programa por palanca (1..N) con el mismo reloj y, opcionalmente, el
+    mismo IntervalScheduler; `on_available(lever, deadline)` avisa cuando
+    un FI/VI queda disponible. Con `seed` (ver `new_seed`), las secuencias
+    VR/VI de cada palanca salen de `(seed, palanca)` y son reproducibles.
+    """
+
+    def __init__(self, clock: Clock = time.perf_counter, timer: IntervalScheduler = None,
+                 on_available: Callable[[int, float], None] = None):
+        self.clock = timer.clock if timer is not None else clock
+        self.timer = timer
+        self.on_available = on_available
+        self.schedules: Dict[int, ReinforcementSchedule] = {}
+        self.seed: Optional[int] = None
+
+    def new_seed(self, seed: int = None) -> int:
+        """Fija la semilla de la sesión (una nueva si no se indica) y la devuelve."""
+        self.seed = new_seed() if seed is None else int(seed)
+        return self.seed
+
+    def configure(self, lever: int, mode: ModoPalanca, value: int = 1,
+                  interval_source: IntervalSource = None) -> ReinforcementSchedule:
+        previous = self.schedules.get(lever)
+        if previous is not None:
+            previous.stop()
+        if interval_source is None and self.seed is not None and mode in (ModoPalanca.VR, ModoPalanca.VI):
+            interval_source = IntervalSequence(max(1, int(value)), integer=mode == ModoPalanca.VR,
+                                               seed=[self.seed, lever])
+        schedule = create_schedule(mode, value, self.clock, interval_source, self.timer)
+        schedule.on_available = lambda _s, deadline: self._available(lever, deadline)
+        self.schedules[lever] = schedule
+        return schedule
+
+    def _available(self, lever: int, deadline: float) -> None:
+        if self.on_available is not None:
+            self.on_available(lever, deadline)
+
+    def get(self, lever: int) -> Optional[ReinforcementSchedule]:
+        return self.schedules.get(lever)
+
+    def start(self, now: float = None) -> None:
+        now = self.clock() if now is None else now
+        for schedule in self.schedules.values():
+            schedule.start(now)
+
+    def on_response(self, lever: int, now: float = None, t_arrival_ns: int = None) -> bool:
+        schedule = self.schedules.get(lever)
+        return schedule is not None and schedule.on_response(now, t_arrival_ns)
+
+    def stop(self) -> None:
+        for schedule in self.schedules.values():
+            schedule.stop()
+
+    def get_stats(self) -> Dict[int, dict]:
+        return {lever: schedule.get_stats() for lever, schedule in self.schedules.items()}
@@ -0,0 +1,231 @@
+"""
+Programas de refuerzo ejecutados en el firmware.
+
+En modo `ScheduleSite.DEVICE` el host compila la configuración de las
+palancas (`ProgramControlBox.get_program_config()`) en una línea compacta y
+el microcontrolador decide cada refuerzo localmente; el PC solo registra y
+muestra. Protocolo (ASCII, ver `protocol_schema`):
+
+    host -> disp.  SCHED:FR,5,OFF,0          modo y valor de cada palanca
+                   SEQ:1,3,7,1,...           valores VR (respuestas) o VI (ms)
+    disp. -> host  OK:SCHED:FR,5,OFF,0       el firmware toma el programa
+                   R01:1                     refuerzo entregado en la palanca 1
+                   NEXT:1                    quedan pocos valores: enviar otro bloque
+
+Las secuencias VR/VI son las mismas `IntervalSequence` (semilla de la
+sesión) que usa el host; se envían por bloques de FH_STEPS y el firmware
+pide el siguiente con `NEXT:<palanca>`. Si el firmware no confirma el
+`SCHED` a tiempo (o responde `ERROR:`), el host sigue decidiendo como antes.
+
+`DeviceSchedules` es la referencia de lo que hace el firmware, con los
+mismos objetos de `main.core.reinforcement`; la usa el firmware simulado
+de las pruebas.
+"""
+import time
+from collections import deque
+from typing import Callable, Dict, Optional, Tuple
+
+from main.core import protocol_schema as protocol
+from main.core.mean_generator import IntervalSequence, FH_STEPS
+from main.core.protocol_schema import OK_PREFIX, ERROR_PREFIX
+from main.core.reinforcement import create_schedule, ReinforcementSchedule
+from main.enums.program_enums import ModoPalanca
+
+LEVERS = (1, 2)
+
+# Modo -> código del firmware
+MODE_CODES = {
+    ModoPalanca.CRF: "CRF",
+    ModoPalanca.FR: "FR",
+    ModoPalanca.VR: "VR",
+    ModoPalanca.FI: "FI",
+    ModoPalanca.VI: "VI",
+    ModoPalanca.EXTINCION: "EXT",
+    ModoPalanca.INHABILITADO: "OFF",
+}
+CODE_MODES = {code: mode for mode, code in MODE_CODES.items()}
+_VARIABLE = (ModoPalanca.VR, ModoPalanca.VI)
+
+STOP_COMMAND = protocol.encode("schedule", "OFF,0,OFF,0")
+NEXT_PREFIX = "NEXT:"
+
+
+def compile_schedules(config: dict) -> Tuple[str, Dict[int, Tuple[ModoPalanca, int]]]:
+    """
+    `get_program_config()` -> (comando SCHED, {palanca: (modo, valor)}).
+    Acepta los valores del enum (`pal_1c`) tal como los guarda la sesión.
+    """
+    levers = {}
+    fields = []
+    for lever in LEVERS:
+        mode = ModoPalanca(config[f"pal_{lever}c"])
+        value = max(1, int(config[f"pal_{lever}v"]))
+        levers[lever] = (mode, value)
+        fields += [MODE_CODES[mode], str(value)]
+    return protocol.encode("schedule", ",".join(fields)), levers
+
+
+def sequence_command(lever: int, values) -> str:
+    return protocol.encode("sequence", ",".join(str(int(v)) for v in (lever, *values)))
+
+
+class ScheduleOffload:
+    """
+    Lado host: envía el programa compilado, sigue la confirmación del
+    firmware y le va pasando los bloques VR/VI que pide. `active` es True
+    desde que llega `OK:SCHED:...`; mientras tanto decide el host.
+    """
+
+    def __init__(self, send: Callable[[str], None], logger=None,
+                 ack_timeout_s: float = 0.5, clock: Callable[[], float] = time.monotonic):
+        self.send = send
+        self.logger = logger
+        self.ack_timeout_s = ack_timeout_s
+        self.clock = clock
+        self.active = False
+        self.pending = False
+        self.confirmed = False      # el firmware tomó el último programa enviado
+        self.command: Optional[str] = None
+        self._t_sent = 0.0
+        self._sequences: Dict[int, Tuple[IntervalSequence, bool]] = {}
+        self.stats = {"pushed": 0, "blocks_sent": 0, "fallbacks": 0}
+
+    def push(self, config: dict, seed: int = None) -> str:
+        """Compila y envía el programa (y los dos primeros bloques VR/VI)."""
+        self.command, levers = compile_schedules(config)
+        self._sequences.clear()
+        for lever, (mode, value) in levers.items():
+            if mode in _VARIABLE:
+                vi = mode == ModoPalanca.VI
+                sequence = IntervalSequence(value, integer=not vi,
+                                            seed=None if seed is None else [seed, lever])
+                self._sequences[lever] = (sequence, vi)
+
+        self.active = False
+        self.confirmed = False
+        self.pending = True
+        self._t_sent = self.clock()
+        self.send(self.command)
+        for lever in self._sequences:
+            self._send_block(lever, 2 * FH_STEPS)
+        self.stats["pushed"] += 1
+        return self.command
+
+    def stop(self) -> None:
+        """Fin de sesión: el firmware deja de reforzar."""
+        if self.active or self.pending:
+            self.send(STOP_COMMAND)
+        self.active = False
+        self.pending = False
+
+    def on_device_line(self, line: str) -> bool:
+        """
+        Mira las respuestas del firmware. Devuelve True solo si la línea
+        era para el offload (NEXT:n); los OK:/ERROR: siguen hacia el TxScheduler.
+        """
+        if line.startswith(NEXT_PREFIX):
+            lever = line[len(NEXT_PREFIX):].strip()
+            if lever.isdigit() and int(lever) in self._sequences and self.active:
+                self._send_block(int(lever), FH_STEPS)
+            return True
+        acked = line.startswith(OK_PREFIX) and line[len(OK_PREFIX):].strip() == self.command
+        if not self.pending:
+            if acked and not self.active:
+                self.send(STOP_COMMAND)     # confirmó tarde: ya decide el host, se lo desactiva
+            return False
+        if acked:
+            self.pending = False
+            self.active = self.confirmed = True
+            self._log("info", f"Programa en el firmware: {self.command}")
+        elif line.startswith(ERROR_PREFIX):
+            self._fallback(line)
+        return False
+
+    def check_timeout(self, now: float = None) -> bool:
+        """Sin confirmación en `ack_timeout_s`: decide el host. True si hubo fallback."""
+        now = self.clock() if now is None else now
+        if self.pending and now - self._t_sent >= self.ack_timeout_s:
+            self._fallback("sin respuesta")
+            return True
+        return False
+
+    def _fallback(self, reason: str) -> None:
+        self.pending = False
+        self.active = False
+        self.stats["fallbacks"] += 1
+        self._log("warning", f"El firmware no tomó {self.command} ({reason}); decide el host")
+
+    def _send_block(self, lever: int, count: int) -> None:
+        sequence, in_ms = self._sequences[lever]
+        values = [sequence() for _ in range(count)]
+        if in_ms:
+            values = [round(v * 1000) for v in values]
+        self.send(sequence_command(lever, values))
+        self.stats["blocks_sent"] += 1
+
+    def _log(self, level: str, msg: str) -> None:
+        if self.logger is not None:
+            getattr(self.logger, level)(msg)
+
+    def get_stats(self) -> dict:
+        return {**self.stats, "active": self.active, "confirmed": self.confirmed}
+
+
+class DeviceSchedules:
+    """
+    Referencia del lado firmware: interpreta SCHED/SEQ y decide con los
+    mismos programas de `main.core.reinforcement`. `on_press(lever)` devuelve
+    (dispensar, pedido): pedido es la línea NEXT:n que el firmware debe
+    enviar cuando le queda un bloque o menos de valores, o None.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self.schedules: Dict[int, ReinforcementSchedule] = {}
+        self._queues: Dict[int, deque] = {}
+        self._requested: Dict[int, bool] = {}
+        self._waiting = set()       # palancas VR/VI que esperan su primer SEQ
+
+    def load(self, command: str) -> None:
+        """`SCHED:...` -> un programa por palanca (arranca en este instante)."""
+        fields = command.partition(":")[2].split(",")
+        self.schedules.clear()
+        self._queues.clear()
+        self._requested.clear()
+        self._waiting.clear()
+        now = self.clock()
+        for i, lever in enumerate(LEVERS):
+            mode, value = CODE_MODES[fields[2 * i]], int(fields[2 * i + 1])
+            source = None
+            if mode in _VARIABLE:
+                queue = self._queues[lever] = deque()
+                scale = 1000.0 if mode == ModoPalanca.VI else 1
+                source = lambda q=queue, k=scale: (q.popleft() if q else 1) / k
+                self._waiting.add(lever)
+            self.schedules[lever] = create_schedule(mode, value, self.clock, interval_source=source)
+            if lever not in self._waiting:
+                self.schedules[lever].start(now)
+
+    def add_values(self, command: str) -> None:
+        """`SEQ:<palanca>,n1,n2,...`: agrega valores; arranca la palanca al llegar el primero."""
+        lever, *values = (int(v) for v in command.partition(":")[2].split(","))
+        queue = self._queues.get(lever)
+        if queue is None:
+            return
+        queue.extend(values)
+        self._requested[lever] = False
+        if lever in self._waiting:
+            self._waiting.discard(lever)
+            self.schedules[lever].start(self.clock())
+
+    def on_press(self, lever: int) -> Tuple[bool, Optional[str]]:
+        schedule = self.schedules.get(lever)
+        reinforce = schedule is not None and schedule.on_response(self.clock())
+        return reinforce, self.pending_request(lever)
+
+    def pending_request(self, lever: int) -> Optional[str]:
+        queue = self._queues.get(lever)
+        if queue is not None and len(queue) <= FH_STEPS and not self._requested.get(lever):
+            self._requested[lever] = True
+            return f"{NEXT_PREFIX}{lever}"
+        return None
@@ -0,0 +1,147 @@
+import time
+from typing import Optional, Any, List, Tuple
+
+from PyQt6.QtCore import QObject, QThread, QTimer, pyqtSignal, pyqtSlot, QIODevice, Qt
+from PyQt6.QtSerialPort import QSerialPort
+
+from main.core.batch_parser import create_decoder
+from main.enums.program_enums import ParseMode
+
+
+class SerialIOWorker(QObject):
+    """
+    Dueño de un QSerialPort que vive en un QThread de E/S.
+    Lee los bytes, los separa en líneas (o tramas binarias), les pone el
+    tiempo de llegada (perf_counter_ns) y entrega el resultado al hilo de la
+    GUI en lotes, como máximo una vez cada `batch_interval_ms`.
+    """
+    lines_ready = pyqtSignal(list, str)      # [(línea | BinaryRecord | EventBatch, t_arrival_ns)], puerto
+    data_sent = pyqtSignal(bytes, str)       # datos, puerto
+    port_opened = pyqtSignal(bool, str)      # éxito, puerto
+    port_closed = pyqtSignal(str)            # puerto
+    port_error = pyqtSignal(object, str)     # QSerialPort.SerialPortError, puerto
+    write_failed = pyqtSignal(str, str)      # mensaje, puerto
+
+    def __init__(self, batch_interval_ms: int = 10, parse_mode: ParseMode = ParseMode.LINE):
+        super().__init__()
+        self.serial: Optional[QSerialPort] = None
+        self.port_name: str = ""
+        self.batch_interval_ms = batch_interval_ms
+
+        self.decoder = create_decoder(parse_mode)
+        self._batch: List[Tuple[Any, int]] = []
+        self._last_flush_ns = 0
+        self._flush_timer: Optional[QTimer] = None
+
+    # ----------------------------
+    # Slots (se ejecutan en el hilo de E/S)
+    # ----------------------------
+    @pyqtSlot(str, dict)
+    def open_port(self, port_name: str, config: dict):
+        if self.serial is None:
+            self.serial = QSerialPort()
+            self.serial.readyRead.connect(self._handle_ready_read)
+            self.serial.errorOccurred.connect(self._handle_error)
+
+            self._flush_timer = QTimer()
+            self._flush_timer.setSingleShot(True)
+            self._flush_timer.setTimerType(Qt.TimerType.PreciseTimer)
+            self._flush_timer.timeout.connect(self._flush)
+
+        if self.serial.isOpen():
+            self.close_port()
+
+        self.serial.setPortName(port_name)
+        self.port_name = port_name
+        self.decoder.reset()
+        self._batch.clear()
+
+        self.serial.setBaudRate(config['baud_rate'])
+        self.serial.setDataBits(config['data_bits'])
+        self.serial.setParity(config['parity'])
+        self.serial.setStopBits(config['stop_bits'])
+        self.serial.setFlowControl(config['flow_control'])
+
+        ok = self.serial.open(QIODevice.OpenModeFlag.ReadWrite)
+        if not ok:
+            self.serial.close()
+        self.port_opened.emit(ok, port_name)
+
+    @pyqtSlot()
+    def close_port(self):
+        if self.serial and self.serial.isOpen():
+            port_name = self.port_name
+            self._flush()
+            self.serial.close()
+            self.port_name = ""
+            self.port_closed.emit(port_name)
+
+    @pyqtSlot()
+    def start_binary_negotiation(self):
+        """Pide el protocolo binario; el decodificador espera la respuesta."""
+        self.write(self.decoder.start_negotiation())
+
+    @pyqtSlot(bytes)
+    def write(self, data: bytes):
+        if not self.serial or not self.serial.isOpen():
+            return
+
+        bytes_written = self.serial.write(data)
+        if bytes_written == -1:
+            self.write_failed.emit("Error al escribir datos", self.port_name)
+        elif bytes_written == len(data):
+            self.data_sent.emit(data, self.port_name)
+        else:
+            self.write_failed.emit(
+                f"Datos enviados parcialmente ({bytes_written}/{len(data)})",
+                self.port_name
+            )
+
+    # ----------------------------
+    # Recepción
+    # ----------------------------
+    def _handle_ready_read(self):
+        if not self.serial or not self.serial.isOpen():
+            return
+
+        t_arrival_ns = time.perf_counter_ns()
+        self._batch.extend(self.decoder.feed(self.serial.readAll().data(), t_arrival_ns))
+
+        self._schedule_flush(t_arrival_ns)
+
+    def _schedule_flush(self, now_ns: int):
+        """Entrega inmediata si ya pasó el intervalo; si no, agrupa hasta que venza."""
+        if not self._batch or self._flush_timer.isActive():
+            return
+
+        wait_ms = self.batch_interval_ms - (now_ns - self._last_flush_ns) // 1_000_000
+        if wait_ms <= 0:
+            self._flush()
+        else:
+            self._flush_timer.start(int(wait_ms))
+
+    def _flush(self):
+        if not self._batch:
+            return
+        batch, self._batch = self._batch, []
+        self._last_flush_ns = time.perf_counter_ns()
+        self.lines_ready.emit(batch, self.port_name)
+
+    def _handle_error(self, error):
+        if error == QSerialPort.SerialPortError.NoError:
+            return
+
+        self.port_error.emit(error, self.port_name)
+
+        # Cerrar automáticamente en errores críticos
+        if error in (QSerialPort.SerialPortError.ResourceError,
+                     QSerialPort.SerialPortError.DeviceNotFoundError):
+            self.close_port()
+
+
+def create_io_thread(name: str = "serial-io") -> QThread:
+    """Crea e inicia un hilo de E/S que puede compartirse entre varios puertos."""
+    thread = QThread()
+    thread.setObjectName(name)
+    thread.start()
+    return thread
@@ -1,17 +1,41 @@
+import time
 from typing import Optional, Dict, Any
-from PyQt6.QtCore import QObject, QTimer, pyqtSignal, QIODevice
-from PyQt6.QtSerialPort import QSerialPort, QSerialPortInfo
+from PyQt6.QtCore import QObject, QTimer, QThread, pyqtSignal, QIODevice, QMetaObject, Qt
+from PyQt6.QtSerialPort import QSerialPort
+
+from main.core.serial_io_thread import SerialIOWorker, create_io_thread
+from main.core.port_discovery import PortDiscovery
+from main.enums.program_enums import ParseMode
 
 class SerialManager(QObject):
     """
     Gestor avanzado de comunicación serial usando QtSerialPort.
     Optimizado para minimizar uso de CPU y memoria.
+
+    Con `threaded=True` el QSerialPort vive en un hilo de E/S (propio o
+    compartido vía `io_thread`) y las líneas llegan en lotes por
+    `lines_received` en lugar de `data_received`. Con
+    `parse_mode=ParseMode.BATCH` cada lectura llega como un solo EventBatch
+    (ver `main.core.batch_parser`).
+
+    La lista de puertos viene del servicio compartido `PortDiscovery`
+    (caché + eventos de /dev), no de un escaneo propio.
+
+    Reconexión: si el puerto se cae sin que se haya pedido cerrarlo, se
+    emite `link_down` (no `connection_changed`) y se reintenta abrirlo con
+    espera exponencial, buscando el adaptador por VID:PID:serie por si
+    vuelve con otro nombre. Al lograrlo se emite `link_restored`; si se
+    agotan los intentos se emite `connection_changed(False)` como siempre.
     """
     data_received = pyqtSignal(bytes, str)   # datos, puerto
+    lines_received = pyqtSignal(list, str)   # [(línea | BinaryRecord | EventBatch, t_arrival_ns)], puerto
     data_sent = pyqtSignal(bytes, str)       # datos, puerto
     error_occurred = pyqtSignal(str, str)    # mensaje, puerto
     connection_changed = pyqtSignal(bool, str)  # estado, puerto
     ports_updated = pyqtSignal(list)         # lista de puertos
+    link_down = pyqtSignal(str)              # puerto caído, se intentará reconectar
+    reconnecting = pyqtSignal(str, int, int) # puerto, intento, espera (ms)
+    link_restored = pyqtSignal(str, float)   # puerto, duración del corte (s)
 
     # Configuración por defecto (formato correcto para PyQt6)
     DEFAULT_SETTINGS = {
@@ -34,45 +58,116 @@ class SerialManager(QObject):
         QSerialPort.SerialPortError.NotOpenError: "Dispositivo no abierto"
     }
 
-    def __init__(self):
+    # Peticiones al worker de E/S (conexión encolada entre hilos)
+    _open_requested = pyqtSignal(str, dict)
+    _close_requested = pyqtSignal()
+    _write_requested = pyqtSignal(bytes)
+    _binary_requested = pyqtSignal()
+
+    def __init__(self, threaded: bool = False, io_thread: Optional[QThread] = None,
+                 batch_interval_ms: int = 10, discovery: Optional[PortDiscovery] = None,
+                 auto_reconnect: bool = True, max_reconnect_attempts: int = 20,
+                 reconnect_initial_ms: int = 200, reconnect_max_ms: int = 5000,
+                 parse_mode: ParseMode = ParseMode.LINE):
         super().__init__()
         self.serial: Optional[QSerialPort] = None
         self.port_name: str = ""
-        self._last_ports = []
+        self._settings: Dict[str, Any] = dict(self.DEFAULT_SETTINGS)
+
+        # Política de reconexión
+        self.auto_reconnect = auto_reconnect
+        self.max_reconnect_attempts = max_reconnect_attempts
+        self.reconnect_initial_ms = reconnect_initial_ms
+        self.reconnect_max_ms = reconnect_max_ms
+        self._close_requested_by_user = False
+        self._link_down_port = ""           # puerto caído ("" = enlace normal)
+        self._link_identity: Optional[str] = None
+        self._link_listed = False           # el puerto aparecía en PortDiscovery al abrirlo
+        self._link_down_since_ns = 0
+        self._reconnect_attempt = 0
+        self._reconnect_timer = QTimer(self)
+        self._reconnect_timer.setSingleShot(True)
+        self._reconnect_timer.timeout.connect(self._attempt_reconnect)
+
+        self.threaded = threaded or io_thread is not None
+        self._io_worker: Optional[SerialIOWorker] = None
+        self._io_thread: Optional[QThread] = None
+        self._owns_io_thread = False
+        self._io_connected = False
+        self._expected_closes = 0           # cierres pedidos al worker aún sin confirmar
+        if self.threaded:
+            self._setup_io_worker(io_thread, batch_interval_ms, parse_mode)
 
-        self._scan_timer = QTimer()
-        self._scan_timer.timeout.connect(self.scan_ports)
-        self._scan_timer.start(2000)
+        self.discovery = discovery or PortDiscovery.instance()
+        self.discovery.ports_changed.connect(self.ports_updated)
+        self.discovery.port_added.connect(self._on_port_added)
 
-    def __del__(self):
+    def _setup_io_worker(self, io_thread: Optional[QThread], batch_interval_ms: int,
+                         parse_mode: ParseMode = ParseMode.LINE):
+        """Crea el worker de E/S y lo mueve a su hilo."""
+        self._owns_io_thread = io_thread is None
+        self._io_thread = io_thread or create_io_thread(f"serial-io-{id(self):x}")
+
+        self._io_worker = SerialIOWorker(batch_interval_ms=batch_interval_ms, parse_mode=parse_mode)
+        self._io_worker.moveToThread(self._io_thread)
+
+        self._open_requested.connect(self._io_worker.open_port)
+        self._close_requested.connect(self._io_worker.close_port)
+        self._write_requested.connect(self._io_worker.write)
+        self._binary_requested.connect(self._io_worker.start_binary_negotiation)
+
+        self._io_worker.lines_ready.connect(self.lines_received)
+        self._io_worker.data_sent.connect(self.data_sent)
+        self._io_worker.port_opened.connect(self._on_io_port_opened)
+        self._io_worker.port_closed.connect(self._on_io_port_closed)
+        self._io_worker.port_error.connect(self._on_io_port_error)
+        self._io_worker.write_failed.connect(self.error_occurred)
+
+    def shutdown(self):
+        """Cierra el puerto y detiene el hilo de E/S si es propio."""
         self.close_port()
-        self._scan_timer.stop()
+        self._reconnect_timer.stop()
+        if self._io_worker is not None and self._io_thread is not None and self._io_thread.isRunning():
+            # El cierre pedido por close_port va encolado: se espera a que el
+            # worker cierre el puerto antes de que el hilo salga de su bucle.
+            QMetaObject.invokeMethod(self._io_worker, "close_port",
+                                     Qt.ConnectionType.BlockingQueuedConnection)
+        if self._owns_io_thread and self._io_thread is not None:
+            self._io_thread.quit()
+            self._io_thread.wait(2000)
+            self._owns_io_thread = False
 
     def scan_ports(self):
-        ports = [port.portName() for port in QSerialPortInfo.availablePorts()]
-        if ports != self._last_ports:
-            self._last_ports = ports
-            self.ports_updated.emit(ports)
+        """Fuerza una nueva enumeración; `ports_updated` se emite si hubo cambios."""
+        self.discovery.refresh()
             
     def get_list_ports(self) -> list:
         """Devuelve una lista de puertos seriales disponibles."""
-        return [port.portName() for port in QSerialPortInfo.availablePorts()]
+        return self.discovery.get_port_names()
 
         
     def get_port_info(self, port_name: str) -> Dict[str, Any]:
-        for port in QSerialPortInfo.availablePorts():
-            if port.portName() == port_name:
-                return {
-                    'description': port.description(),
-                    'manufacturer': port.manufacturer(),
-                    'serial_number': port.serialNumber(),
-                    'vendor_id': port.vendorIdentifier(),
-                    'product_id': port.productIdentifier(),
-                    'system_location': port.systemLocation()
-                }
-        return {}
+        return self.discovery.get_port_details(port_name)
 
     def open_port(self, port_name: str, settings: Optional[Dict] = None):
+        self._cancel_reconnect()
+        self._settings = {**self.DEFAULT_SETTINGS, **(settings or {})}
+        details = self.discovery.get_port_details(port_name)
+        self._link_identity = details.get('identity')
+        self._link_listed = bool(details)
+        self._open(port_name)
+        self._close_requested_by_user = False
+
+    def _open(self, port_name: str) -> bool:
+        """Abre el puerto con la configuración guardada. En modo hilo el
+        resultado llega después por `_on_io_port_opened`."""
+        if self.threaded:
+            if self._io_connected:
+                self._expected_closes += 1   # el worker cierra antes de reabrir
+            self.port_name = port_name
+            self._open_requested.emit(port_name, dict(self._settings))
+            return False
+
         if self.serial is None:
             self.serial = QSerialPort()
             self.serial.readyRead.connect(self._handle_ready_read)
@@ -84,7 +179,7 @@ class SerialManager(QObject):
         self.serial.setPortName(port_name)
         self.port_name = port_name
 
-        config = {**self.DEFAULT_SETTINGS, **(settings or {})}
+        config = self._settings
 
         # Aplicar configuración correctamente para PyQt6
         self.serial.setBaudRate(config['baud_rate'])       # int
@@ -94,19 +189,39 @@ class SerialManager(QObject):
         self.serial.setFlowControl(config['flow_control']) # enum
 
         if self.serial.open(QIODevice.OpenModeFlag.ReadWrite):
-            self.connection_changed.emit(True, port_name)
-            self._scan_timer.stop()
+            if self._link_down_port:
+                self._on_link_restored(port_name)
+            else:
+                self.connection_changed.emit(True, port_name)
+            return True
+
+        self.serial.close()
+        if self._link_down_port:
+            self._schedule_reconnect()
         else:
             self.error_occurred.emit(f"Error al abrir {port_name}", port_name)
-            self.serial.close()
+        return False
 
     def close_port(self):
+        self._close_requested_by_user = True
+        if self._link_down_port:
+            # Cerrar durante un corte: se abandona la reconexión
+            port_name = self._link_down_port
+            self._cancel_reconnect()
+            self.connection_changed.emit(False, port_name)
+            return
+
+        if self.threaded:
+            if self._io_connected:
+                self._expected_closes += 1
+                self._close_requested.emit()
+            return
+
         if self.serial and self.serial.isOpen():
             port_name = self.port_name
             self.serial.close()
             self.port_name = ""
             self.connection_changed.emit(False, port_name)
-            self._scan_timer.start(2000)
 
     # def send_data(self, data: bytes):
     #     if self.serial and self.serial.isOpen():
@@ -122,7 +237,7 @@ class SerialManager(QObject):
     #             )
     def send_data_str(self, data: str) -> None:
         """Envía un string con salto de línea automático (\\n) por el puerto serial."""
-        if not self.serial or not self.serial.isOpen():
+        if not self.is_connected():
             return
 
         if not data.endswith('\n'):
@@ -132,6 +247,11 @@ class SerialManager(QObject):
 
     def send_data_bytes(self, data: bytes) -> None:
         """Envía datos en formato bytes (sin modificación) por el puerto serial."""
+        if self.threaded:
+            if self._io_connected:
+                self._write_requested.emit(data)
+            return
+
         if not self.serial or not self.serial.isOpen():
             return
 
@@ -166,18 +286,135 @@ class SerialManager(QObject):
             return
         
         error_msg = self.ERROR_MAP.get(error, f"Error desconocido ({error})")
-        self.error_occurred.emit(error_msg, self.port_name)
+        if not (self._is_link_error(error) and self._should_reconnect()):
+            self.error_occurred.emit(error_msg, self.port_name)
         
-        # Cerrar automáticamente en errores críticos
-        if error in (QSerialPort.SerialPortError.ResourceError,
-                    QSerialPort.SerialPortError.DeviceNotFoundError):
-            self.close_port()
+        # Errores críticos: el adaptador se cayó; reconectar si corresponde
+        if self._is_link_error(error):
+            if self.serial.isOpen() and self._should_reconnect():
+                self.serial.close()
+                self._begin_link_down(self.port_name)
+            elif not self._link_down_port:
+                self.close_port()
         
+    def request_binary_protocol(self) -> None:
+        """Modo hilo: negocia PROTO:BIN en el worker (si no responde, sigue ASCII)."""
+        if self.threaded and self._io_connected:
+            self._binary_requested.emit()
+
+    # ----------------------------
+    # Notificaciones del worker de E/S (hilo de la GUI)
+    # ----------------------------
+    def _on_io_port_opened(self, ok: bool, port_name: str):
+        if ok:
+            self._io_connected = True
+            if self._link_down_port:
+                self._on_link_restored(port_name)
+            else:
+                self.connection_changed.emit(True, port_name)
+        elif self._link_down_port:
+            self._schedule_reconnect()
+        else:
+            self.error_occurred.emit(f"Error al abrir {port_name}", port_name)
+
+    def _on_io_port_closed(self, port_name: str):
+        self._io_connected = False
+        expected = self._expected_closes > 0
+        if expected:
+            self._expected_closes -= 1
+        elif self._should_reconnect():
+            self._begin_link_down(port_name)
+            return
+        self.port_name = ""
+        self.connection_changed.emit(False, port_name)
+
+    # ----------------------------
+    # Reconexión automática
+    # ----------------------------
+    def is_link_down(self) -> bool:
+        """True mientras se intenta recuperar un puerto caído."""
+        return bool(self._link_down_port)
+
+    @staticmethod
+    def _is_link_error(error) -> bool:
+        return error in (QSerialPort.SerialPortError.ResourceError,
+                         QSerialPort.SerialPortError.DeviceNotFoundError)
+
+    def _should_reconnect(self) -> bool:
+        return self.auto_reconnect and not self._close_requested_by_user
+
+    def _begin_link_down(self, port_name: str):
+        if self._link_down_port:
+            return
+        self._link_down_port = port_name
+        self._link_down_since_ns = time.perf_counter_ns()
+        self._reconnect_attempt = 0
+        self.link_down.emit(port_name)
+        self._schedule_reconnect()
+
+    def _schedule_reconnect(self):
+        if self._reconnect_attempt >= self.max_reconnect_attempts:
+            port_name = self._link_down_port
+            self._cancel_reconnect()
+            self.port_name = ""
+            self.error_occurred.emit(f"No se pudo reconectar {port_name}", port_name)
+            self.connection_changed.emit(False, port_name)
+            return
+
+        delay_ms = min(self.reconnect_max_ms,
+                       self.reconnect_initial_ms * (2 ** self._reconnect_attempt))
+        self._reconnect_attempt += 1
+        self.reconnecting.emit(self._link_down_port, self._reconnect_attempt, delay_ms)
+        self._reconnect_timer.start(delay_ms)
+
+    def _attempt_reconnect(self):
+        if not self._link_down_port:
+            return
+        # El adaptador puede volver con otro nombre (ttyUSB0 -> ttyUSB1)
+        port_name = self._link_down_port
+        if self._link_identity:
+            port_name = self.discovery.find_port(self._link_identity) or port_name
+
+        # Si el puerto era visible y todavía no volvió, no vale la pena abrirlo
+        if self._link_listed and port_name not in self.discovery.get_port_names():
+            self._schedule_reconnect()
+            return
+        self._open(port_name)
+
+    def _on_port_added(self, info: dict):
+        """Un adaptador reapareció: se intenta ya, sin esperar el backoff."""
+        if not self._link_down_port:
+            return
+        same = (info.get('identity') == self._link_identity if self._link_identity
+                else info.get('name') == self._link_down_port)
+        if same and self._reconnect_timer.isActive():
+            self._reconnect_timer.stop()
+            self._attempt_reconnect()
+
+    def _on_link_restored(self, port_name: str):
+        outage_s = (time.perf_counter_ns() - self._link_down_since_ns) / 1e9
+        self._cancel_reconnect()
+        self.port_name = port_name
+        self.link_restored.emit(port_name, outage_s)
+
+    def _cancel_reconnect(self):
+        self._reconnect_timer.stop()
+        self._link_down_port = ""
+        self._reconnect_attempt = 0
+
+    def _on_io_port_error(self, error, port_name: str):
+        if self._is_link_error(error) and self._should_reconnect():
+            return  # el cierre que sigue inicia la reconexión; no es un error para el usuario
+        error_msg = self.ERROR_MAP.get(error, f"Error desconocido ({error})")
+        self.error_occurred.emit(error_msg, port_name)
+
     def is_connected(self) -> bool:
+        if self.threaded:
+            return self._io_connected
         return self.serial is not None and self.serial.isOpen()
 
     def get_current_settings(self) -> Dict[str, Any]:
-        if not self.is_connected():
+        if not self.is_connected() or self.threaded:
             return {}
         return {
             'baud_rate': self.serial.baudRate(),
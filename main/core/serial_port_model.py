@@ -10,6 +10,8 @@ from datetime import datetime
 from typing import List, Dict, Optional
 from queue import Queue
 
+from main.core.port_discovery import PortDiscovery
+
 
 class SerialPortModel(QObject):
     """Modelo mejorado para operaciones de puerto serial usando PyQt6."""
@@ -33,11 +35,6 @@ class SerialPortModel(QObject):
         self.max_reconnect_attempts = 3
         self._last_error = ""  
         
-        
-        # Timer para monitoreo de conexión
-        self.monitor_timer = QTimer()
-        self.monitor_timer.timeout.connect(self._monitor_connection)
-        
         # Configuración por defecto
         self.default_config = {
             'port_name': 'COM3',
@@ -51,15 +48,16 @@ class SerialPortModel(QObject):
         # Conectar señales
         self.serial_port.errorOccurred.connect(self.handle_port_error)
         self.serial_port.readyRead.connect(self._handle_ready_read)
+        self.serial_port.bytesWritten.connect(self._drain_write_queue)
         
         
-        # Timer para verificar puertos disponibles
-        self.ports_check_timer = QTimer()
-        self.ports_check_timer.timeout.connect(self.check_available_ports)
-        self.ports_check_timer.start(1000)  # Verificar cada 1 segundos
+        # Cambios de puertos desde el servicio compartido (sin timers propios)
+        self.discovery = PortDiscovery.instance()
+        self.discovery.ports_changed.connect(self.check_available_ports)
+        self.discovery.ports_changed.connect(self._monitor_connection)
         
         # Guardar última lista de puertos conocidos
-        self.last_known_ports = []
+        self.last_known_ports = self.discovery.get_port_names()
         
         # Emitir estado inicial
         QTimer.singleShot(100, self._emit_initial_status)
@@ -72,7 +70,7 @@ class SerialPortModel(QObject):
         self.connection_state_changed.emit(False)
         self._update_port_status()
     
-    def _monitor_connection(self):
+    def _monitor_connection(self, _ports: Optional[List[str]] = None):
         """Monitorea la conexión del puerto serial"""
         if self.serial_port.isOpen():
             # Verificar si el puerto sigue siendo válido
@@ -137,52 +135,19 @@ class SerialPortModel(QObject):
 
     def get_available_ports(self) -> List[Dict]:
         """Obtiene lista de puertos seriales disponibles con información detallada"""
-        ports = []
-        for port_info in QSerialPortInfo.availablePorts():
-            port_data = {
-                'name': port_info.portName(),
-                'description': port_info.description(),
-                'manufacturer': port_info.manufacturer(),
-                'system_location': port_info.systemLocation(),
-                'vendor_id': port_info.vendorIdentifier(),
-                'product_id': port_info.productIdentifier()
-            }
-            ports.append(port_data)
-        return ports
+        return self.discovery.get_ports_info()
     
     def get_port_names(self) -> List[str]:
         """Obtiene solo los nombres de los puertos disponibles"""
-        return [port.portName() for port in QSerialPortInfo.availablePorts()]
+        return self.discovery.get_port_names()
     
     def get_ports_info(self) -> List[dict]:
         """Obtiene información detallada de todos los puertos disponibles"""
-        ports_info = []
-        for port in QSerialPortInfo.availablePorts():
-            info = {
-                'name': port.portName(),
-                'description': port.description(),
-                'manufacturer': port.manufacturer(),
-                'serial_number': port.serialNumber(),
-                'vendor_id': port.vendorIdentifier(),
-                'product_id': port.productIdentifier(),
-                'system_location': port.systemLocation()
-            }
-            ports_info.append(info)
-        return ports_info
+        return self.discovery.get_ports_info()
     
     def get_port_details(self, port_name: str) -> dict:
-        """Obtiene información detallada de un puerto específico"""
-        for port in QSerialPortInfo.availablePorts():
-            if port.portName() == port_name:
-                return {
-                    'description': port.description(),
-                    'manufacturer': port.manufacturer(),
-                    'serial_number': port.serialNumber(),
-                    'vendor_id': port.vendorIdentifier(),
-                    'product_id': port.productIdentifier(),
-                    'system_location': port.systemLocation()
-                }
-        return {}
+        """Obtiene información detallada de un puerto específico (desde la caché)"""
+        return self.discovery.get_port_details(port_name)
     
     def configure_port(self, config: Optional[Dict] = None) -> bool:
         """Configura el puerto serial con los ajustes dados"""
@@ -216,9 +181,7 @@ class SerialPortModel(QObject):
                 self.connection_state_changed.emit(True)
                 self.connection_attempts = 0
                 self._last_error = ""
-                
-                # Iniciar monitoreo
-                self.monitor_timer.start(2000)  # Cada 2 segundos
+                self._update_port_status()
                 
                 return True
             else:
@@ -266,7 +229,6 @@ class SerialPortModel(QObject):
         """Cierra el puerto serial si está abierto"""
         port_name = self.serial_port.portName() if self.is_connected() else ""
         
-        self.monitor_timer.stop()
         if self.serial_port.isOpen():
             self.serial_port.close()
             self.connection_state_changed.emit(False)
@@ -276,30 +238,34 @@ class SerialPortModel(QObject):
                 
                 
     def write_data(self, data: str, add_newline: bool = True) -> bool:
-        """Escribe datos al puerto serial"""
+        """Encola datos para el puerto serial (no bloquea al llamador)"""
         if not self.serial_port.isOpen():
             self.error_occurred.emit("Puerto no conectado")
             return False
         
+        if add_newline and not data.endswith('\n'):
+            data += '\n'
+        
+        self.write_queue.put(data.encode('utf-8'))
+        if self.serial_port.bytesToWrite() == 0:
+            self._drain_write_queue()
+        return True
+
+    def _drain_write_queue(self, _bytes: int = 0) -> None:
+        """Escribe el siguiente mensaje encolado cuando el anterior terminó de salir"""
+        if not self.serial_port.isOpen() or self.serial_port.bytesToWrite() > 0:
+            return
+        
         try:
-            if add_newline and not data.endswith('\n'):
-                data += '\n'
-            
-            bytes_written = self.serial_port.write(data.encode('utf-8'))
-            if bytes_written == -1:
-                self.error_occurred.emit("Error al escribir datos")
-                return False
-            
-            # Esperar a que se escriban los datos
-            if not self.serial_port.waitForBytesWritten(3000):
-                self.error_occurred.emit("Timeout escribiendo datos")
-                return False
-            
-            return True
-            
+            while not self.write_queue.empty():
+                data = self.write_queue.get_nowait()
+                if self.serial_port.write(data) == -1:
+                    self.error_occurred.emit("Error al escribir datos")
+                    return
+                if self.serial_port.bytesToWrite() > 0:
+                    return  # continúa en la próxima señal bytesWritten
         except Exception as e:
             self.error_occurred.emit(f"Write error: {str(e)}")
-            return False
     
     def read_data(self) -> Optional[str]:
         """Lee datos del puerto serial si están disponibles"""
@@ -354,9 +320,10 @@ class SerialPortModel(QObject):
             'error_string': self.serial_port.errorString()
         }
         
-    def check_available_ports(self):
+    def check_available_ports(self, current_ports: Optional[List[str]] = None):
         """Verifica los puertos disponibles y emite señales si hay cambios"""
-        current_ports = self.get_port_names()
+        if current_ports is None:
+            current_ports = self.get_port_names()
         
         # Si hay cambios en la lista de puertos
         if current_ports != self.last_known_ports:
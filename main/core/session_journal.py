@@ -0,0 +1,237 @@
+"""
+Diario de sesión en disco, solo de agregado, a prueba de cortes.
+
+Cada sesión del EventLogger escribe un archivo `<inicio>-s<id>.jrnl` con
+registros de longitud prefijada:
+
+    [tag 1 B][largo u32][payload][crc32 u32]
+
+    H  encabezado JSON: sesión, hora de inicio (ns) y metadatos
+    E  un EVENT_RECORD (27 B); si el valor es texto, lo sigue en UTF-8
+    M  metadatos (JSON) del evento E anterior
+    S  metadato de sesión agregado con set_session_metadata (JSON)
+    Z  fin limpio de la sesión (JSON con la duración)
+
+El hilo de la GUI solo encola bytes (`SimpleQueue.put`, no bloquea); un
+hilo escritor junta lo que llegue durante `flush_interval_ms`, lo escribe y
+hace un solo fsync por lote (group commit). Un corte pierde a lo sumo esa
+ventana. Un archivo sin Z es una sesión interrumpida: `read_journal` lo
+lee hasta el último registro íntegro (el final cortado se reconoce por el
+largo o el CRC) y `mark_recovered` lo trunca ahí y lo cierra con un Z,
+para no recuperarlo dos veces.
+"""
+import os
+import json
+import glob
+import queue
+import struct
+import threading
+import time
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from main.utils.logger import Logger
+
+# Mismo criterio que LOG_FILE: relativo al directorio de trabajo
+JOURNAL_DIR = "journal"
+JOURNAL_SUFFIX = ".jrnl"
+MAGIC = b"SKJ1"
+
+TAG_HEADER, TAG_EVENT, TAG_METADATA, TAG_SESSION, TAG_END = b"H", b"E", b"M", b"S", b"Z"
+
+_FRAME = struct.Struct("<cI")
+_CRC = struct.Struct("<I")
+
+_OPEN, _RECORD, _SYNC = range(3)
+
+
+def encode_record(tag: bytes, payload: bytes) -> bytes:
+    return _FRAME.pack(tag, len(payload)) + payload + _CRC.pack(zlib.crc32(tag + payload))
+
+
+def _json(data: Any) -> bytes:
+    return json.dumps(data).encode("utf-8")
+
+
+def read_journal(path: str) -> Tuple[List[Tuple[bytes, bytes]], int]:
+    """Registros íntegros del archivo `(tag, payload)` y el offset donde terminan."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if not data.startswith(MAGIC):
+        return [], 0
+
+    records = []
+    offset = len(MAGIC)
+    while offset + _FRAME.size <= len(data):
+        tag, size = _FRAME.unpack_from(data, offset)
+        end = offset + _FRAME.size + size + _CRC.size
+        if end > len(data):
+            break                       # escritura cortada a la mitad
+        payload = data[offset + _FRAME.size:end - _CRC.size]
+        if _CRC.unpack_from(data, end - _CRC.size)[0] != zlib.crc32(tag + payload):
+            break
+        records.append((tag, payload))
+        offset = end
+    return records, offset
+
+
+def interrupted_journals(directory: str) -> List[str]:
+    """Archivos del directorio cuya sesión no terminó (sin registro Z), en orden de inicio."""
+    paths = []
+    for path in sorted(glob.glob(os.path.join(directory, "*" + JOURNAL_SUFFIX))):
+        records, _ = read_journal(path)
+        if not any(tag == TAG_END for tag, _ in records):
+            paths.append(path)
+    return paths
+
+
+def mark_recovered(path: str, valid_end: int, info: Dict[str, Any]) -> None:
+    """Descarta el final cortado y cierra el archivo con un Z `recovered`."""
+    with open(path, "r+b") as f:
+        if valid_end < len(MAGIC):
+            f.write(MAGIC)
+            valid_end = len(MAGIC)
+        f.truncate(valid_end)
+        f.seek(valid_end)
+        f.write(encode_record(TAG_END, _json({"recovered": True, **info})))
+        f.flush()
+        os.fsync(f.fileno())
+
+
+class SessionJournal:
+    """
+    Escritor en segundo plano de los diarios de sesión de un EventLogger.
+
+    `begin`, `event`, `session_metadata` y `end` solo encolan; `flush`
+    espera a que lo encolado esté en disco (pruebas, cierre) y `close`
+    además detiene el hilo.
+    """
+
+    def __init__(self, directory: str, flush_interval_ms: int = 100):
+        self.directory = directory
+        self.flush_interval = flush_interval_ms / 1000
+        self.logger = Logger("SessionJournal")
+        self.error: Optional[OSError] = None   # si el disco falla se deja de escribir
+        self.fsyncs = 0
+        os.makedirs(directory, exist_ok=True)
+
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._file = None
+        self._thread = threading.Thread(target=self._run, name="SessionJournal", daemon=True)
+        self._thread.start()
+
+    # ----------------------------
+    # API (hilo de la GUI)
+    # ----------------------------
+    def begin(self, session_id: int, start_wall_ns: int, metadata: Dict[str, Any]) -> None:
+        # start_wall_ns viene de una hora local sin zona: gmtime la devuelve tal cual
+        name = time.strftime("%Y%m%d-%H%M%S", time.gmtime(start_wall_ns // 1_000_000_000))
+        path = os.path.join(self.directory, f"{name}-s{session_id:03d}{JOURNAL_SUFFIX}")
+        header = {"session_id": session_id, "start_wall_ns": start_wall_ns, "metadata": metadata}
+        self._queue.put((_OPEN, path, encode_record(TAG_HEADER, _json(header))))
+
+    def event(self, record: bytes, text: Optional[str] = None, metadata: Optional[str] = None) -> None:
+        """`record` = bytes de un EVENT_RECORD; `text` si el valor es de la tabla de textos."""
+        if text is not None:
+            record += text.encode("utf-8")
+        self._queue.put((_RECORD, TAG_EVENT, record))
+        if metadata:
+            self._queue.put((_RECORD, TAG_METADATA, metadata.encode("utf-8")))
+
+    def session_metadata(self, key: str, value: Any) -> None:
+        self._queue.put((_RECORD, TAG_SESSION, _json({key: value})))
+
+    def end(self, duration: float) -> None:
+        self._queue.put((_RECORD, TAG_END, _json({"duration_sec": duration})))
+
+    def flush(self, timeout: Optional[float] = 5.0) -> bool:
+        done = threading.Event()
+        self._queue.put((_SYNC, done))
+        return done.wait(timeout)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Escribe lo pendiente y detiene el hilo; una sesión sin `end` queda como interrumpida."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout)
+
+    # ----------------------------
+    # Hilo escritor
+    # ----------------------------
+    def _run(self) -> None:
+        running = True
+        while running:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            # Group commit: lo que llegue en la ventana va en el mismo fsync
+            while batch[-1] is not None and batch[-1][0] != _SYNC:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            waiters = []
+            for item in batch:
+                if item is None:
+                    running = False
+                elif item[0] == _SYNC:
+                    waiters.append(item[1])
+                elif self.error is None:
+                    self._apply(item)
+            self._commit()
+            for done in waiters:
+                done.set()
+        self._close_file()
+
+    def _apply(self, item) -> None:
+        try:
+            if item[0] == _OPEN:
+                self._close_file()
+                root, ext = os.path.splitext(item[1])
+                path, n = item[1], 1
+                while os.path.exists(path):        # mismo segundo y número tras clear_log
+                    path, n = f"{root}-{n}{ext}", n + 1
+                self._file = open(path, "xb")
+                self._file.write(MAGIC + item[2])
+            elif self._file is not None:
+                tag, payload = item[1], item[2]
+                self._file.write(encode_record(tag, payload))
+                if tag == TAG_END:
+                    self._close_file()
+        except OSError as e:
+            self._fail(e)
+
+    def _commit(self) -> None:
+        if self._file is None:
+            return
+        try:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self.fsyncs += 1
+        except OSError as e:
+            self._fail(e)
+
+    def _close_file(self) -> None:
+        if self._file is None:
+            return
+        try:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self.fsyncs += 1
+            self._file.close()
+        except OSError as e:
+            self._fail(e)
+        self._file = None
+
+    def _fail(self, error: OSError) -> None:
+        self.error = error
+        self.logger.error(f"Diario de sesión deshabilitado: {error}")
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+            self._file = None
@@ -0,0 +1,228 @@
+"""
+Estado de la sesión en memoria: contadores, estado de LEDs, latencia,
+instante del último evento por indicador y respuestas por minuto.
+
+Es la fuente de verdad de la sesión. El ProgramEngine y los programas de
+refuerzo leen y escriben aquí (mismos métodos que usaba con
+IndicatorsSectionBox), y el panel de indicadores solo lo muestra:
+
+    state = SessionState(event_logger)
+    state.on_change = view.mark_dirty       # la vista refresca a su ritmo
+    state.update_value(IndicatorKey.LEVER_01_COUNT, increment=True, t_arrival_ns=t)
+    state.lever_01                          # int, sin pasar por texto
+
+Los tiempos (`t_start_ns`, `t_last_ns`, `t_arrival_ns`) son
+`time.perf_counter_ns()`, el mismo reloj con el que se sellan los bytes al
+llegar del puerto.
+"""
+import time
+from typing import Callable, Dict, List, Optional
+
+from main.core.event_logger import EventLogger, EventType, DeviceID
+from main.enums.indicators_enum import IndicatorKey
+
+_NS_PER_MIN = 60 * 1_000_000_000
+
+# Indicador -> atributo del estado
+_SLOTS = {
+    IndicatorKey.SESSION_ID: "session_id",
+    IndicatorKey.START_TIME: "start_time",
+    IndicatorKey.END_TIME: "end_time",
+    IndicatorKey.RUN_TIME: "run_time",
+    IndicatorKey.LATENCY_VAL: "latency_s",
+    IndicatorKey.REINFORCE_LATENCY: "reinforce_latency",
+    IndicatorKey.RESPONSE_RATE_VAL: "response_rate",
+    IndicatorKey.LEVER_01_COUNT: "lever_01",
+    IndicatorKey.LEVER_02_COUNT: "lever_02",
+    IndicatorKey.LED_01_STATE: "led_01",
+    IndicatorKey.LED_02_STATE: "led_02",
+    IndicatorKey.RECONPENSA_COUNT: "rewards",
+    IndicatorKey.DISPENSA_COUNT: "dispensed",
+}
+
+_DEFAULTS = {
+    "session_id": "N/A",
+    "start_time": "--:--:--",
+    "end_time": "--:--:--",
+    "run_time": "--:--:--",
+    "latency_s": None,          # None = todavía sin respuestas
+    "reinforce_latency": "--",  # p50 / p95 / p99 presión -> DISP:1 (LatencyTracer.readout)
+    "response_rate": 0,
+    "lever_01": 0,
+    "lever_02": 0,
+    "led_01": 0,
+    "led_02": 0,
+    "rewards": 0,
+    "dispensed": 0,
+}
+
+_COUNTERS = (IndicatorKey.LEVER_01_COUNT, IndicatorKey.LEVER_02_COUNT,
+             IndicatorKey.DISPENSA_COUNT, IndicatorKey.RECONPENSA_COUNT)
+_LEVERS = (IndicatorKey.LEVER_01_COUNT, IndicatorKey.LEVER_02_COUNT)
+_LEDS = (IndicatorKey.LED_01_STATE, IndicatorKey.LED_02_STATE)
+
+_EVENTS = {
+    IndicatorKey.LEVER_01_COUNT: (EventType.LEVER_PRESS, DeviceID.LEVER_01),
+    IndicatorKey.LEVER_02_COUNT: (EventType.LEVER_PRESS, DeviceID.LEVER_02),
+    IndicatorKey.DISPENSA_COUNT: (EventType.FOOD_DISPENSE, DeviceID.DISPENSADOR),
+    IndicatorKey.RECONPENSA_COUNT: (EventType.FOOD_RECOMPENSE, DeviceID.RECOMPENSA),
+    IndicatorKey.LED_01_STATE: (EventType.LED_CHANGE, DeviceID.LED_01),
+    IndicatorKey.LED_02_STATE: (EventType.LED_CHANGE, DeviceID.LED_02),
+}
+
+
+class SessionState:
+    """Contadores y tiempos de una sesión, con la interfaz de IndicatorsSectionBox."""
+
+    __slots__ = tuple(_DEFAULTS) + (
+        "event_logger", "t_start_ns", "t_last_ns", "minute_bins",
+        "last_p01_event", "last_p02_event", "on_change",
+    )
+
+    def __init__(self, event_logger: Optional[EventLogger] = None):
+        self.event_logger = event_logger
+        self.on_change: Optional[Callable[[IndicatorKey], None]] = None
+        self.reset_all()
+
+    # ----------------------------
+    # Ciclo de la sesión
+    # ----------------------------
+    def reset_all(self):
+        for slot, default in _DEFAULTS.items():
+            setattr(self, slot, default)
+        self.t_start_ns = 0                        # 0 = sesión sin iniciar
+        self.t_last_ns: Dict[IndicatorKey, int] = {}
+        self.minute_bins: List[int] = []           # respuestas (ambas palancas) por minuto
+        self.last_p01_event = False
+        self.last_p02_event = False
+        if self.on_change is not None:
+            for key in _SLOTS:
+                self.on_change(key)
+
+    def start(self, t_start_ns: int = None):
+        """Marca el inicio de la sesión (referencia de latencia y de los minutos)."""
+        self.t_start_ns = time.perf_counter_ns() if t_start_ns is None else t_start_ns
+
+    # ----------------------------
+    # Escritura
+    # ----------------------------
+    def update_value(self, key: IndicatorKey, new_value=None, increment: bool = False, log: bool = True,
+                     t_arrival_ns: int = None):
+        slot = _SLOTS.get(key)
+        if slot is None:
+            return
+
+        if key in _COUNTERS:
+            value = getattr(self, slot) + 1 if increment else int(new_value)
+        elif key in _LEDS:
+            value = int(new_value)
+        elif key == IndicatorKey.LATENCY_VAL:
+            value = float(new_value)
+        elif key == IndicatorKey.RESPONSE_RATE_VAL:
+            value = int(new_value)
+        else:
+            value = str(new_value)
+        setattr(self, slot, value)
+
+        if key in _EVENTS:
+            t_ns = time.perf_counter_ns() if t_arrival_ns is None else t_arrival_ns
+            self.t_last_ns[key] = t_ns
+            if key in _LEVERS:
+                if key == IndicatorKey.LEVER_01_COUNT:
+                    self.last_p01_event = bool(value)
+                else:
+                    self.last_p02_event = bool(value)
+                if increment:
+                    self._record_response(t_ns)
+            if log and self.event_logger is not None and self.event_logger.is_session_active():
+                event_type, device = _EVENTS[key]
+                self.event_logger.log_event(event_type, device, value, t_arrival_ns=t_arrival_ns)
+
+        if self.on_change is not None:
+            self.on_change(key)
+
+    def _record_response(self, t_ns: int):
+        """Latencia (primera respuesta) y bin del minuto de la sesión."""
+        if not self.t_start_ns:
+            return
+        elapsed_ns = max(0, t_ns - self.t_start_ns)
+        if self.latency_s is None:
+            self.latency_s = elapsed_ns / 1e9
+            if self.on_change is not None:
+                self.on_change(IndicatorKey.LATENCY_VAL)
+        minute = elapsed_ns // _NS_PER_MIN
+        bins = self.minute_bins
+        if minute >= len(bins):
+            bins.extend([0] * (minute + 1 - len(bins)))
+        bins[minute] += 1
+
+    # ----------------------------
+    # Lectura
+    # ----------------------------
+    def get(self, key: IndicatorKey):
+        return getattr(self, _SLOTS[key])
+
+    def display(self, key: IndicatorKey) -> str:
+        """Texto del indicador para la vista."""
+        value = getattr(self, _SLOTS[key])
+        if key in _LEDS:
+            return "ON" if value == 1 else "OFF"
+        if key == IndicatorKey.LATENCY_VAL:
+            return "0" if value is None else f"{value:.2f}"
+        return str(value)
+
+    def responses_per_minute(self, elapsed_s: int) -> int:
+        """
+        Respuestas del último minuto completo de la sesión; antes del primer
+        minuto, las respuestas acumuladas.
+        """
+        minute = int(elapsed_s) // 60
+        if minute == 0:
+            return self.lever_01 + self.lever_02
+        bins = self.minute_bins
+        return bins[minute - 1] if minute - 1 < len(bins) else 0
+
+    # Métodos de acceso (getters), como IndicatorsSectionBox
+    def get_val_pal01_count(self) -> int:
+        return self.lever_01
+
+    def get_val_pal02_count(self) -> int:
+        return self.lever_02
+
+    def get_val_food_count(self) -> int:
+        return self.rewards
+
+    def get_val_latency(self) -> float:
+        return 0.0 if self.latency_s is None else self.latency_s
+
+    def get_val_response_rate(self) -> int:
+        return self.response_rate
+
+    def get_val_led01_state(self) -> str:
+        return self.display(IndicatorKey.LED_01_STATE)
+
+    def get_val_led02_state(self) -> str:
+        return self.display(IndicatorKey.LED_02_STATE)
+
+    # Métodos para eventos de palanca
+    def get_last_p01_event(self):
+        return self.last_p01_event
+
+    def set_last_p01_event(self, state: bool):
+        self.last_p01_event = state
+
+    def get_last_p02_event(self):
+        return self.last_p02_event
+
+    def set_last_p02_event(self, state: bool):
+        self.last_p02_event = state
+
+    def get_stats(self) -> dict:
+        return {
+            "lever_01": self.lever_01,
+            "lever_02": self.lever_02,
+            "dispensed": self.dispensed,
+            "rewards": self.rewards,
+            "latency_s": self.latency_s,
+            "responses_per_minute": list(self.minute_bins),
+        }
@@ -0,0 +1,235 @@
+"""
+Transportes seriales intercambiables para el motor del programa.
+
+Un transporte entrega lo recibido como lotes de (payload, t_arrival_ns)
+—payload es una línea `str`, un `BinaryRecord` o un `EventBatch`, igual
+que `SerialManager.lines_received`— y acepta bytes para escribir:
+
+    transport.on_items = lambda items, port: ...
+    transport.on_connection = lambda connected, port: ...
+    transport.open("/dev/ttyUSB0")
+    transport.write(b"DISP:1\\n")
+
+- `QtSerialTransport`: adapta un SerialManager (QtSerialPort, con GUI).
+- `AsyncSerialTransport`: asyncio sobre el descriptor del tty configurado
+  con termios; no necesita un bucle de eventos de Qt.
+"""
+import os
+import time
+import errno
+import asyncio
+import termios
+import tty
+from abc import ABC, abstractmethod
+from typing import Optional, Callable, List, Tuple, Any
+
+from main.core.batch_parser import create_decoder
+from main.enums.program_enums import ParseMode
+
+ItemsCallback = Callable[[List[Tuple[Any, int]], str], None]
+ConnectionCallback = Callable[[bool, str], None]
+
+
+class SerialTransport(ABC):
+    """Interfaz mínima que necesita una sesión para hablar con la caja."""
+
+    def __init__(self):
+        self.on_items: Optional[ItemsCallback] = None
+        self.on_connection: Optional[ConnectionCallback] = None
+        self.port_name: str = ""
+
+    @abstractmethod
+    def open(self, port_name: str, baud_rate: int = 115200) -> None:
+        ...
+
+    @abstractmethod
+    def close(self) -> None:
+        ...
+
+    @abstractmethod
+    def write(self, data: bytes) -> None:
+        ...
+
+    @abstractmethod
+    def is_connected(self) -> bool:
+        ...
+
+    def write_line(self, line: str) -> None:
+        if not line.endswith('\n'):
+            line += '\n'
+        self.write(line.encode('utf-8'))
+
+    def _emit_items(self, items) -> None:
+        if items and self.on_items is not None:
+            self.on_items(items, self.port_name)
+
+    def _emit_connection(self, connected: bool, port_name: str) -> None:
+        if self.on_connection is not None:
+            self.on_connection(connected, port_name)
+
+
+class QtSerialTransport(SerialTransport):
+    """Transporte sobre un SerialManager en modo hilo."""
+
+    def __init__(self, serial_manager):
+        super().__init__()
+        self.serial_manager = serial_manager
+        serial_manager.lines_received.connect(lambda items, _port: self._emit_items(items))
+        serial_manager.connection_changed.connect(self._on_connection_changed)
+
+    def open(self, port_name: str, baud_rate: int = 115200) -> None:
+        self.port_name = port_name
+        self.serial_manager.open_port(port_name, {'baud_rate': baud_rate})
+
+    def close(self) -> None:
+        self.serial_manager.close_port()
+
+    def write(self, data: bytes) -> None:
+        self.serial_manager.send_data_bytes(data)
+
+    def is_connected(self) -> bool:
+        return self.serial_manager.is_connected()
+
+    def _on_connection_changed(self, connected: bool, port_name: str):
+        self._emit_connection(connected, port_name)
+
+
+class AsyncSerialTransport(SerialTransport):
+    """
+    Transporte asyncio sobre un descriptor de tty en modo raw (8N1, sin
+    control de flujo). La lectura usa `loop.add_reader`, así que cada
+    lote llega con su tiempo de llegada en cuanto el kernel lo entrega.
+    Las escrituras que no caben en el buffer del tty se completan con
+    `loop.add_writer`, sin bloquear el bucle; `close` termina de
+    escribirlas antes de soltar el descriptor.
+    """
+    READ_SIZE = 4096
+
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None,
+                 parse_mode: ParseMode = ParseMode.LINE):
+        super().__init__()
+        self._loop = loop
+        self._fd: Optional[int] = None
+        self._out = bytearray()
+        self.decoder = create_decoder(parse_mode)
+        self.bytes_rx = 0
+        self.bytes_tx = 0
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+        return self._loop
+
+    def open(self, port_name: str, baud_rate: int = 115200) -> None:
+        if self._fd is not None:
+            self.close()
+
+        fd = os.open(port_name, os.O_RDWR | os.O_NOCTTY | os.O_NONBLOCK)
+        try:
+            self._configure(fd, baud_rate)
+        except (termios.error, ValueError):
+            os.close(fd)
+            raise
+
+        self._fd = fd
+        self.port_name = port_name
+        self.decoder.reset()
+        self._out.clear()
+        self.loop.add_reader(fd, self._on_readable)
+        self._emit_connection(True, port_name)
+
+    @staticmethod
+    def _configure(fd: int, baud_rate: int) -> None:
+        speed = getattr(termios, f"B{baud_rate}", None)
+        if speed is None:
+            raise ValueError(f"Baud rate no soportado: {baud_rate}")
+
+        tty.setraw(fd)
+        attrs = termios.tcgetattr(fd)
+        attrs[2] &= ~(termios.PARENB | termios.CSTOPB | termios.CSIZE | getattr(termios, 'CRTSCTS', 0))
+        attrs[2] |= termios.CS8 | termios.CLOCAL | termios.CREAD
+        attrs[4] = attrs[5] = speed
+        termios.tcsetattr(fd, termios.TCSANOW, attrs)
+        termios.tcflush(fd, termios.TCIOFLUSH)
+
+    def close(self) -> None:
+        if self._fd is None:
+            return
+        fd, port_name = self._fd, self.port_name
+        self.loop.remove_reader(fd)
+        self.loop.remove_writer(fd)
+        self._fd = None
+        self.port_name = ""
+        self._drain(fd)
+        os.close(fd)
+        self._emit_connection(False, port_name)
+
+    def _drain(self, fd: int) -> None:
+        """
+        Antes de cerrar: escribe lo que quedó en `_out` (p. ej. los LED:OFF
+        de `HeadlessSession.stop`) en modo bloqueante y espera con tcdrain a
+        que salga del tty. Si el dispositivo ya no está, se descarta.
+        """
+        try:
+            if self._out:
+                os.set_blocking(fd, True)
+                while self._out:
+                    sent = os.write(fd, self._out)
+                    del self._out[:sent]
+                    self.bytes_tx += sent
+            termios.tcdrain(fd)
+        except (OSError, termios.error):
+            pass
+        self._out.clear()
+
+    def is_connected(self) -> bool:
+        return self._fd is not None
+
+    def write(self, data: bytes) -> None:
+        if self._fd is None:
+            return
+        if self._out:
+            self._out += data   # ya hay datos esperando: se respeta el orden
+            return
+        sent = self._write_some(data)
+        if sent < len(data):
+            self._out += data[sent:]
+            self.loop.add_writer(self._fd, self._on_writable)
+
+    def _write_some(self, data) -> int:
+        try:
+            sent = os.write(self._fd, data)
+        except BlockingIOError:
+            return 0
+        except OSError:
+            self.close()
+            return len(data)
+        self.bytes_tx += sent
+        return sent
+
+    def _on_writable(self) -> None:
+        if self._fd is None:
+            return
+        sent = self._write_some(self._out)
+        del self._out[:sent]
+        if not self._out and self._fd is not None:
+            self.loop.remove_writer(self._fd)
+
+    def _on_readable(self) -> None:
+        t_arrival_ns = time.perf_counter_ns()
+        try:
+            data = os.read(self._fd, self.READ_SIZE)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            if e.errno in (errno.EIO, errno.ENXIO, errno.EBADF):
+                self.close()   # el dispositivo desapareció
+                return
+            raise
+        if not data:
+            self.close()
+            return
+
+        self.bytes_rx += len(data)
+        self._emit_items(self.decoder.feed(data, t_arrival_ns))
@@ -0,0 +1,253 @@
+import time
+import heapq
+import itertools
+from collections import deque
+from typing import Optional, Dict, Callable
+
+from PyQt6.QtCore import QObject, QTimer, Qt, pyqtSignal
+
+from main.core.serial_manager import SerialManager
+from main.core.protocol_schema import OK_PREFIX, ERROR_PREFIX
+from main.enums.protocol_enums import TxPriority
+
+
+class _TxItem:
+    __slots__ = ("command", "priority", "coalesce_key", "expect_ack",
+                 "t_enqueue_ns", "retries")
+
+    def __init__(self, command, priority, coalesce_key, expect_ack, t_enqueue_ns):
+        self.command = command
+        self.priority = priority
+        self.coalesce_key = coalesce_key
+        self.expect_ack = expect_ack
+        self.t_enqueue_ns = t_enqueue_ns
+        self.retries = 0
+
+
+class TxScheduler(QObject):
+    """
+    Planificador de transmisión por puerto.
+
+    - Cola por prioridad: las recompensas salen antes que LEDs/configuración.
+    - Fusión: un cambio de LED pendiente se reemplaza por el más reciente
+      con la misma clave (p. ej. "LED1"), y uno igual al último enviado con
+      esa clave se descarta sin escribir (`clear()` olvida esos estados).
+    - Ritmo: al menos `min_gap_ms` entre escrituras para no llenar la cola
+      del firmware ("ERROR:Command queue full"); las escrituras no bloquean.
+    - ACK opcional: con `require_ack` las recompensas esperan "OK:<cmd>" y se
+      reintentan hasta `max_retries` veces si no llega o si llega "ERROR:".
+
+    `clock` (ns) se puede reemplazar en pruebas.
+    """
+    command_sent = pyqtSignal(str, int, int)   # comando, latencia cola->escritura (µs), reintento (0 = primer envío)
+    command_failed = pyqtSignal(str, str)   # comando, motivo
+
+    def __init__(self, serial_manager: SerialManager, min_gap_ms: int = 20,
+                 require_ack: bool = False, ack_timeout_ms: int = 300, max_retries: int = 2,
+                 logger=None, clock: Callable[[], int] = time.perf_counter_ns):
+        super().__init__()
+        self.clock = clock
+        self.serial_manager = serial_manager
+        self.min_gap_ms = min_gap_ms
+        self.require_ack = require_ack
+        self.ack_timeout_ms = ack_timeout_ms
+        self.max_retries = max_retries
+        self.logger = logger
+
+        self._heap = []
+        self._seq = itertools.count()
+        self._pending_by_key: Dict[str, _TxItem] = {}
+        self._last_sent: Dict[str, str] = {}     # clave de fusión -> último comando escrito
+        self._inflight: Dict[str, deque] = {}   # comando -> deque[(deadline_ns, item)]
+        self._last_write_ns = 0
+
+        self._pace_timer = QTimer(self)
+        self._pace_timer.setSingleShot(True)
+        self._pace_timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._pace_timer.timeout.connect(self._pump)
+
+        self._ack_timer = QTimer(self)
+        self._ack_timer.timeout.connect(self._check_ack_timeouts)
+
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self.stats = {
+            "submitted": 0,
+            "sent": 0,
+            "coalesced": 0,
+            "redundant": 0,
+            "retries": 0,
+            "failed": 0,
+            "max_depth": 0,
+            "latency_sum_us": 0,
+            "latency_max_us": 0,
+        }
+
+    # ----------------------------
+    # API
+    # ----------------------------
+    def submit(self, command: str, priority: TxPriority = TxPriority.CONTROL,
+               coalesce_key: Optional[str] = None, expect_ack: Optional[bool] = None) -> None:
+        """Encola un comando; se envía en cuanto lo permitan prioridad y ritmo."""
+        if expect_ack is None:
+            expect_ack = self.require_ack and priority == TxPriority.REWARD
+
+        self.stats["submitted"] += 1
+        if coalesce_key is not None:
+            pending = self._pending_by_key.get(coalesce_key)
+            if pending is not None:
+                # Se conserva el turno del pendiente, solo cambia el estado final
+                pending.command = command
+                self.stats["coalesced"] += 1
+                return
+            if self._last_sent.get(coalesce_key) == command:
+                self.stats["redundant"] += 1
+                return
+
+        item = _TxItem(command, priority, coalesce_key, expect_ack, self.clock())
+        self._push(item)
+        self._pump()
+
+    def on_device_reply(self, line: str) -> bool:
+        """
+        Procesa respuestas del firmware ("OK:<cmd>" / "ERROR:..."). Devuelve
+        True si la línea era una respuesta a un comando.
+        """
+        if line.startswith(OK_PREFIX):
+            waiting = self._inflight.get(line[len(OK_PREFIX):])
+            if waiting:
+                waiting.popleft()
+            return True
+
+        if line.startswith(ERROR_PREFIX):
+            # El firmware no indica qué comando falló: se reintenta el más antiguo
+            oldest = self._oldest_inflight()
+            if oldest is not None:
+                self._retry_or_fail(oldest, line)
+            return True
+        return False
+
+    def clear(self) -> None:
+        """Descarta lo pendiente (p. ej. al desconectar)."""
+        self._heap.clear()
+        self._pending_by_key.clear()
+        self._last_sent.clear()
+        self._inflight.clear()
+        self._pace_timer.stop()
+        self._ack_timer.stop()
+
+    def depth(self) -> int:
+        return len(self._heap)
+
+    def get_stats(self) -> dict:
+        sent = self.stats["sent"]
+        return {
+            **self.stats,
+            "depth": self.depth(),
+            "inflight": sum(len(q) for q in self._inflight.values()),
+            "latency_avg_us": self.stats["latency_sum_us"] // sent if sent else 0,
+        }
+
+    # ----------------------------
+    # Internos
+    # ----------------------------
+    def _push(self, item: _TxItem) -> None:
+        heapq.heappush(self._heap, (item.priority, next(self._seq), item))
+        if item.coalesce_key is not None:
+            self._pending_by_key[item.coalesce_key] = item
+        if len(self._heap) > self.stats["max_depth"]:
+            self.stats["max_depth"] = len(self._heap)
+
+    def _pump(self) -> None:
+        if not self._heap or self._pace_timer.isActive():
+            return
+
+        now = self.clock()
+        wait_ms = self.min_gap_ms - (now - self._last_write_ns) / 1e6
+        if wait_ms > 0:
+            self._pace_timer.start(max(1, int(round(wait_ms))))
+            return
+
+        item = self._pop_next()
+        if item is None:
+            return
+
+        if not self.serial_manager.is_connected():
+            self.clear()
+            return
+
+        self.serial_manager.send_data_str(item.command)
+        self._last_write_ns = self.clock()
+        if item.coalesce_key is not None:
+            self._last_sent[item.coalesce_key] = item.command
+
+        latency_us = (self._last_write_ns - item.t_enqueue_ns) // 1000
+        self.stats["sent"] += 1
+        self.stats["latency_sum_us"] += latency_us
+        self.stats["latency_max_us"] = max(self.stats["latency_max_us"], latency_us)
+        self.command_sent.emit(item.command, latency_us, item.retries)
+
+        if item.expect_ack:
+            deadline = self._last_write_ns + self.ack_timeout_ms * 1_000_000
+            self._inflight.setdefault(item.command, deque()).append((deadline, item))
+            if not self._ack_timer.isActive():
+                self._ack_timer.start(max(10, self.ack_timeout_ms // 4))
+
+        if self._heap:
+            self._pace_timer.start(self.min_gap_ms)
+
+    def _pop_next(self) -> Optional[_TxItem]:
+        """
+        Siguiente item a escribir. Se saltan los que, tras fusionarse, quedaron
+        igual al último estado enviado con su clave (p. ej. ON -> OFF -> ON
+        mientras esperaban); esos no gastan el ritmo.
+        """
+        while self._heap:
+            _, _, item = heapq.heappop(self._heap)
+            key = item.coalesce_key
+            if key is None:
+                return item
+            self._pending_by_key.pop(key, None)
+            if item.retries or self._last_sent.get(key) != item.command:
+                return item
+            self.stats["redundant"] += 1
+        return None
+
+    def _oldest_inflight(self) -> Optional[_TxItem]:
+        oldest = None
+        for waiting in self._inflight.values():
+            if waiting and (oldest is None or waiting[0][0] < oldest[0]):
+                oldest = waiting[0]
+        if oldest is None:
+            return None
+        self._inflight[oldest[1].command].popleft()
+        return oldest[1]
+
+    def _check_ack_timeouts(self) -> None:
+        now = self.clock()
+        expired = []
+        for waiting in self._inflight.values():
+            while waiting and waiting[0][0] <= now:
+                expired.append(waiting.popleft()[1])
+
+        for item in expired:
+            self._retry_or_fail(item, "timeout ACK")
+
+        if not any(self._inflight.values()):
+            self._ack_timer.stop()
+
+    def _retry_or_fail(self, item: _TxItem, reason: str) -> None:
+        if item.retries < self.max_retries:
+            item.retries += 1
+            item.t_enqueue_ns = self.clock()
+            self.stats["retries"] += 1
+            if self.logger:
+                self.logger.warning(f"TX retry {item.retries}/{self.max_retries} {item.command}: {reason}")
+            self._push(item)
+            self._pump()
+        else:
+            self.stats["failed"] += 1
+            if self.logger:
+                self.logger.error(f"TX failed {item.command}: {reason}")
+            self.command_failed.emit(item.command, reason)
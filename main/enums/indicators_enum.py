@@ -24,6 +24,7 @@ class IndicatorKey(Enum):
     END_TIME = "Hora de Fin"
     RUN_TIME = "Duración"
     LATENCY_VAL = "Latencia (s)"
+    REINFORCE_LATENCY = "Refuerzo p50/p95/p99 (ms)"
     RESPONSE_RATE_VAL = "Tasa de RPM"
     LEVER_01_COUNT = "Palanca 01"
     LEVER_02_COUNT = "Palanca 02"
@@ -15,3 +15,33 @@ class ModoPalanca(Enum):
     VR = "VR"
     EXTINCION = "EXTINCIÓN"
     INHABILITADO = "INHABILITADO"
+
+
+
+class DispatchMode(Enum):
+    PUSH = "push"   # procesar cada línea en cuanto se recibe
+    POLL = "poll"   # drenar la cola con un temporizador de 100 ms
+
+
+class ProtocolMode(Enum):
+    ASCII = "ascii"     # tokens de texto (P01:1, L01:0, ...)
+    BINARY = "binary"   # tramas binarias negociadas con PROTO:BIN (vuelve a ASCII si no hay respuesta)
+
+
+class ScheduleSite(Enum):
+    HOST = "host"       # el PC decide cada refuerzo (presión -> UART -> DISP:1 de vuelta)
+    DEVICE = "device"   # el programa compilado (SCHED/SEQ) corre en el firmware; el PC registra
+
+
+class ParseMode(Enum):
+    LINE = "line"     # una línea str por item; el motor hace split() por token
+    BATCH = "batch"   # un EventBatch por lectura, escaneado con una sola regex sobre bytes
+
+
+class LatencyStage(Enum):
+    """Etapas de una respuesta reforzada, en orden (ver `main.core.latency_trace`)"""
+    ARRIVAL = "arrival"     # bytes P0n leídos del puerto (SerialReceiver / hilo de E/S)
+    DISPATCH = "dispatch"   # el DataProcessor entrega el item al ProgramEngine
+    DECISION = "decision"   # el programa de refuerzo decide reforzar (check_palanca_num)
+    ENQUEUE = "enqueue"     # DISP:1 entra al planificador TX
+    WRITE = "write"         # DISP:1 escrito en el puerto (SerialManager)
@@ -0,0 +1,18 @@
+from enum import Enum, IntEnum
+
+
+class MessageKind(Enum):
+    EVENT = "event"     # evento de la caja que llega al motor (P01:1, L01:0, IR1:1)
+    ECHO = "echo"       # el firmware repite un comando recibido (DISP:1, LED1:OFF)
+    OK = "ok"           # confirmación de un comando: OK:<cmd>
+    ERROR = "error"     # rechazo de un comando: ERROR:<motivo>
+    BUTTON = "button"   # botón físico de la caja (BTN2:1, BTN3:1)
+    BOOT = "boot"       # texto del ROM del ESP32 al reiniciarse
+    REQUEST = "request" # el firmware pide datos al host (NEXT:1 -> más valores VR/VI)
+    UNKNOWN = "unknown"
+
+
+class TxPriority(IntEnum):
+    REWARD = 0    # DISP:1 -> nunca espera detrás de tráfico de LEDs/configuración
+    CONTROL = 1   # configuración / otros comandos
+    LED = 2       # cambios de estado de LED (se fusionan)
@@ -0,0 +1,76 @@
+"""
+Ejecuta una sesión sin interfaz gráfica (servidores de laboratorio, PCs de rack).
+
+Uso:
+    python -m main.headless --port /dev/ttyUSB0 --duration 3600 \\
+        --pal1 FR:5 --led1 ON --csv sesion.csv
+"""
+import sys
+import json
+import asyncio
+import argparse
+
+from main.utils.logger import Logger
+from main.core.event_logger import EventLogger
+from main.core.session_journal import JOURNAL_DIR
+from main.core.transport import AsyncSerialTransport
+from main.core.headless_session import HeadlessSession, HeadlessProgramState
+from main.enums.program_enums import ModoLuz, ModoPalanca, ParseMode, ScheduleSite
+
+
+def _parse_mode(text: str, enum_cls, default_value: int = 1):
+    """'FR:5' -> (ModoPalanca.FR, 5); acepta el nombre o el valor del enum."""
+    name, _, value = text.partition(":")
+    name = name.strip().upper()
+    for member in enum_cls:
+        if name in (member.name, member.value.upper()):
+            return member, int(value) if value else default_value
+    raise argparse.ArgumentTypeError(f"Modo inválido: {text}")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Sesión Skinner sin GUI")
+    parser.add_argument("--port", required=True, help="puerto serial, p. ej. /dev/ttyUSB0")
+    parser.add_argument("--baud", type=int, default=115200)
+    parser.add_argument("--duration", type=float, default=60.0, help="duración en segundos")
+    parser.add_argument("--pal1", default="CRF", help="modo palanca 1 (CRF, FR:5, FI:10, VR:5, VI:10)")
+    parser.add_argument("--pal2", default="INHABILITADO", help="modo palanca 2")
+    parser.add_argument("--led1", default="APAGADO", help="modo LED 1 (APAGADO, ENCENDIDO)")
+    parser.add_argument("--led2", default="APAGADO", help="modo LED 2")
+    parser.add_argument("--csv", help="archivo CSV donde guardar los eventos")
+    parser.add_argument("--journal", default=JOURNAL_DIR,
+                        help="directorio del diario de sesión (vacío = sin diario)")
+    parser.add_argument("--seed", type=int, help="semilla de las secuencias VR/VI (repite una sesión)")
+    parser.add_argument("--parse-mode", choices=[m.value for m in ParseMode], default=ParseMode.LINE.value,
+                        help="parseo del RX: line (por defecto) o batch (ráfagas grandes por lectura)")
+    parser.add_argument("--site", choices=[s.value for s in ScheduleSite], default=ScheduleSite.HOST.value,
+                        help="dónde se decide el refuerzo: host (PC) o device (firmware)")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    pal1, pal1_value = _parse_mode(args.pal1, ModoPalanca)
+    pal2, pal2_value = _parse_mode(args.pal2, ModoPalanca)
+    led1, led1_value = _parse_mode(args.led1, ModoLuz)
+    led2, led2_value = _parse_mode(args.led2, ModoLuz)
+
+    program = HeadlessProgramState(pal1, pal1_value, pal2, pal2_value,
+                                   led1, led1_value, led2, led2_value)
+    event_logger = EventLogger(journal_dir=args.journal or None)
+    session = HeadlessSession(AsyncSerialTransport(parse_mode=ParseMode(args.parse_mode)), program, event_logger,
+                              logger=Logger("Headless"), seed=args.seed,
+                              schedule_site=ScheduleSite(args.site))
+
+    try:
+        summary = asyncio.run(session.run(args.port, args.duration, args.baud))
+    finally:
+        event_logger.close()
+    if args.csv:
+        event_logger.save_to_csv(args.csv)
+    print(json.dumps(summary))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
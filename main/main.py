@@ -2,21 +2,33 @@
 Punto de entrada principal de la aplicación
 """
 import sys
+import argparse
 from PyQt6.QtGui import QPalette, QColor
 
 from PyQt6.QtWidgets import QApplication
 from main.main_window import MainWindow
+from main.enums.program_enums import ParseMode
 
 
 def main():
-    app = QApplication(sys.argv)
+    parser = argparse.ArgumentParser(description="Skinner box")
+    parser.add_argument("--chambers", type=int, default=1,
+                        help="cantidad de cajas a manejar en esta instancia")
+    parser.add_argument("--threaded", action="store_true",
+                        help="leer el puerto en un hilo de E/S en lugar del hilo de la GUI")
+    parser.add_argument("--parse-mode", choices=[m.value for m in ParseMode], default=ParseMode.LINE.value,
+                        help="parseo del RX: line (por defecto) o batch (ráfagas grandes por lectura)")
+    args, qt_args = parser.parse_known_args()
+
+    app = QApplication(sys.argv[:1] + qt_args)
     
     palette = QPalette()
     palette.setColor(QPalette.ColorRole.Window, QColor("#f8f9fa"))  # gris muy claro
     app.setPalette(palette)
     app.setStyle('Fusion')
     
-    window = MainWindow()
+    window = MainWindow(chambers=args.chambers, parse_mode=ParseMode(args.parse_mode),
+                        threaded=args.threaded)
     window.show()
     
     sys.exit(app.exec())
@@ -14,20 +14,38 @@ from main.views.inicio_view import InicioView
 from main.views.pnl_ctrl import PanelControlView
 from main.views.reporte_view import ReporteView
 from main.enums.menu_sections import MenuSection
+from main.enums.program_enums import ParseMode
 
 from main.core.event_logger import EventType, EventLogger, DeviceID
+from main.core.session_journal import JOURNAL_DIR
 
 from main.core.serial_manager import SerialManager
+from main.core.chamber_manager import ChamberManager
+from main.views.chambers_view import ChambersView
 
 from main.views.sections.plot_dinamic import DynamicMultiPlot, DynamicPlotGroupBox
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, chambers: int = 1, parse_mode: ParseMode = ParseMode.LINE,
+                 threaded: bool = False):
         super().__init__()
         self.logger = Logger("MainWindow")
-
-        self.serial_manager = SerialManager()
-        self.event_logger = EventLogger()
+        self.parse_mode = parse_mode
+
+        # Con más de una cámara, cada caja tiene su puerto y registro; la
+        # barra de estado y los reportes arrancan con la primera.
+        self.chamber_manager = None
+        if chambers > 1:
+            self.chamber_manager = ChamberManager(parse_mode=parse_mode)
+            for _ in range(chambers):
+                self.chamber_manager.add_chamber()
+            first = self.chamber_manager.get_chamber(1)
+            self.serial_manager = first.serial_manager
+            self.event_logger = first.event_logger
+        else:
+            # Con `threaded` el puerto vive en un hilo de E/S; si no, en el de la GUI
+            self.serial_manager = SerialManager(threaded=threaded, parse_mode=parse_mode)
+            self.event_logger = EventLogger(journal_dir=JOURNAL_DIR)
         
         self.views = {}
         self.view_titles = {
@@ -46,6 +64,15 @@ class MainWindow(QMainWindow):
         self._connect_serial_signals()
         self.side_menu.set_section_visible(MenuSection.REPORTS, False)
 
+    def closeEvent(self, event):
+        """Detiene el hilo de E/S serial y el diario de sesión antes de cerrar la ventana"""
+        if self.chamber_manager is not None:
+            self.chamber_manager.shutdown()
+        else:
+            self.serial_manager.shutdown()
+            self.event_logger.close()
+        super().closeEvent(event)
+
     def _configure_window(self):
         
         screen = QGuiApplication.primaryScreen().availableGeometry()
@@ -110,12 +137,19 @@ class MainWindow(QMainWindow):
         self.stacked_widget.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
         
     def _init_views(self):
+        if self.chamber_manager is not None:
+            control_view = ChambersView()
+            control_view.set_manager(self.chamber_manager)
+        else:
+            control_view = PanelControlView(
+                serial_manager=self.serial_manager,
+                event_logger=self.event_logger,
+                parse_mode=self.parse_mode
+            )
+
         self.views = {
             MenuSection.HOME: InicioView(),
-            MenuSection.CONTROL: PanelControlView(
-                serial_manager=self.serial_manager,
-                event_logger=self.event_logger
-            ),
+            MenuSection.CONTROL: control_view,
             MenuSection.REPORTS: ReporteView(
                 event_logger=self.event_logger
             ),
@@ -127,7 +161,10 @@ class MainWindow(QMainWindow):
         self.change_view(MenuSection.HOME)
 
     def _connect_signals(self):
-        self.event_logger.session_ended.connect(self.on_session_ended)
+        if self.chamber_manager is not None:
+            self.views[MenuSection.CONTROL].session_ended.connect(self.on_chamber_session_ended)
+        else:
+            self.event_logger.session_ended.connect(self.on_session_ended)
         
         for section, view in self.views.items():
             view.action_requested.connect(
@@ -135,6 +172,13 @@ class MainWindow(QMainWindow):
             )
 
 
+    def on_chamber_session_ended(self, chamber_id: int, session_data):
+        """Sesión finalizada en una cámara: el reporte pasa a usar su registro"""
+        report_view = self.views.get(MenuSection.REPORTS)
+        if report_view is not None:
+            report_view.event_logger = self.chamber_manager.get_chamber(chamber_id).event_logger
+        self.on_session_ended(session_data)
+
     def on_session_ended(self, session_id: int):
         """Maneja el evento de sesión finalizada"""
         # Mostrar el botón de reportes
@@ -171,6 +215,8 @@ class MainWindow(QMainWindow):
         # self.serial_manager.ports_list_updated.connect(self._update_serial_ports)
         self.serial_manager.error_occurred.connect(self._handle_serial_error)
         self.serial_manager.connection_changed.connect(self._handle_serial_connection_change)
+        self.serial_manager.link_down.connect(lambda _port: self.status_bar.set_connection_status(False))
+        self.serial_manager.link_restored.connect(lambda _port, _s: self.status_bar.set_connection_status(True))
         # self.serial_manager.port_disconnected.connect(self._handle_port_disconnection)
 
     def _handle_serial_connection_change(self, connected: bool):
@@ -0,0 +1,92 @@
+"""
+Benchmark: latencia añadida entre la recepción de una línea UART y su
+procesamiento por ProgramEngine, en modo push vs. sondeo de 100 ms.
+
+Uso:
+    python -m main.test.bench_dispatch_latency [segundos_por_modo]
+"""
+import sys
+import time
+import random
+
+from PyQt6.QtCore import QCoreApplication, QTimer
+
+from main.views.pnl_ctrl import SerialReceiver, DataProcessor
+from main.enums.program_enums import DispatchMode
+from main.test.bench_utils import percentile
+
+
+class FakeEngine:
+    """Motor de prueba: mide el tiempo desde la llegada hasta el procesamiento."""
+    def __init__(self):
+        self.latencies_ns = []
+
+    def process_uart_line(self, line, t_arrival_ns=None):
+        self.latencies_ns.append(time.perf_counter_ns() - t_arrival_ns)
+
+
+def run_mode(app, mode: DispatchMode, seconds: float, seed: int = 1):
+    rng = random.Random(seed)
+    engine = FakeEngine()
+    receiver = SerialReceiver()
+    processor = DataProcessor(engine)
+
+    poll_timer = QTimer()
+    if mode == DispatchMode.POLL:
+        poll_timer.timeout.connect(lambda: processor.process_pending(receiver.queue))
+        poll_timer.start(100)
+    else:
+        receiver.lines_ready_callback = processor.dispatch
+
+    # Carga de UI simulada: un "repintado" de 8 ms cada 33 ms
+    def fake_repaint():
+        end = time.perf_counter_ns() + 8_000_000
+        while time.perf_counter_ns() < end:
+            pass
+    repaint_timer = QTimer()
+    repaint_timer.timeout.connect(fake_repaint)
+    repaint_timer.start(33)
+
+    # Presiones de palanca aleatorias, con ráfagas ocasionales
+    inject_timer = QTimer()
+    inject_timer.setSingleShot(True)
+
+    def inject():
+        burst = 20 if rng.random() < 0.05 else 1
+        receiver.on_data_received(b"P01:1\r\n" * burst)
+        inject_timer.start(rng.randint(5, 200))
+
+    inject_timer.timeout.connect(inject)
+    inject_timer.start(0)
+
+    QTimer.singleShot(int(seconds * 1000), app.quit)
+    app.exec()
+
+    for timer in (poll_timer, repaint_timer, inject_timer):
+        timer.stop()
+    processor.process_pending(receiver.queue)
+
+    lat_ms = sorted(v / 1e6 for v in engine.latencies_ns)
+    return {
+        "mode": mode.value,
+        "lines": len(lat_ms),
+        "p50": percentile(lat_ms, 50),
+        "p95": percentile(lat_ms, 95),
+        "p99": percentile(lat_ms, 99),
+        "max": lat_ms[-1] if lat_ms else 0.0,
+    }
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5.0
+    app = QCoreApplication(sys.argv)
+
+    print(f"{'modo':<6} {'líneas':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for mode in (DispatchMode.POLL, DispatchMode.PUSH):
+        r = run_mode(app, mode, seconds)
+        print(f"{r['mode']:<6} {r['lines']:>7} {r['p50']:>8.2f} {r['p95']:>8.2f} "
+              f"{r['p99']:>8.2f} {r['max']:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Benchmark: costo de registrar eventos en el EventLogger (registros
+EVENT_RECORD) y de armar el DataFrame al consultar, y memoria por evento
+frente al mismo log guardado como DataFrame (lo que antes vivía en RAM).
+Mide también el registro con la ventana por defecto (100000 eventos en
+memoria, el resto en segmentos en disco) y las consultas que leen ambos;
+con varias sesiones, las consultas por sesión, dispositivo y ventana de
+tiempo con los índices frente a recorrer el log entero; y el registro con diario de sesión en disco (el costo en el
+hilo que registra es solo encolar; el fsync va en el hilo escritor).
+Como referencia mide también el registro anterior (DataFrame de una fila
++ pd.concat + astype de todo el log) con pocos eventos, porque crece O(n)
+por evento.
+
+Uso:
+    python -m main.test.bench_event_logger [eventos] [eventos_referencia]
+"""
+import os
+import sys
+import time
+import tempfile
+import warnings
+
+import pandas as pd
+
+from main.core.event_logger import EventLogger, EventType, DeviceID, EVENT_RECORD
+from main.test.bench_utils import percentile
+
+# Mezcla de una sesión típica: presiones, LEDs, dispensas y recompensas
+_MIX = (
+    (EventType.LEVER_PRESS, DeviceID.LEVER_01),
+    (EventType.LEVER_PRESS, DeviceID.LEVER_02),
+    (EventType.LED_CHANGE, DeviceID.LED_01),
+    (EventType.FOOD_DISPENSE, DeviceID.DISPENSADOR),
+    (EventType.FOOD_RECOMPENSE, DeviceID.RECOMPENSA),
+)
+
+
+def log_events(logger, n: int):
+    """Registra `n` eventos; devuelve el tiempo de cada llamada (ns), muestreado 1 de cada 16."""
+    samples = []
+    clock = time.perf_counter_ns
+    log = logger.log_event
+    for i in range(n):
+        event_type, device = _MIX[i % len(_MIX)]
+        if i & 15:
+            log(event_type, device, i & 1, t_arrival_ns=clock())
+        else:
+            t0 = clock()
+            log(event_type, device, i & 1, t_arrival_ns=t0)
+            samples.append(clock() - t0)
+    return sorted(samples)
+
+
+def concat_reference(n: int) -> float:
+    """Registro anterior: un DataFrame por evento, pd.concat y astype del log entero. µs/evento."""
+    dtypes = EventLogger()._dtypes
+    log = pd.DataFrame({col: pd.Series(dtype=typ) for col, typ in dtypes.items()})
+    t0 = time.perf_counter()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=FutureWarning)
+        for i in range(n):
+            event_type, device = _MIX[i % len(_MIX)]
+            row = pd.DataFrame([{
+                'timestamp': pd.Timestamp.now(), 'event_type': event_type.name,
+                'device_id': device.name, 'new_value': str(i & 1), 'session_id': 1,
+                'elapsed_sec': 0.0, 'metadata': None,
+            }]).astype({'timestamp': 'datetime64[ns]', 'event_type': 'category', 'device_id': 'category'})
+            log = pd.concat([log, row], ignore_index=True).astype(dtypes)
+    return (time.perf_counter() - t0) / n * 1e6
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - t0) * 1000
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    n_ref = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000
+
+    logger = EventLogger(max_entries=n + 2)
+    logger.start_session({"bench": "event_logger"})
+    t0 = time.perf_counter()
+    samples = log_events(logger, n)
+    total_s = time.perf_counter() - t0
+    logger.end_session()
+
+    print(f"{n} eventos en {total_s:.2f} s -> {total_s / n * 1e6:.2f} µs/evento "
+          f"(p50 {percentile(samples, 50) / 1000:.2f} µs, p99 {percentile(samples, 99) / 1000:.2f} µs, "
+          f"máx {samples[-1] / 1000:.1f} µs)")
+
+    df, ms = timed(logger.get_events)
+    print(f"get_events(): {len(df)} filas en {ms:.0f} ms")
+
+    per_100k = 100_000 / len(df) / 2 ** 20
+    stored = logger.event_count * EVENT_RECORD.itemsize + sum(len(t) + 49 for t in logger._texts)
+    frame = df.memory_usage(deep=True).sum()
+    print(f"memoria por 100k eventos: registros {stored * per_100k:.1f} MiB "
+          f"({EVENT_RECORD.itemsize} B/evento), como DataFrame {frame * per_100k:.1f} MiB "
+          f"({frame / len(df):.0f} B/evento)")
+    _, ms = timed(lambda: logger.get_events(devices=[DeviceID.LEVER_01], sessions=[1]))
+    print(f"get_events(devices, sessions): {ms:.0f} ms")
+    _, ms = timed(lambda: logger.get_last_event(1))
+    print(f"get_last_event(): {ms:.2f} ms")
+    with tempfile.TemporaryDirectory() as tmp:
+        _, ms = timed(lambda: logger.save_to_csv(os.path.join(tmp, "bench.csv")))
+    print(f"save_to_csv(): {ms:.0f} ms")
+
+    windowed = EventLogger()
+    windowed.start_session({"bench": "event_logger"})
+    t0 = time.perf_counter()
+    samples = log_events(windowed, n)
+    total_s = time.perf_counter() - t0
+    windowed.end_session()
+    in_memory = windowed._count - windowed._start
+    _, ms = timed(windowed.get_events)
+    _, ms_last = timed(lambda: windowed.get_last_event(1))
+    print(f"ventana de {windowed._max_entries} en memoria: {total_s / n * 1e6:.2f} µs/evento "
+          f"(p99 {percentile(samples, 99) / 1000:.2f} µs, máx {samples[-1] / 1000:.1f} µs), "
+          f"{in_memory} en memoria + {windowed._segments.rows} en disco; "
+          f"get_events() {ms:.0f} ms, get_last_event() {ms_last:.2f} ms")
+    windowed.close()
+
+    sessions = 20
+    multi = EventLogger()
+    for _ in range(sessions):
+        multi.start_session()
+        log_events(multi, n // sessions)
+        multi.end_session()
+    middle = sessions // 2
+    quarter = 0.25 * multi.get_last_event(middle)["elapsed_sec"]
+    window = (quarter, 2 * quarter)
+    df, ms = timed(lambda: multi.get_events(sessions=[middle]))
+    _, ms_dev = timed(lambda: multi.get_events(sessions=[middle], devices=[DeviceID.LEVER_02]))
+    win, ms_win = timed(lambda: multi.get_events(sessions=[middle], time_window=window))
+    _, ms_last = timed(lambda: multi.get_last_event(middle))
+
+    def full_scan():
+        events = multi.get_events()
+        events = events[events["session_id"] == middle]
+        return events[(events["elapsed_sec"] >= window[0]) & (events["elapsed_sec"] < window[1])]
+    ref, ms_ref = timed(full_scan)
+    assert ref.index.equals(win.index)
+    print(f"{sessions} sesiones, sesión {middle} ({len(df)} filas): get_events(sessions) {ms:.1f} ms, "
+          f"+devices {ms_dev:.1f} ms, +time_window ({len(win)} filas) {ms_win:.1f} ms, "
+          f"get_last_event {ms_last:.2f} ms; recorriendo el log entero {ms_ref:.0f} ms")
+    multi.close()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        journaled = EventLogger(max_entries=n + 2, journal_dir=tmp)
+        journaled.start_session({"bench": "event_logger"})
+        t0 = time.perf_counter()
+        samples = log_events(journaled, n)
+        total_s = time.perf_counter() - t0
+        journaled.end_session()
+        _, ms = timed(journaled.close)
+        print(f"con diario: {total_s / n * 1e6:.2f} µs/evento (p99 {percentile(samples, 99) / 1000:.2f} µs), "
+              f"{journaled._journal.fsyncs} fsync, vaciado al cerrar {ms:.0f} ms")
+
+    print(f"referencia pd.concat, {n_ref} eventos: {concat_reference(n_ref):.0f} µs/evento")
+
+
+if __name__ == "__main__":
+    main()
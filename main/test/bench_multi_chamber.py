@@ -0,0 +1,101 @@
+"""
+Benchmark de carga multi-cámara: latencia de refuerzo por cámara
+(P01 escrito por el "firmware" -> DISP:1 recibido de vuelta) a medida que
+se agregan cámaras al mismo proceso.
+
+Cada cámara se conecta a su propio `FirmwareStandIn` (pty, ver
+`main.test.firmware_standin`). Las presiones llegan con intervalos
+exponenciales; el programa es CRF en la palanca 1.
+
+Uso:
+    QT_QPA_PLATFORM=offscreen python -m main.test.bench_multi_chamber [segundos] [N1,N2,...]
+"""
+import sys
+import logging
+import tempfile
+
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtCore import QTimer
+
+from main.core.chamber_manager import ChamberManager
+from main.views.chambers_view import ChambersView
+from main.enums.program_enums import ModoPalanca
+from main.test.bench_utils import percentile
+from main.test.firmware_standin import FirmwareStandIn
+
+
+def run_load(app, n: int, seconds: float):
+    firmwares = [FirmwareStandIn(seed=i + 1) for i in range(n)]
+    journal = tempfile.TemporaryDirectory()     # cada caja escribe su diario, como en la app
+    manager = ChamberManager(journal_dir=journal.name)
+    view = ChambersView()
+    view.set_manager(manager)
+    for _ in range(n):
+        manager.add_chamber()
+    view.show()
+
+    connected = set()
+    for chamber, firmware in zip(manager.chambers.values(), firmwares):
+        chamber.serial_manager.connection_changed.connect(
+            lambda ok, _p, cid=chamber.chamber_id: ok and connected.add(cid))
+        chamber.serial_manager.open_port(firmware.port_name)
+
+    def start_programs():
+        for chamber in manager.chambers.values():
+            chamber.view.prog_section.cmb_mode_p1.setCurrentText(ModoPalanca.CRF.value)
+            chamber.view.start_program()
+        for firmware in firmwares:
+            firmware.running.set()
+
+    def wait_connected():
+        if len(connected) < n:
+            QTimer.singleShot(20, wait_connected)
+            return
+        start_programs()
+        QTimer.singleShot(int(seconds * 1000), app.quit)
+
+    for firmware in firmwares:
+        firmware.start()
+    QTimer.singleShot(0, wait_connected)
+    app.exec()
+
+    for firmware in firmwares:
+        firmware.running.clear()
+    for chamber in manager.chambers.values():
+        chamber.view.stop_program()
+    manager.shutdown()
+    journal.cleanup()
+    for firmware in firmwares:
+        firmware.close()
+    view.close()
+    view.deleteLater()
+
+    per_chamber_p50 = [percentile(sorted(f.latencies_ms), 50) for f in firmwares]
+    all_lat = sorted(v for f in firmwares for v in f.latencies_ms)
+    return {
+        "n": n,
+        "rewards": len(all_lat),
+        "p50": percentile(all_lat, 50),
+        "p95": percentile(all_lat, 95),
+        "p99": percentile(all_lat, 99),
+        "worst_chamber_p50": max(per_chamber_p50) if per_chamber_p50 else 0.0,
+    }
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 10.0
+    sizes = [int(v) for v in sys.argv[2].split(",")] if len(sys.argv) > 2 else [1, 4, 8, 16]
+
+    # El log DEBUG por línea a consola/archivo no es parte de lo que se mide
+    logging.disable(logging.INFO)
+    app = QApplication(sys.argv[:1])
+
+    print(f"{'cámaras':>7} {'refuerzos':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'peor p50':>9}")
+    for n in sizes:
+        r = run_load(app, n, seconds)
+        print(f"{r['n']:>7} {r['rewards']:>9} {r['p50']:>8.2f} {r['p95']:>8.2f} "
+              f"{r['p99']:>8.2f} {r['worst_chamber_p50']:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
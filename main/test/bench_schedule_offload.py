@@ -0,0 +1,74 @@
+"""
+Benchmark: latencia presión -> refuerzo con el programa decidido por el
+host (P01 por UART, DISP:1 de vuelta) y por el firmware (SCHED/SEQ; el
+firmware decide y el PC solo registra). Corre una HeadlessSession contra
+el firmware simulado de `firmware_standin`. Para el modo host muestra
+además los tramos medidos por el LatencyTracer de la sesión.
+
+Uso:
+    python -m main.test.bench_schedule_offload [segundos] [modo, p. ej. CRF o FR:5]
+"""
+import sys
+import asyncio
+
+from main.core.event_logger import EventLogger
+from main.core.headless_session import HeadlessSession, HeadlessProgramState
+from main.core.transport import AsyncSerialTransport
+from main.enums.program_enums import ModoPalanca, ParseMode, ScheduleSite
+from main.test.bench_utils import percentile
+from main.test.firmware_standin import FirmwareStandIn
+
+
+def run_site(site: ScheduleSite, seconds: float, mode: ModoPalanca, value: int):
+    firmware = FirmwareStandIn(press_rate_hz=5.0)
+    firmware.start()
+    program = HeadlessProgramState(pal1=mode, pal1_value=value)
+    session = HeadlessSession(AsyncSerialTransport(parse_mode=ParseMode.BATCH), program,
+                              EventLogger(), seed=1, schedule_site=site)
+
+    async def run():
+        task = asyncio.ensure_future(session.run(firmware.port_name, seconds))
+        await asyncio.sleep(0.5)          # se confirma el SCHED antes de presionar
+        firmware.running.set()
+        return await task
+
+    summary = asyncio.run(run())
+    firmware.running.clear()
+    firmware.close()
+
+    lat = sorted(firmware.latencies_ms)
+    return {
+        "site": summary["schedule_site"],
+        "presses": firmware.presses,
+        "rewards": len(lat),
+        "recorded": summary["dispensed"],
+        "p50": percentile(lat, 50),
+        "p95": percentile(lat, 95),
+        "p99": percentile(lat, 99),
+        "max": lat[-1] if lat else 0.0,
+        "stages": summary["reinforcement_latency"]["percentiles_ms"],
+    }
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 10.0
+    name, _, value = (sys.argv[2] if len(sys.argv) > 2 else "CRF").partition(":")
+    mode, value = ModoPalanca[name.upper()], int(value or 1)
+
+    print(f"{mode.value}:{value}, {seconds:.0f} s por modo, ~5 presiones/s")
+    print(f"{'decide':>8} {'presiones':>10} {'medidos':>10} {'registrados':>12} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    stages = {}
+    for site in (ScheduleSite.HOST, ScheduleSite.DEVICE):
+        r = run_site(site, seconds, mode, value)
+        stages[site] = r["stages"]
+        print(f"{r['site']:>8} {r['presses']:>10} {r['rewards']:>10} {r['recorded']:>12} "
+              f"{r['p50']:>8.3f} {r['p95']:>8.3f} {r['p99']:>8.3f} {r['max']:>8.3f}")
+
+    print("\nhost, por tramo (LatencyTracer, en el PC)")
+    for name, p in stages[ScheduleSite.HOST].items():
+        print(f"{name:>20} {p['p50']:>8.3f} {p['p95']:>8.3f} {p['p99']:>8.3f} {p['max']:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
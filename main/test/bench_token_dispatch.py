@@ -0,0 +1,199 @@
+"""
+Microbenchmark: tokens/segundo de ProgramEngine.process_uart_line antes
+(cadena de startswith + split + log por token) y después (tabla de
+prefijos) sobre un flujo grabado, y del camino completo bytes -> motor
+por líneas (StreamDecoder + process_uart_line) frente a por lotes
+(BatchStreamDecoder + process_batch).
+
+El flujo se toma de las líneas "Data RX" de app.log; si no existe se usa
+uno sintético con la misma mezcla.
+
+Uso:
+    python -m main.test.bench_token_dispatch [app.log] [repeticiones]
+"""
+import os
+import ast
+import sys
+import time
+import logging
+
+from main.core.line_framer import LineFramer
+from main.core.batch_parser import EventBatch, create_decoder
+from main.core.program_engine import ProgramEngine
+from main.enums.indicators_enum import IndicatorKey
+from main.enums.program_enums import ModoPalanca, ParseMode
+
+
+class FakeProgram:
+    def get_runing_state(self):
+        return True
+
+    def get_pal1_mode(self):
+        return ModoPalanca.CRF
+
+    def get_pal2_mode(self):
+        return ModoPalanca.CRF
+
+
+class FakeIndicators:
+    def __init__(self):
+        self.updates = 0
+
+    def update_value(self, key, new_value=None, increment=False, log=True, t_arrival_ns=None):
+        self.updates += 1
+
+
+class LegacyProgramEngine(ProgramEngine):
+    """process_uart_line tal como estaba antes de la tabla de prefijos."""
+
+    def process_uart_line(self, line, t_arrival_ns: int = None):
+        if self.reply_callback is not None and self.reply_callback(line):
+            return
+        if not self.prog_section.get_runing_state():
+            return
+
+        parts = line.split()
+        for part in parts:
+            self.logger.debug(f"[ProgramEngine] RX part: {part}")
+            if part.startswith("L01:"):
+                value = part.split(":")[1].strip()
+                if value.isdigit():
+                    self.info_group.update_value(IndicatorKey.LED_01_STATE, value, increment=False,
+                                                 t_arrival_ns=t_arrival_ns)
+            elif part.startswith("L02:"):
+                value = part.split(":")[1].strip()
+                if value.isdigit():
+                    self.info_group.update_value(IndicatorKey.LED_02_STATE, value, increment=False,
+                                                 t_arrival_ns=t_arrival_ns)
+            elif part.startswith("P01:"):
+                value = part.split(":")[1].strip()
+                if value.isdigit():
+                    self._handle_palanca(IndicatorKey.LEVER_01_COUNT, int(value), t_arrival_ns)
+            elif part.startswith("P02:"):
+                value = part.split(":")[1].strip()
+                if value.isdigit():
+                    self._handle_palanca(IndicatorKey.LEVER_02_COUNT, int(value), t_arrival_ns)
+            elif part.startswith("IR1:"):
+                value = part.split(":")[1].strip()
+                if value.isdigit():
+                    self._handle_recompensa_food(value, t_arrival_ns)
+            else:
+                self.logger.warning(f"unknow command: {part}")
+
+
+def load_chunks(path: str):
+    """Lecturas crudas tal como quedaron en los `Data RX ...: b'...'` del log."""
+    chunks = []
+    if os.path.exists(path):
+        with open(path, encoding="utf-8", errors="ignore") as f:
+            for row in f:
+                idx = row.find("Data RX")
+                if idx < 0:
+                    continue
+                literal = row[row.find(": b", idx) + 2:].strip()
+                try:
+                    chunks.append(ast.literal_eval(literal))
+                except (ValueError, SyntaxError):
+                    continue
+    if not chunks:
+        chunks = [b"P01:1\r\nDISP:1\nOK:DISP:1\n", b"LED1:OFF\nL01:0\nP0", b"2:1\n"] * 500
+    return chunks
+
+
+def load_stream(path: str):
+    """Líneas completas reconstruidas de las lecturas del log."""
+    framer = LineFramer()
+    lines = []
+    for chunk in load_chunks(path):
+        for frame in framer.feed(chunk):
+            line = str(frame, "utf-8", "ignore").strip()
+            if line:
+                lines.append(line)
+    return lines
+
+
+def coalesce(chunks, size: int = 4096):
+    """Junta lecturas consecutivas como las entregaría un puerto con carga (ráfagas)."""
+    out, buf = [], b""
+    for chunk in chunks:
+        if len(buf) + len(chunk) > size:
+            out.append(buf)
+            buf = b""
+        buf += chunk
+    if buf:
+        out.append(buf)
+    return out
+
+
+def make_engine(engine_cls=ProgramEngine):
+    logger = logging.getLogger("bench_token_dispatch")
+    logger.setLevel(logging.INFO)   # como en producción sin DEBUG: el f-string se arma igual
+    logger.propagate = False
+    if not logger.handlers:
+        logger.addHandler(logging.NullHandler())
+
+    return engine_cls(
+        send_cmd_callback=lambda cmd: None,
+        check_event_palanc=lambda num, t=None: None,
+        prog_section=FakeProgram(),
+        info_group=FakeIndicators(),
+        logger=logger,
+    )
+
+
+def run(engine_cls, lines, repeat: int):
+    engine = make_engine(engine_cls)
+    tokens = sum(len(line.split()) for line in lines) * repeat
+
+    process = engine.process_uart_line
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for line in lines:
+            process(line, 0)
+    elapsed = time.perf_counter() - t0
+    return tokens, elapsed, engine.info_group.updates // repeat
+
+
+def run_bytes(parse_mode: ParseMode, chunks, repeat: int):
+    """Bytes crudos -> decodificador -> motor, como en DataProcessor."""
+    engine = make_engine()
+    total_bytes = sum(len(c) for c in chunks) * repeat
+
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        decoder = create_decoder(parse_mode)
+        for chunk in chunks:
+            for payload, t_arrival_ns in decoder.feed(chunk, 0):
+                if isinstance(payload, str):
+                    engine.process_uart_line(payload, t_arrival_ns)
+                elif isinstance(payload, EventBatch):
+                    engine.process_batch(payload, t_arrival_ns)
+                else:
+                    engine.process_record(payload, t_arrival_ns)
+    elapsed = time.perf_counter() - t0
+    return total_bytes, elapsed, engine.info_group.updates // repeat
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else "app.log"
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    lines = load_stream(path)
+    print(f"flujo: {len(lines)} líneas x {repeat}")
+
+    print(f"{'versión':<10} {'tokens':>9} {'tokens/s':>12} {'ns/token':>9} {'eventos':>8}")
+    for name, cls in (("antes", LegacyProgramEngine), ("después", ProgramEngine)):
+        tokens, elapsed, updates = run(cls, lines, repeat)
+        print(f"{name:<10} {tokens:>9} {tokens / elapsed:>12,.0f} {elapsed / tokens * 1e9:>9.0f} {updates:>8}")
+
+    raw = load_chunks(path)
+    for label, chunks in (("lecturas del log", raw), ("ráfagas de 4 KiB", coalesce(raw))):
+        print(f"\nbytes -> motor, {label}: {len(chunks)} lecturas x {repeat}")
+        print(f"{'parseo':<10} {'bytes':>9} {'MB/s':>12} {'ns/byte':>9} {'eventos':>8}")
+        for mode in (ParseMode.LINE, ParseMode.BATCH):
+            total, elapsed, updates = run_bytes(mode, chunks, repeat)
+            print(f"{mode.value:<10} {total:>9} {total / elapsed / 1e6:>12.2f} "
+                  f"{elapsed / total * 1e9:>9.1f} {updates:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+"""Utilidades comunes de los benchmarks de `main.test`."""
+
+
+def percentile(sorted_vals, pct):
+    """Percentil `pct` (rango más cercano) de una lista ya ordenada; 0.0 si está vacía."""
+    if not sorted_vals:
+        return 0.0
+    idx = min(len(sorted_vals) - 1, int(round(pct / 100 * (len(sorted_vals) - 1))))
+    return sorted_vals[idx]
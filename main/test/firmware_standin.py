@@ -0,0 +1,124 @@
+"""
+Firmware simulado sobre un pty: hace de caja Skinner para probar sin
+hardware, incluido el modo en que el programa de refuerzo corre en el
+firmware (`SCHED`/`SEQ`, ver `main.core.schedule_offload`).
+
+- Escribe presiones `P01:1` con intervalos exponenciales.
+- Responde a los comandos del host como el ESP32: eco + `OK:<cmd>`.
+- Con `SCHED:` decide cada refuerzo localmente (`DeviceSchedules`) y
+  avisa con `R01:1`; pide más valores VR/VI con `NEXT:<palanca>`.
+- Mide la latencia presión -> refuerzo: en modo host hasta que llega el
+  `DISP:1` del PC (cada DISP cierra la presión pendiente más antigua), en
+  modo firmware hasta la decisión local.
+
+Uso:
+    firmware = FirmwareStandIn(press_rate_hz=5)
+    firmware.start()
+    ... abrir firmware.port_name desde el host ...
+    firmware.running.set()
+"""
+import os
+import tty
+import time
+import random
+import selectors
+import threading
+from collections import deque
+
+from main.core.schedule_offload import DeviceSchedules
+
+
+class FirmwareStandIn(threading.Thread):
+
+    def __init__(self, press_rate_hz: float = 5.0, seed: int = 1, supports_offload: bool = True):
+        super().__init__(daemon=True)
+        self.rng = random.Random(seed)
+        self.press_rate_hz = press_rate_hz
+        self.supports_offload = supports_offload
+        self.master, self.slave = os.openpty()
+        tty.setraw(self.master)
+        tty.setraw(self.slave)
+        self.port_name = os.ttyname(self.slave)
+
+        self.device = DeviceSchedules(clock=time.monotonic)
+        self.offloaded = False
+        self.presses = 0
+        self.local_rewards = 0
+        self.host_dispenses = 0
+        self.latencies_ms = []
+        self._pending_presses = deque()     # presiones que esperan el DISP del host
+        self.running = threading.Event()
+        self.stop_flag = threading.Event()
+
+    def run(self):
+        sel = selectors.DefaultSelector()
+        sel.register(self.master, selectors.EVENT_READ)
+        buffer = b""
+        next_press = 0.0
+
+        while not self.stop_flag.is_set():
+            now = time.perf_counter()
+            if self.running.is_set() and now >= next_press:
+                self._press(1)
+                next_press = now + self.rng.expovariate(self.press_rate_hz)
+
+            for _key, _ in sel.select(timeout=0.001):
+                try:
+                    buffer += os.read(self.master, 4096)
+                except OSError:
+                    continue
+                *lines, buffer = buffer.split(b"\n")
+                for line in lines:
+                    self._on_command(line.strip().decode(errors="ignore"))
+        sel.close()
+
+    def _write(self, text: str):
+        os.write(self.master, text.encode() + b"\r\n")
+
+    def _press(self, lever: int):
+        self.presses += 1
+        t_press = time.perf_counter_ns()
+        self._write(f"P0{lever}:1")
+        if not self.offloaded:
+            self._pending_presses.append(t_press)
+            return
+        reinforce, request = self.device.on_press(lever)
+        if reinforce:
+            self.local_rewards += 1
+            self.latencies_ms.append((time.perf_counter_ns() - t_press) / 1e6)
+            self._write(f"R0{lever}:1")
+        if request:
+            self._write(request)
+
+    def _on_command(self, command: str):
+        if not command:
+            return
+        prefix = command.partition(":")[0]
+        if prefix == "DISP":
+            self.host_dispenses += 1
+            if self._pending_presses:
+                self.latencies_ms.append((time.perf_counter_ns() - self._pending_presses.popleft()) / 1e6)
+        elif prefix in ("SCHED", "SEQ"):
+            if not self.supports_offload:
+                self._write("ERROR:Unknown command")
+                return
+            if prefix == "SCHED":
+                self.device.load(command)
+                self.offloaded = command.partition(":")[2] != "OFF,0,OFF,0"
+            else:
+                self.device.add_values(command)
+            self._write(f"OK:{command}")
+            return
+        elif prefix == "PROTO":
+            return          # solo ASCII: el host vuelve a texto al no recibir PROTO:BIN:OK
+        elif prefix not in ("LED1", "LED2"):
+            self._write("ERROR:Unknown command")
+            return
+        self._write(command)
+        self._write(f"OK:{command}")
+
+    def close(self):
+        self.stop_flag.set()
+        self.join(1)
+        os.close(self.master)
+        os.close(self.slave)
@@ -0,0 +1,99 @@
+"""
+Pruebas del protocolo binario: CRC, resincronización tras basura,
+conteo de pérdidas y duplicadas por número de secuencia, y negociación
+PROTO:BIN (ACK partido entre lecturas, vuelta a ASCII sin respuesta).
+
+Uso:
+    python -m pytest main/test/test_binary_protocol.py
+    python -m main.test.test_binary_protocol
+"""
+from main.core.binary_protocol import (
+    BinaryFrameDecoder, StreamDecoder, BinaryRecord, encode_frame, MSG_EVENT, DEV_P01, DEV_P02,
+)
+from main.core.batch_parser import BatchStreamDecoder
+
+
+def _frames(*seqs, device=DEV_P01):
+    return b"".join(encode_frame(MSG_EVENT, device, 1, 1000 * seq, seq) for seq in seqs)
+
+
+def test_crc_rejection():
+    decoder = BinaryFrameDecoder()
+    bad = bytearray(_frames(1))
+    bad[4] ^= 0xFF                          # valor alterado: el CRC ya no coincide
+    records = decoder.feed(bytes(bad) + _frames(2))
+    assert [r.seq for r in records] == [2]
+    assert decoder.crc_errors == 1 and decoder.frames == 1
+
+
+def test_resync_after_garbage_and_split_frames():
+    decoder = BinaryFrameDecoder()
+    data = b"\x00\x13garbage\xa5" + _frames(1, 2) + b"xx" + _frames(3)
+    records = []
+    for i in range(0, len(data), 5):        # tramas partidas entre lecturas
+        records += decoder.feed(data[i:i + 5])
+    assert [r.seq for r in records] == [1, 2, 3]
+    assert records[0] == BinaryRecord(MSG_EVENT, DEV_P01, 1, 1000, 1)
+    assert decoder.skipped_bytes == len(b"\x00\x13garbage\xa5xx")
+    assert decoder.consecutive_skipped == 0
+
+
+def test_sequence_gaps_and_wraparound():
+    decoder = BinaryFrameDecoder()
+    records = decoder.feed(_frames(1, 2, 5))
+    records += decoder.feed(_frames(0x7000, 0xE000))      # saltos grandes, pero hacia adelante
+    records += decoder.feed(_frames(0xFFFC, 0xFFFE, 0xFFFF, 0, 3))
+    assert [r.seq for r in records] == [1, 2, 5, 0x7000, 0xE000, 0xFFFC, 0xFFFE, 0xFFFF, 0, 3]
+    assert decoder.lost_frames == 2 + (0x7000 - 6) + (0xE000 - 0x7001) + (0xFFFC - 0xE001) + 1 + 2
+    assert decoder.duplicate_frames == 0
+
+
+def test_duplicate_and_reordered_frames_are_dropped():
+    decoder = BinaryFrameDecoder()
+    records = decoder.feed(_frames(5, 6, 6, 7, 4, 8))
+    assert [r.seq for r in records] == [5, 6, 7, 8]
+    assert decoder.get_stats()["lost_frames"] == 0
+    assert decoder.get_stats()["duplicate_frames"] == 2
+
+
+def test_split_ack_keeps_following_frames():
+    for decoder in (StreamDecoder(), BatchStreamDecoder()):
+        decoder.start_negotiation()
+        out = decoder.feed(b"P01:1\nPROTO:BI", 1)
+        out += decoder.feed(b"N:OK\r\n" + _frames(1, 2, device=DEV_P02), 2)
+        assert decoder.is_binary
+        if isinstance(decoder, BatchStreamDecoder):
+            events = [e[:2] for batch, _ in out for e in batch.events]
+            lines = [line for batch, _ in out for line in batch.lines]
+            assert lines == [] and events[-2:] == [(DEV_P02, 1), (DEV_P02, 1)]
+        else:
+            assert [item for item, _ in out][0] == "P01:1"
+            assert [r.seq for r, t in out[1:]] == [1, 2] and out[-1][1] == 2
+
+
+def test_negotiation_timeout_falls_back_to_ascii():
+    decoder = StreamDecoder(negotiation_timeout_ms=0)
+    decoder.start_negotiation()
+    out = decoder.feed(b"P01:1\nPROTO:BIN:OK\n" + _frames(1), 1)
+    assert not decoder.is_binary and not decoder.is_negotiating()
+    assert [line for line, _ in out][:2] == ["P01:1", "PROTO:BIN:OK"]
+
+
+def test_binary_stream_falls_back_after_garbage():
+    decoder = StreamDecoder()
+    decoder.start_negotiation()
+    decoder.feed(b"PROTO:BIN:OK\n" + _frames(1), 1)
+    assert decoder.is_binary
+    text = b"L01:1\n" * 20                  # el equipo se reinició y habla ASCII
+    out = decoder.feed(text, 2)
+    assert not decoder.is_binary and decoder.fallbacks == 1
+    assert [line for line, _ in out] == ["L01:1"] * 20
+
+
+if __name__ == "__main__":
+    tests = [(name, fn) for name, fn in sorted(globals().items())
+             if name.startswith("test_") and callable(fn)]
+    for name, fn in tests:
+        fn()
+        print(f"ok  {name}")
+    print(f"{len(tests)} pruebas OK")
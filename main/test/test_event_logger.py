@@ -0,0 +1,180 @@
+"""
+Pruebas del EventLogger: columnas y tipos de `get_events`, filtros,
+último evento, valores compactos, metadatos, ventana en memoria de
+`max_entries` con segmentos en disco, índices por sesión, dispositivo y
+tiempo, y datos de fin de sesión.
+
+Uso:
+    python -m pytest main/test/test_event_logger.py
+    python -m main.test.test_event_logger
+"""
+import io
+import os
+import time
+import tempfile
+
+import numpy as np
+
+from main.core.event_logger import EventLogger, EventType, DeviceID
+
+
+def _session(logger, presses=3):
+    logger.start_session({"pal_1c": "CRF"})
+    t0 = time.perf_counter_ns()
+    for i in range(presses):
+        logger.log_event(EventType.LEVER_PRESS, DeviceID.LEVER_01, i + 1, t_arrival_ns=t0 + i * 250_000_000)
+    logger.log_event(EventType.LED_CHANGE, DeviceID.LED_01, "1", metadata={"x": 2})
+    logger.log_event(EventType.FOOD_DISPENSE, DeviceID.DISPENSADOR, 1)
+
+
+def test_columns_and_filters():
+    logger = EventLogger()
+    _session(logger)
+    logger.end_session()
+    logger.start_session()
+    logger.log_event(EventType.LEVER_PRESS, DeviceID.LEVER_02, 5)
+
+    df = logger.get_events()
+    assert list(df.columns) == list(logger._dtypes)
+    assert {col: str(dtype) for col, dtype in df.dtypes.items()} == {
+        "timestamp": "datetime64[ns]", "event_type": "category", "device_id": "category",
+        "new_value": "object", "session_id": "int32", "elapsed_sec": "float64", "metadata": "object"}
+    assert df.index.tolist() == list(range(9))
+    assert df["event_type"].tolist()[:2] == ["SESSION_START", "LEVER_PRESS"]
+    assert df["new_value"].tolist()[1:4] == ["1", "2", "3"]
+    assert df["metadata"].iloc[0] == '{"pal_1c": "CRF"}' and df["metadata"].iloc[1] is None
+    assert (df["timestamp"].iloc[2] - df["timestamp"].iloc[1]).value == 250_000_000   # hora de llegada
+
+    presses = logger.get_events(event_types=[EventType.LEVER_PRESS], devices=[DeviceID.LEVER_01], sessions=[1])
+    assert presses.index.tolist() == [1, 2, 3]
+    assert presses["elapsed_sec"].tolist() == [0.0, 0.25, 0.5]
+    assert len(logger.get_events(sessions=[2])) == 2
+    assert np.shares_memory(logger.session_records(2), logger._records)   # rebanada sin copia
+
+    buffer = io.StringIO()
+    logger.save_to_csv(buffer)
+    assert buffer.getvalue().splitlines()[0] == ",".join(logger._dtypes)
+    assert len(buffer.getvalue().splitlines()) == 10
+
+
+def test_last_event_and_session_data():
+    logger = EventLogger()
+    ended = []
+    logger.session_ended.connect(ended.append)
+    _session(logger)
+    assert logger.get_last_event()["event_type"] == "FOOD_DISPENSE"
+    logger.end_session()
+
+    last = logger.get_last_event(1)
+    assert last["event_type"] == "SESSION_END" and last["session_id"] == 1
+    assert logger.get_last_event(7) is None
+
+    data = ended[0]
+    assert data["session_id"] == 1 and data["metadata"] == {"pal_1c": "CRF"}
+    assert data["lever1_presses"] == ["1", "2", "3"]
+    assert data["lever1_times"] == [0.0, 0.25, 0.5]
+    assert data["led_changes"][0]["device_id"] == "LED_01"
+
+
+def test_compact_values_and_metadata():
+    logger = EventLogger(max_entries=50)
+    logger.start_session({"seed": 7})
+    values = [0, 7, "07", "1", -3, True, 2.5, "2.50", "LINK_DOWN", 10 ** 20, "2147483648", None,
+              "²", "1²", "١٢"]                # dígitos no ASCII (línea corrupta): quedan como texto
+    for value in values:
+        logger.log_event(EventType.SYSTEM_EVENT, DeviceID.SYSTEM, value,
+                         metadata={"port": "COM3"} if value == "LINK_DOWN" else None)
+
+    df = logger.get_events(event_types=[EventType.SYSTEM_EVENT])
+    assert df["new_value"].tolist() == [str(v) for v in values]
+    assert df["metadata"].tolist()[8] == '{"port": "COM3"}'
+    assert df["metadata"].count() == 1
+    assert logger._records.dtype.itemsize <= 32
+    assert logger._texts.count("LINK_DOWN") == 1
+
+    for i in range(EventLogger.INITIAL_CAPACITY):   # los metadatos siguen tras pasar a disco
+        logger.log_event(EventType.LEVER_PRESS, DeviceID.LEVER_01, i)
+    df = logger.get_events()
+    assert df["metadata"].count() == 2 and df["metadata"].iloc[9] == '{"port": "COM3"}'
+    assert df["new_value"].iloc[1:1 + len(values)].tolist() == [str(v) for v in values]
+
+
+def test_spill_to_segments_and_growth():
+    with tempfile.TemporaryDirectory() as tmp:
+        logger = EventLogger(max_entries=1000, segment_dir=tmp)
+        logger.start_session({"n": 1})
+        for i in range(6_000):              # la mitad vieja de la ventana pasa a disco
+            logger.log_event(EventType.LEVER_PRESS, DeviceID.LEVER_01, i)
+        logger.end_session()
+        logger.start_session()
+        for i in range(4_000):
+            logger.log_event(EventType.LEVER_PRESS, DeviceID.LEVER_02, i)
+
+        assert logger._count - logger._start <= 1000
+        assert len(logger._records) <= 4 * EventLogger.INITIAL_CAPACITY
+        logger._segments.flush()            # la escritura va en otro hilo
+        assert len(os.listdir(tmp)) == logger._segments.rows // 500 > 0
+
+        df = logger.get_events()
+        assert logger.event_count == len(df) == 10_003
+        assert df.index.tolist() == list(range(10_003))
+        assert df["new_value"].iloc[1] == "0" and df["new_value"].iloc[-1] == "3999"
+
+        first = logger.get_events(sessions=[1])          # sesión entera en disco
+        assert len(first) == 6_002 and first["metadata"].iloc[0] == '{"n": 1}'
+        assert first["event_type"].iloc[-1] == "SESSION_END"
+        assert logger.get_last_event(1)["event_type"] == "SESSION_END"
+        assert len(logger.get_events(devices=[DeviceID.LEVER_02], sessions=[2])) == 4_000
+
+        buffer = io.StringIO()
+        logger.save_to_csv(buffer)
+        lines = buffer.getvalue().splitlines()
+        assert len(lines) == 10_004 and lines.count(lines[0]) == 1
+
+        logger.clear_log()
+        assert logger.event_count == 0 and logger.get_events().empty
+        assert os.listdir(tmp) == []
+
+
+def test_indexed_queries_match_full_scan():
+    logger = EventLogger(max_entries=300)
+    rng = np.random.default_rng(3)
+    devices = list(DeviceID)
+    for session in range(4):
+        logger.start_session()
+        logger._session_start_ns -= 6_000_000_000       # empezó hace 6 s: las llegadas ya pasaron
+        t0 = time.perf_counter_ns() - 5_000_000_000
+        for i in range(500):
+            device = devices[rng.integers(len(devices))]
+            # la sesión 3 trae un evento fuera de orden: filtra sin búsqueda binaria
+            jitter = -40 if session == 2 and i == 250 else 0
+            logger.log_event(EventType.LEVER_PRESS, device, i, t_arrival_ns=t0 + (i + jitter) * 10_000_000)
+        logger.end_session()
+    assert [rows[3] for rows in logger._session_rows.values()] == [True, True, False, True]
+
+    full = logger.get_events()
+    for sessions in ([2], [3], [1, 4]):
+        for devices_filter in (None, [DeviceID.LEVER_01], [DeviceID.LED_02, DeviceID.SYSTEM]):
+            expected = full[full["session_id"].isin(sessions)]
+            filters = {"sessions": sessions}
+            if devices_filter:
+                expected = expected[expected["device_id"].isin([d.name for d in devices_filter])]
+                filters["devices"] = devices_filter
+            window = expected[(expected["elapsed_sec"] >= 2.0) & (expected["elapsed_sec"] < 3.5)]
+            assert logger.get_events(**filters).index.tolist() == expected.index.tolist()
+            got = logger.get_events(time_window=(2.0, 3.5), **filters)
+            assert got.index.tolist() == window.index.tolist()
+            assert got["new_value"].tolist() == window["new_value"].tolist()
+
+    lever = logger.get_events(devices=[DeviceID.LEVER_02], event_types=[EventType.LEVER_PRESS])
+    assert lever.index.tolist() == full.index[full["device_id"] == "LEVER_02"].tolist()
+    assert logger.get_last_event(3)["event_type"] == "SESSION_END"
+
+
+if __name__ == "__main__":
+    tests = [(name, fn) for name, fn in sorted(globals().items())
+             if name.startswith("test_") and callable(fn)]
+    for name, fn in tests:
+        fn()
+        print(f"ok  {name}")
+    print(f"{len(tests)} pruebas OK")
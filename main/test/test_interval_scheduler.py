@@ -0,0 +1,202 @@
+"""
+Pruebas del IntervalScheduler y de los programas FI/VI con reloj simulado.
+
+Uso:
+    python -m pytest main/test/test_interval_scheduler.py
+    python -m main.test.test_interval_scheduler
+"""
+import time
+
+from main.core.interval_scheduler import IntervalScheduler
+from main.core.reinforcement import LeverSchedules, IntervalSchedule
+from main.enums.program_enums import ModoPalanca
+
+
+class FakeClock:
+    def __init__(self, start: float = 1000.0):
+        self.now = start
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> float:
+        self.now += seconds
+        return self.now
+
+
+class FakeDriver:
+    """Hace de QTimer: despierta exactamente en el plazo armado (o tarde si se pide)."""
+
+    def __init__(self, scheduler: IntervalScheduler, clock: FakeClock):
+        self.scheduler = scheduler
+        self.clock = clock
+        self.armed = None
+        scheduler.on_rearm = self.arm
+
+    def arm(self, deadline):
+        self.armed = deadline
+
+    def run_until(self, t_end: float, late: float = 0.0):
+        while self.armed is not None and self.armed + late <= t_end:
+            self.clock.now = self.armed + late
+            self.scheduler.run_due()
+        self.clock.now = t_end
+
+
+def test_fires_in_deadline_order():
+    clock = FakeClock()
+    scheduler = IntervalScheduler(clock)
+    fired = []
+    scheduler.call_later(3.0, lambda d: fired.append("c"))
+    scheduler.call_later(1.0, lambda d: fired.append("a"))
+    scheduler.call_later(2.0, lambda d: fired.append("b"))
+
+    clock.advance(1.5)
+    assert scheduler.run_due() == 1
+    clock.advance(10)
+    assert scheduler.run_due() == 2
+    assert fired == ["a", "b", "c"]
+
+
+def test_not_fired_before_deadline():
+    clock = FakeClock()
+    scheduler = IntervalScheduler(clock)
+    fired = []
+    scheduler.call_later(0.005, lambda d: fired.append(d))
+    clock.advance(0.004999)
+    assert scheduler.run_due() == 0
+    clock.advance(0.000001)
+    assert scheduler.run_due() == 1
+    assert fired == [1000.005]
+
+
+def test_cancel_and_rearm():
+    clock = FakeClock()
+    scheduler = IntervalScheduler(clock)
+    driver = FakeDriver(scheduler, clock)
+    first = scheduler.call_later(1.0, lambda d: None)
+    second = scheduler.call_later(2.0, lambda d: None)
+    assert driver.armed == 1001.0
+
+    scheduler.cancel(first)
+    assert driver.armed == 1002.0
+    scheduler.cancel(second)
+    assert driver.armed is None
+    assert len(scheduler) == 0
+
+
+def test_callback_receives_exact_deadline():
+    clock = FakeClock()
+    scheduler = IntervalScheduler(clock)
+    driver = FakeDriver(scheduler, clock)
+    seen = []
+    scheduler.call_at(1000.25, seen.append)
+    driver.run_until(1001.0, late=0.0004)
+    assert seen == [1000.25]
+    assert scheduler.max_lateness < 0.001
+
+
+def test_fi_available_exactly_at_deadline():
+    clock = FakeClock()
+    scheduler = IntervalScheduler(clock)
+    driver = FakeDriver(scheduler, clock)
+    available = []
+    schedules = LeverSchedules(timer=scheduler, on_available=lambda lever, d: available.append((lever, d)))
+    schedules.configure(1, ModoPalanca.FI, 5)
+    schedules.start()
+
+    driver.run_until(1004.999)
+    assert available == []
+    assert not schedules.on_response(1)      # antes del plazo: no se refuerza
+
+    driver.run_until(1005.0)
+    assert available == [(1, 1005.0)]
+    assert schedules.get(1).available
+
+    clock.advance(0.3)                       # respuesta entre ticks de 1 s
+    assert schedules.on_response(1)
+    assert not schedules.get(1).available
+    assert driver.armed == 1010.3            # el próximo intervalo cuenta desde el refuerzo
+
+
+def test_fi_judged_at_arrival_time():
+    """Llegó antes del plazo pero se procesa después (p. ej. en un lote): no se refuerza."""
+    clock = FakeClock()
+    scheduler = IntervalScheduler(clock)
+    driver = FakeDriver(scheduler, clock)
+    schedules = LeverSchedules(timer=scheduler)
+    schedules.configure(1, ModoPalanca.FI, 5)
+    schedules.start()
+
+    driver.run_until(1005.2)
+    assert schedules.get(1).available
+    assert not schedules.on_response(1, t_arrival_ns=1_004_990_000_000)
+    assert schedules.on_response(1, t_arrival_ns=1_005_010_000_000)
+    assert abs(driver.armed - 1010.01) < 1e-9   # el intervalo cuenta desde la llegada
+
+
+def test_default_clock_matches_arrival_stamps():
+    assert IntervalScheduler().clock is time.perf_counter
+    assert LeverSchedules().clock is time.perf_counter
+
+
+def test_fi_no_drift_over_long_session():
+    """10 h de FI 7 s reforzando justo al quedar disponible: sin deriva acumulada."""
+    clock = FakeClock(start=50_000.0)
+    scheduler = IntervalScheduler(clock)
+    driver = FakeDriver(scheduler, clock)
+    schedule_holder = {}
+
+    def reinforce_now(lever, deadline):
+        assert schedule_holder[lever].on_response(deadline)
+
+    schedules = LeverSchedules(timer=scheduler, on_available=reinforce_now)
+    schedule_holder[1] = schedules.configure(1, ModoPalanca.FI, 7)
+    schedules.start()
+
+    hours = 10
+    driver.run_until(50_000.0 + hours * 3600)
+    schedule = schedule_holder[1]
+    assert schedule.reinforcements == hours * 3600 // 7
+    assert schedule.t_last_reinforcement == 50_000.0 + schedule.reinforcements * 7
+
+
+def test_vi_intervals_and_stop():
+    clock = FakeClock()
+    scheduler = IntervalScheduler(clock)
+    driver = FakeDriver(scheduler, clock)
+    intervals = iter([3, 1, 4])
+    available = []
+    schedules = LeverSchedules(timer=scheduler, on_available=lambda lever, d: available.append(d))
+    schedules.configure(2, ModoPalanca.VI, 3, interval_source=lambda: next(intervals))
+    schedules.start()
+
+    driver.run_until(1003.0)
+    assert available == [1003.0]
+    assert schedules.on_response(2)          # refuerzo en 1003 -> próximo plazo 1004
+    driver.run_until(1004.0)
+    assert available == [1003.0, 1004.0]
+
+    schedules.stop()
+    assert driver.armed is None
+    assert isinstance(schedules.get(2), IntervalSchedule)
+
+
+def test_reconfigure_cancels_previous_deadline():
+    clock = FakeClock()
+    scheduler = IntervalScheduler(clock)
+    driver = FakeDriver(scheduler, clock)
+    schedules = LeverSchedules(timer=scheduler)
+    schedules.configure(1, ModoPalanca.FI, 10)
+    schedules.start()
+    schedules.configure(1, ModoPalanca.FR, 3)
+    assert driver.armed is None
+
+
+if __name__ == "__main__":
+    tests = [(name, fn) for name, fn in sorted(globals().items())
+             if name.startswith("test_") and callable(fn)]
+    for name, fn in tests:
+        fn()
+        print(f"ok  {name}")
+    print(f"{len(tests)} pruebas OK")
@@ -0,0 +1,57 @@
+"""
+Pruebas de las secuencias VR/VI precalculadas (Fleshler-Hoffman).
+
+Uso:
+    python -m pytest main/test/test_interval_sequence.py
+    python -m main.test.test_interval_sequence
+"""
+import numpy as np
+
+from main.core.interval_scheduler import IntervalScheduler
+from main.core.mean_generator import IntervalSequence, fleshler_hoffman, integer_progression
+from main.core.reinforcement import LeverSchedules
+from main.enums.program_enums import ModoPalanca
+
+
+def test_progression_keeps_mean():
+    for mean in (1, 3, 10, 60):
+        assert np.isclose(fleshler_hoffman(mean).mean(), mean)
+        steps = integer_progression(fleshler_hoffman(mean), mean)
+        assert steps.min() >= 1 and steps.sum() == mean * len(steps)
+
+
+def test_every_block_has_the_programmed_mean():
+    sequence = IntervalSequence(5, integer=True, steps=20, blocks=8, seed=1)
+    values = [sequence() for _ in range(20 * 8)]
+    assert all(isinstance(v, int) for v in values)
+    assert np.all(np.array(values).reshape(8, 20).sum(axis=1) == 100)
+
+
+def test_same_seed_same_session():
+    a = IntervalSequence(10, seed=[42, 1])
+    b = IntervalSequence(10, seed=[42, 1])
+    c = IntervalSequence(10, seed=[42, 2])
+    first = [a() for _ in range(3000)]          # cruza el final del primer lote
+    assert first == [b() for _ in range(3000)]
+    assert first[:20] != [c() for _ in range(20)]
+
+
+def test_lever_schedules_use_session_seed():
+    runs = []
+    for _ in range(2):
+        schedules = LeverSchedules(clock=lambda: 0.0, timer=IntervalScheduler(lambda: 0.0))
+        schedules.new_seed(1234)
+        schedules.configure(1, ModoPalanca.VR, 4)
+        schedules.configure(2, ModoPalanca.VI, 30)
+        schedules.start()
+        runs.append((schedules.get(1).threshold, schedules.get(2).threshold))
+    assert runs[0] == runs[1]
+
+
+if __name__ == "__main__":
+    tests = [(name, fn) for name, fn in sorted(globals().items())
+             if name.startswith("test_") and callable(fn)]
+    for name, fn in tests:
+        fn()
+        print(f"ok  {name}")
+    print(f"{len(tests)} pruebas OK")
@@ -0,0 +1,87 @@
+"""
+Pruebas del LatencyTracer (trazas por etapa presión -> DISP:1).
+
+Uso:
+    python -m pytest main/test/test_latency_trace.py
+    python -m main.test.test_latency_trace
+"""
+from main.core.latency_trace import LatencyTracer, SEGMENTS, TOTAL, WRITE_IO_QUEUE, histogram_lines
+
+MS = 1_000_000
+
+
+def _trace(tracer, lever, t0, steps_ms):
+    """Una traza completa con tramos de `steps_ms` (dispatch, decision, enqueue, write)."""
+    t = [t0]
+    for step in steps_ms:
+        t.append(t[-1] + int(step * MS))
+    tracer.begin(lever, t[0], t[1], t[2])
+    tracer.enqueued(t[3])
+    tracer.written(t[4])
+
+
+def test_stages_and_percentiles():
+    tracer = LatencyTracer(capacity=2)      # crece al llenarse
+    for i in range(100):
+        _trace(tracer, 1 + i % 2, i * 100 * MS, (0.1, 0.2, 0.05, 0.01 * (i + 1)))
+
+    assert tracer.count == 100
+    assert tracer.stamps.shape == (100, 5)
+    assert list(tracer.levers[:2]) == [1, 2]
+    p = tracer.percentiles()
+    assert set(p) == set(SEGMENTS) | {TOTAL}
+    assert p["arrival->dispatch"]["p99"] == 0.1
+    assert p["enqueue->write"]["max"] == 1.0
+    assert p[TOTAL]["p50"] == 0.855
+    assert tracer.readout().endswith(" / 1.30 / 1.34")
+
+
+def test_writes_close_oldest_and_discard():
+    tracer = LatencyTracer()
+    tracer.begin(1, 0, 0, 1 * MS)
+    tracer.enqueued(1 * MS)
+    tracer.begin(2, 2 * MS, 2 * MS, 3 * MS)
+    tracer.enqueued(3 * MS)
+    tracer.written(4 * MS)
+    assert tracer.count == 1 and tracer.levers[0] == 1
+    assert tracer.durations_ms()[TOTAL][0] == 4.0
+
+    tracer.discard_open()                   # la cola TX se vació: la segunda DISP no sale
+    tracer.written(10 * MS)
+    assert tracer.count == 1
+    assert tracer.discarded == 1 and tracer.unmatched == 1
+
+
+def test_histogram_and_report_lines():
+    tracer = LatencyTracer()
+    assert histogram_lines(tracer.summary()) == ["Sin refuerzos decididos por el host"]
+    for total_ms in (0.3, 0.4, 3, 3, 3, 1500):
+        _trace(tracer, 1, 0, (0, 0, 0, total_ms))
+
+    summary = tracer.summary()
+    hist = summary["histogram"]
+    assert hist["counts"][1] == 2 and hist["counts"][4] == 3 and hist["overflow"] == 1
+    assert sum(hist["counts"]) + hist["overflow"] == summary["count"] == 6
+
+    lines = histogram_lines(summary, width=6)
+    assert lines[0].startswith("Presión -> DISP:1 (n=6)")
+    assert lines[-1].endswith("| ##     1") and "> 1000 ms" in lines[-1]
+    assert any(line.endswith("| ###### 3") for line in lines)
+
+
+def test_report_says_what_write_measures():
+    for write_point, noted in ((None, False), (WRITE_IO_QUEUE, True)):
+        tracer = LatencyTracer() if write_point is None else LatencyTracer(write_point=write_point)
+        _trace(tracer, 1, 0, (0, 0, 0, 1))
+        summary = tracer.summary()
+        assert summary["write_point"] == (write_point or "port")
+        assert any("hilo de E/S" in line for line in histogram_lines(summary)) == noted
+
+
+if __name__ == "__main__":
+    tests = [(name, fn) for name, fn in sorted(globals().items())
+             if name.startswith("test_") and callable(fn)]
+    for name, fn in tests:
+        fn()
+        print(f"ok  {name}")
+    print(f"{len(tests)} pruebas OK")
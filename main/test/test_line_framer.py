@@ -0,0 +1,89 @@
+"""
+Pruebas del LineFramer: líneas partidas entre lecturas, '\\r\\n', tramas
+que superan max_frame y compactación del buffer al llenarse.
+
+Uso:
+    python -m pytest main/test/test_line_framer.py
+    python -m main.test.test_line_framer
+"""
+from main.core.line_framer import LineFramer
+
+
+def _feed(framer, data):
+    return [bytes(frame) for frame in framer.feed(data)]
+
+
+def test_lines_split_across_reads():
+    framer = LineFramer()
+    frames = []
+    for chunk in (b"P01:", b"1\nL0", b"1:0\nP02", b":1", b"\n"):
+        frames += _feed(framer, chunk)
+    assert frames == [b"P01:1", b"L01:0", b"P02:1"]
+    assert framer.get_stats() == {"frames": 3, "partial_frames": 3, "oversize_frames": 0,
+                                  "pending_bytes": 0}
+
+    assert _feed(framer, b"P01:1\nP0") == [b"P01:1"]
+    assert framer.pending() == 2 and framer.partial_frames == 3
+
+
+def test_crlf_and_empty_lines():
+    framer = LineFramer()
+    assert _feed(framer, b"OK:DISP:1\r\n\r\n\nP01:1\n") == [b"OK:DISP:1", b"P01:1"]
+    assert _feed(framer, b"L01:1\r") == []
+    assert _feed(framer, b"\n") == [b"L01:1"]          # '\r' y '\n' en lecturas distintas
+    assert _feed(framer, b"A\rB\n") == [b"A\rB"]        # solo se quita el '\r' final
+    assert framer.frames == 4
+
+
+def test_oversize_frames_are_dropped():
+    framer = LineFramer(capacity=64, max_frame=8)
+    assert _feed(framer, b"12345678\n" + b"x" * 20 + b"\nOK\n") == [b"12345678", b"OK"]
+    assert framer.oversize_frames == 1
+
+    # Partida entre lecturas: se descarta hasta su '\n' y se cuenta una vez
+    assert _feed(framer, b"y" * 10) == []
+    assert framer.pending() == 0
+    assert _feed(framer, b"y" * 30) == []
+    assert _feed(framer, b"yy\nP01:1\n") == [b"P01:1"]
+    assert framer.oversize_frames == 2
+
+    # El '\r' no cuenta para el largo
+    assert _feed(framer, b"12345678\r\n") == [b"12345678"]
+
+
+def test_compaction_at_capacity():
+    framer = LineFramer(capacity=16, max_frame=8)
+    assert _feed(framer, b"abcdef\nxy") == [b"abcdef"]
+
+    # No cabe: se compacta (el resto "xy" pasa al inicio) y, como la lectura
+    # también desborda después de emitir tramas, estas se copian antes.
+    frames = framer.feed(b"z\n1234567\nQQ\nrest")
+    assert frames == [b"xyz", b"1234567", b"QQ"]
+    assert all(isinstance(frame, bytes) for frame in frames)
+    assert framer.pending() == 4
+    assert _feed(framer, b"\n") == [b"rest"]
+
+
+def test_read_larger_than_capacity():
+    framer = LineFramer(capacity=64, max_frame=16)
+    data = b"".join(b"L01:%d\n" % (i % 2) for i in range(1000))
+    frames = _feed(framer, data[:-3]) + _feed(framer, data[-3:])
+    assert frames == [b"L01:%d" % (i % 2) for i in range(1000)]
+    assert framer.partial_frames == 1 and framer.pending() == 0
+
+
+def test_capacity_must_fit_two_frames():
+    try:
+        LineFramer(capacity=100, max_frame=64)
+    except ValueError:
+        return
+    raise AssertionError("se esperaba ValueError")
+
+
+if __name__ == "__main__":
+    tests = [(name, fn) for name, fn in sorted(globals().items())
+             if name.startswith("test_") and callable(fn)]
+    for name, fn in tests:
+        fn()
+        print(f"ok  {name}")
+    print(f"{len(tests)} pruebas OK")
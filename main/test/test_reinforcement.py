@@ -0,0 +1,82 @@
+"""
+Pruebas directas de `create_schedule(...).on_response()` para los
+programas de razón (CRF, FR, VR) y para EXTINCIÓN/INHABILITADO.
+
+Uso:
+    python -m pytest main/test/test_reinforcement.py
+    python -m main.test.test_reinforcement
+"""
+from main.core.mean_generator import IntervalSequence
+from main.core.reinforcement import create_schedule
+from main.enums.program_enums import ModoPalanca
+
+
+def _clock():
+    return 0.0
+
+
+def _run(schedule, responses):
+    """Índices (desde 1) de las respuestas reforzadas."""
+    return [i for i in range(1, responses + 1) if schedule.on_response(float(i))]
+
+
+def test_crf_reinforces_every_response():
+    schedule = create_schedule(ModoPalanca.CRF, clock=_clock)
+    schedule.start(0.0)
+    assert _run(schedule, 5) == [1, 2, 3, 4, 5]
+    assert schedule.reinforcements == 5 and schedule.t_last_reinforcement == 5.0
+
+
+def test_fr_reinforces_every_nth_response():
+    schedule = create_schedule(ModoPalanca.FR, 3, clock=_clock)
+    schedule.start(0.0)
+    assert _run(schedule, 10) == [3, 6, 9]
+    stats = schedule.get_stats()
+    assert stats == {"mode": "FR", "value": 3, "responses": 10, "reinforcements": 3, "threshold": 3}
+
+    schedule.start(0.0)                     # una sesión nueva empieza de cero
+    assert _run(schedule, 3) == [3] and schedule.responses == 3
+
+
+def test_fr_value_is_at_least_one():
+    schedule = create_schedule(ModoPalanca.FR, 0, clock=_clock)
+    schedule.start(0.0)
+    assert _run(schedule, 3) == [1, 2, 3]
+
+
+def test_vr_uses_interval_source():
+    requirements = iter([2, 1, 4, 3, 5])
+    schedule = create_schedule(ModoPalanca.VR, 3, clock=_clock,
+                               interval_source=lambda: next(requirements))
+    schedule.start(0.0)
+    assert schedule.threshold == 2
+    assert _run(schedule, 10) == [2, 3, 7, 10]
+
+
+def test_vr_keeps_programmed_mean():
+    sequence = IntervalSequence(5, integer=True, seed=7)
+    schedule = create_schedule(ModoPalanca.VR, 5, clock=_clock, interval_source=sequence)
+    schedule.start(0.0)
+    reinforced = _run(schedule, 5 * 10 * len(sequence.base))
+    assert len(reinforced) == 10 * len(sequence.base)   # bloques completos: media exacta
+    gaps = [b - a for a, b in zip([0] + reinforced, reinforced)]
+    assert min(gaps) >= 1 and max(gaps) > min(gaps)
+
+
+def test_extinction_and_disabled_never_reinforce():
+    for mode in (ModoPalanca.EXTINCION, ModoPalanca.INHABILITADO):
+        schedule = create_schedule(mode, 1, clock=_clock)
+        schedule.start(0.0)
+        assert _run(schedule, 20) == []
+        stats = schedule.get_stats()
+        assert stats["mode"] == mode.value and stats["responses"] == 20
+        assert stats["reinforcements"] == 0 and stats["threshold"] is None
+
+
+if __name__ == "__main__":
+    tests = [(name, fn) for name, fn in sorted(globals().items())
+             if name.startswith("test_") and callable(fn)]
+    for name, fn in tests:
+        fn()
+        print(f"ok  {name}")
+    print(f"{len(tests)} pruebas OK")
@@ -0,0 +1,93 @@
+"""
+Pruebas del programa compilado en el firmware (SCHED/SEQ) contra la
+referencia DeviceSchedules, sin puerto serial.
+
+Uso:
+    python -m pytest main/test/test_schedule_offload.py
+    python -m main.test.test_schedule_offload
+"""
+from main.core.reinforcement import LeverSchedules
+from main.core.schedule_offload import ScheduleOffload, DeviceSchedules, compile_schedules, STOP_COMMAND
+from main.enums.program_enums import ModoPalanca
+
+
+def _config(pal1, v1, pal2=ModoPalanca.INHABILITADO, v2=1):
+    return {'pal_1c': pal1.value, 'pal_1v': v1, 'pal_2c': pal2.value, 'pal_2v': v2}
+
+
+class Loopback:
+    """Conecta ScheduleOffload (host) con DeviceSchedules (firmware)."""
+
+    def __init__(self):
+        self.device = DeviceSchedules(clock=lambda: 0.0)
+        self.sent = []
+        self.offload = ScheduleOffload(self.host_send, clock=lambda: 0.0)
+
+    def host_send(self, command):
+        self.sent.append(command)
+        if command.startswith("SCHED:"):
+            self.device.load(command)
+            self.offload.on_device_line(f"OK:{command}")
+        elif command.startswith("SEQ:"):
+            self.device.add_values(command)
+
+    def press(self, lever=1):
+        reinforce, request = self.device.on_press(lever)
+        if request:
+            self.offload.on_device_line(request)
+        return reinforce
+
+
+def test_compile_schedule_line():
+    command, levers = compile_schedules(_config(ModoPalanca.FR, 5, ModoPalanca.EXTINCION, 3))
+    assert command == "SCHED:FR,5,EXT,3"
+    assert levers == {1: (ModoPalanca.FR, 5), 2: (ModoPalanca.EXTINCION, 3)}
+
+
+def test_fixed_ratio_on_device():
+    link = Loopback()
+    link.offload.push(_config(ModoPalanca.FR, 3))
+    assert link.offload.active
+    assert [link.press() for _ in range(6)] == [False, False, True] * 2
+
+
+def test_device_vr_matches_host_with_same_seed():
+    link = Loopback()
+    link.offload.push(_config(ModoPalanca.VR, 4), seed=99)
+    device = [link.press() for _ in range(400)]      # pide bloques con NEXT:1
+
+    host = LeverSchedules(clock=lambda: 0.0)
+    host.new_seed(99)
+    host.configure(1, ModoPalanca.VR, 4)
+    host.start()
+    assert device == [host.on_response(1) for _ in range(400)]
+    assert link.offload.stats["blocks_sent"] > 2
+
+
+def test_fallback_without_ack():
+    sent = []
+    now = [0.0]
+    offload = ScheduleOffload(sent.append, ack_timeout_s=0.5, clock=lambda: now[0])
+    offload.push(_config(ModoPalanca.CRF, 1))
+    now[0] = 0.4
+    assert not offload.check_timeout()
+    now[0] = 0.6
+    assert offload.check_timeout() and not offload.active
+
+    offload.push(_config(ModoPalanca.CRF, 1))
+    offload.on_device_line("ERROR:Unknown command")
+    assert not offload.active and offload.stats["fallbacks"] == 2
+    offload.stop()                                   # nunca lo tomó: nada que detener
+    assert STOP_COMMAND not in sent
+
+    offload.on_device_line(f"OK:{offload.command}")  # confirmación tardía
+    assert sent[-1] == STOP_COMMAND and not offload.active
+
+
+if __name__ == "__main__":
+    tests = [(name, fn) for name, fn in sorted(globals().items())
+             if name.startswith("test_") and callable(fn)]
+    for name, fn in tests:
+        fn()
+        print(f"ok  {name}")
+    print(f"{len(tests)} pruebas OK")
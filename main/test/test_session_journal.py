@@ -0,0 +1,88 @@
+"""
+Pruebas del diario de sesión: registros en disco, fin limpio, recuperación
+de una sesión interrumpida (con final cortado) y que no se recupere dos
+veces.
+
+Uso:
+    python -m pytest main/test/test_session_journal.py
+    python -m main.test.test_session_journal
+"""
+import os
+import glob
+import tempfile
+
+from main.core.event_logger import EventLogger, EventType, DeviceID
+from main.core.session_journal import (
+    read_journal, interrupted_journals, TAG_HEADER, TAG_EVENT, TAG_METADATA, TAG_SESSION, TAG_END,
+)
+
+
+def _interrupted_session(directory):
+    """Una sesión que se corta sin end_session; devuelve los eventos que llegó a ver."""
+    logger = EventLogger(journal_dir=directory, flush_interval_ms=5)
+    logger.start_session({"pal_1c": "FR:5"})
+    for i in range(3):
+        logger.log_event(EventType.LEVER_PRESS, DeviceID.LEVER_01, i + 1)
+    logger.log_event(EventType.SYSTEM_EVENT, DeviceID.SYSTEM, "LINK_DOWN", metadata={"port": "COM3"})
+    logger.set_session_metadata("seed", 7)
+    assert logger._journal.flush()
+    events = logger.get_events()
+    logger._journal.close()               # como si el proceso muriera: no hay end_session
+    return events
+
+
+def test_clean_session_records():
+    with tempfile.TemporaryDirectory() as tmp:
+        logger = EventLogger(journal_dir=tmp)
+        logger.start_session()
+        logger.log_event(EventType.LEVER_PRESS, DeviceID.LEVER_01, 1)
+        logger.end_session()
+        logger.close()
+
+        [path] = glob.glob(os.path.join(tmp, "*.jrnl"))
+        records, end = read_journal(path)
+        assert end == os.path.getsize(path)
+        assert [tag for tag, _ in records] == [TAG_HEADER, TAG_EVENT, TAG_EVENT, TAG_EVENT, TAG_METADATA, TAG_END]
+        assert interrupted_journals(tmp) == []
+        assert EventLogger(journal_dir=tmp).recovered_sessions == []
+
+
+def test_recover_interrupted_session():
+    with tempfile.TemporaryDirectory() as tmp:
+        before = _interrupted_session(tmp)
+        [path] = interrupted_journals(tmp)
+        records, _ = read_journal(path)
+        assert [tag for tag, _ in records].count(TAG_SESSION) == 1
+        with open(path, "ab") as f:       # escritura cortada a la mitad
+            f.write(b"E\x1b\x00\x00\x00partial")
+
+        logger = EventLogger(journal_dir=tmp)
+        assert logger.recovered_sessions == [1]
+        assert not logger.is_session_active()
+        df = logger.get_events()
+        assert len(df) == len(before) + 1
+        for col in ("timestamp", "event_type", "device_id", "new_value", "elapsed_sec", "metadata"):
+            assert df[col].iloc[:-1].tolist() == before[col].tolist()
+        last = df.iloc[-1]
+        assert last["event_type"] == "SESSION_END" and '"recovered": true' in last["metadata"]
+        metadata = logger.get_session_metadata(1)
+        assert metadata["pal_1c"] == "FR:5" and metadata["seed"] == 7
+        assert metadata["recovered_from"] == os.path.basename(path)
+
+        # La siguiente sesión sigue la numeración y el archivo ya no se recupera
+        logger.start_session()
+        assert logger.get_current_session_id() == 2
+        logger.end_session()
+        logger.close()
+        assert interrupted_journals(tmp) == []
+        assert read_journal(path)[0][-1][0] == TAG_END
+        assert EventLogger(journal_dir=tmp).recovered_sessions == []
+
+
+if __name__ == "__main__":
+    tests = [(name, fn) for name, fn in sorted(globals().items())
+             if name.startswith("test_") and callable(fn)]
+    for name, fn in tests:
+        fn()
+        print(f"ok  {name}")
+    print(f"{len(tests)} pruebas OK")
@@ -0,0 +1,63 @@
+"""
+Pruebas del SessionState (contadores, latencia y respuestas por minuto).
+
+Uso:
+    python -m pytest main/test/test_session_state.py
+    python -m main.test.test_session_state
+"""
+from main.core.session_state import SessionState
+from main.enums.indicators_enum import IndicatorKey
+
+S = 1_000_000_000
+
+
+def test_counters_without_text():
+    state = SessionState()
+    for _ in range(3):
+        state.update_value(IndicatorKey.LEVER_01_COUNT, 1, increment=True)
+    state.update_value(IndicatorKey.RECONPENSA_COUNT, 1, increment=True)
+    assert state.get_val_pal01_count() == 3
+    assert state.get_val_food_count() == 1
+    assert state.get_last_p01_event()
+    state.set_last_p01_event(False)
+    assert not state.get_last_p01_event()
+
+
+def test_latency_and_minute_bins():
+    state = SessionState()
+    state.start(t_start_ns=10 * S)
+    state.update_value(IndicatorKey.LEVER_01_COUNT, increment=True, t_arrival_ns=12_500_000_000)
+    state.update_value(IndicatorKey.LEVER_02_COUNT, increment=True, t_arrival_ns=30 * S)
+    state.update_value(IndicatorKey.LEVER_01_COUNT, increment=True, t_arrival_ns=75 * S)
+    state.update_value(IndicatorKey.LEVER_01_COUNT, increment=True, t_arrival_ns=190 * S)
+
+    assert state.get_val_latency() == 2.5
+    assert state.display(IndicatorKey.LATENCY_VAL) == "2.50"
+    assert state.minute_bins == [2, 1, 0, 1]
+    assert state.responses_per_minute(30) == 4      # antes del primer minuto: acumuladas
+    assert state.responses_per_minute(60) == 2
+    assert state.responses_per_minute(120) == 1
+    assert state.responses_per_minute(600) == 0
+    assert state.t_last_ns[IndicatorKey.LEVER_01_COUNT] == 190 * S
+
+
+def test_reset_and_change_notifications():
+    state = SessionState()
+    changed = []
+    state.on_change = changed.append
+    state.update_value(IndicatorKey.LED_01_STATE, "1")
+    assert state.display(IndicatorKey.LED_01_STATE) == "ON"
+    assert changed == [IndicatorKey.LED_01_STATE]
+
+    state.reset_all()
+    assert state.led_01 == 0 and state.latency_s is None and state.minute_bins == []
+    assert set(changed[1:]) == set(IndicatorKey)
+
+
+if __name__ == "__main__":
+    tests = [(name, fn) for name, fn in sorted(globals().items())
+             if name.startswith("test_") and callable(fn)]
+    for name, fn in tests:
+        fn()
+        print(f"ok  {name}")
+    print(f"{len(tests)} pruebas OK")
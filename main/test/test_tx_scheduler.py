@@ -0,0 +1,208 @@
+"""
+Pruebas del TxScheduler con un SerialManager falso y reloj simulado:
+orden por prioridad, fusión de LEDs en su turno (y descarte de los que no
+cambian el estado enviado), ritmo `min_gap_ms` y ACK con reintentos/fallo.
+
+Uso:
+    python -m pytest main/test/test_tx_scheduler.py
+    python -m main.test.test_tx_scheduler
+"""
+from PyQt6.QtCore import QCoreApplication
+
+from main.core.tx_scheduler import TxScheduler
+from main.enums.protocol_enums import TxPriority
+
+MS = 1_000_000
+
+app = QCoreApplication.instance() or QCoreApplication([])
+
+
+class FakeClock:
+    def __init__(self, start: int = 1000 * MS):
+        self.now = start
+
+    def __call__(self) -> int:
+        return self.now
+
+    def advance(self, ms: float) -> int:
+        self.now += int(ms * MS)
+        return self.now
+
+
+class FakeSerial:
+    """Hace de SerialManager: guarda (t, comando) de cada escritura."""
+
+    def __init__(self, clock: FakeClock):
+        self.clock = clock
+        self.sent = []
+        self.connected = True
+
+    def is_connected(self) -> bool:
+        return self.connected
+
+    def send_data_str(self, data: str) -> None:
+        self.sent.append((self.clock(), data))
+
+    def commands(self):
+        return [command for _, command in self.sent]
+
+
+def _scheduler(**kwargs):
+    clock = FakeClock()
+    serial = FakeSerial(clock)
+    return TxScheduler(serial, clock=clock, **kwargs), serial, clock
+
+
+def _tick(scheduler):
+    """Hace de QTimer: dispara el ritmo como si hubiera vencido."""
+    scheduler._pace_timer.stop()
+    scheduler._pump()
+
+
+def _drain(scheduler, clock, step_ms=None):
+    step_ms = scheduler.min_gap_ms if step_ms is None else step_ms
+    while scheduler.depth():
+        clock.advance(step_ms)
+        _tick(scheduler)
+
+
+def test_priority_order():
+    scheduler, serial, clock = _scheduler()
+    scheduler.submit("LED1:ON", TxPriority.LED, coalesce_key="LED1")   # sale enseguida
+    scheduler.submit("LED2:ON", TxPriority.LED, coalesce_key="LED2")
+    scheduler.submit("CFG:1", TxPriority.CONTROL)
+    scheduler.submit("DISP:1", TxPriority.REWARD)
+    scheduler.submit("CFG:2", TxPriority.CONTROL)
+    assert serial.commands() == ["LED1:ON"] and scheduler.depth() == 4
+    _drain(scheduler, clock)
+    assert serial.commands() == ["LED1:ON", "DISP:1", "CFG:1", "CFG:2", "LED2:ON"]
+    assert scheduler.get_stats()["max_depth"] == 4
+
+
+def test_led_coalescing_keeps_queue_position():
+    scheduler, serial, clock = _scheduler()
+    scheduler.submit("CFG:1", TxPriority.CONTROL)
+    scheduler.submit("LED1:ON", TxPriority.LED, coalesce_key="LED1")
+    scheduler.submit("LED2:ON", TxPriority.LED, coalesce_key="LED2")
+    scheduler.submit("LED1:OFF", TxPriority.LED, coalesce_key="LED1")
+    scheduler.submit("LED1:ON", TxPriority.LED, coalesce_key="LED1")
+    assert scheduler.depth() == 2
+    _drain(scheduler, clock)
+    assert serial.commands() == ["CFG:1", "LED1:ON", "LED2:ON"]
+    stats = scheduler.get_stats()
+    assert stats["submitted"] == 5 and stats["coalesced"] == 2 and stats["sent"] == 3
+
+    # Ya enviado, la misma clave vuelve a encolarse
+    scheduler.submit("LED1:OFF", TxPriority.LED, coalesce_key="LED1")
+    _drain(scheduler, clock)
+    assert serial.commands()[-1] == "LED1:OFF"
+
+
+def test_led_state_already_sent_is_dropped():
+    scheduler, serial, clock = _scheduler()
+    scheduler.submit("LED1:ON", TxPriority.LED, coalesce_key="LED1")
+    clock.advance(20)
+    scheduler.submit("LED1:ON", TxPriority.LED, coalesce_key="LED1")     # no cambia nada
+    assert scheduler.depth() == 0 and not scheduler._pace_timer.isActive()
+
+    # ON -> OFF -> ON mientras espera: vuelve al estado enviado y no se escribe
+    scheduler.submit("CFG:1", TxPriority.CONTROL)
+    scheduler.submit("LED1:OFF", TxPriority.LED, coalesce_key="LED1")
+    scheduler.submit("LED1:ON", TxPriority.LED, coalesce_key="LED1")
+    scheduler.submit("LED2:OFF", TxPriority.LED, coalesce_key="LED2")
+    _drain(scheduler, clock)
+    assert serial.commands() == ["LED1:ON", "CFG:1", "LED2:OFF"]
+    assert scheduler.get_stats()["redundant"] == 2
+
+    scheduler.clear()                       # p. ej. reconexión: el estado del equipo se desconoce
+    clock.advance(20)
+    scheduler.submit("LED1:ON", TxPriority.LED, coalesce_key="LED1")
+    assert serial.commands()[-1] == "LED1:ON" and len(serial.sent) == 4
+
+
+def test_min_gap_pacing():
+    scheduler, serial, clock = _scheduler(min_gap_ms=20)
+    scheduler.submit("A")
+    clock.advance(5)
+    scheduler.submit("B")
+    assert serial.commands() == ["A"]
+    assert scheduler._pace_timer.isActive() and scheduler._pace_timer.interval() == 15
+
+    clock.advance(5)                        # el timer despertó antes de tiempo
+    _tick(scheduler)
+    assert serial.commands() == ["A"] and scheduler._pace_timer.interval() == 10
+
+    clock.advance(10)
+    _tick(scheduler)
+    assert serial.commands() == ["A", "B"]
+    assert serial.sent[1][0] - serial.sent[0][0] == 20 * MS
+    assert scheduler.get_stats()["latency_max_us"] == 15_000
+
+    for command in ("C", "D", "E"):
+        scheduler.submit(command)
+    _drain(scheduler, clock, step_ms=7)
+    times = [t for t, _ in serial.sent]
+    assert serial.commands() == ["A", "B", "C", "D", "E"]
+    assert all(b - a >= 20 * MS for a, b in zip(times, times[1:]))
+
+
+def test_ack_received_stops_waiting():
+    scheduler, serial, clock = _scheduler(require_ack=True)
+    scheduler.submit("DISP:1", TxPriority.REWARD)
+    scheduler.submit("LED1:ON", TxPriority.LED, coalesce_key="LED1")
+    _drain(scheduler, clock)
+    assert scheduler.get_stats()["inflight"] == 1      # solo las recompensas esperan ACK
+    assert scheduler.on_device_reply("OK:DISP:1")
+    assert not scheduler.on_device_reply("P01:1")
+    clock.advance(1000)
+    scheduler._check_ack_timeouts()
+    assert serial.commands() == ["DISP:1", "LED1:ON"]
+    assert scheduler.get_stats()["retries"] == 0 and not scheduler._ack_timer.isActive()
+
+
+def test_ack_timeout_retries_then_fails():
+    scheduler, serial, clock = _scheduler(require_ack=True, ack_timeout_ms=300, max_retries=2)
+    failed, sent = [], []
+    scheduler.command_failed.connect(lambda command, reason: failed.append((command, reason)))
+    scheduler.command_sent.connect(lambda command, latency_us, retry: sent.append((command, retry)))
+
+    scheduler.submit("DISP:1", TxPriority.REWARD)
+    clock.advance(299)
+    scheduler._check_ack_timeouts()
+    assert serial.commands() == ["DISP:1"]
+
+    for _ in range(2):                      # dos reintentos, cada uno se reenvía
+        clock.advance(300)
+        scheduler._check_ack_timeouts()
+    assert serial.commands() == ["DISP:1"] * 3
+    assert sent == [("DISP:1", 0), ("DISP:1", 1), ("DISP:1", 2)]   # el tracer solo cierra con 0
+    assert failed == []
+
+    clock.advance(300)
+    scheduler._check_ack_timeouts()
+    assert failed == [("DISP:1", "timeout ACK")]
+    stats = scheduler.get_stats()
+    assert stats["retries"] == 2 and stats["failed"] == 1 and stats["inflight"] == 0
+    assert not scheduler._ack_timer.isActive()
+
+
+def test_error_reply_retries_oldest():
+    scheduler, serial, clock = _scheduler(require_ack=True, max_retries=1)
+    scheduler.submit("DISP:1", TxPriority.REWARD)
+    clock.advance(20)
+    _tick(scheduler)
+    scheduler.submit("DISP:2", TxPriority.REWARD)
+    assert scheduler.on_device_reply("ERROR:Command queue full")
+    _drain(scheduler, clock)
+    assert serial.commands() == ["DISP:1", "DISP:2", "DISP:1"]
+    assert scheduler.on_device_reply("OK:DISP:2") and scheduler.on_device_reply("OK:DISP:1")
+    assert scheduler.get_stats()["inflight"] == 0
+
+
+if __name__ == "__main__":
+    tests = [(name, fn) for name, fn in sorted(globals().items())
+             if name.startswith("test_") and callable(fn)]
+    for name, fn in tests:
+        fn()
+        print(f"ok  {name}")
+    print(f"{len(tests)} pruebas OK")
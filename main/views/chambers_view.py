@@ -0,0 +1,76 @@
+"""
+Vista multi-cámara: un PanelControlView por caja dentro de pestañas
+"""
+from typing import Optional
+
+from PyQt6.QtWidgets import QTabWidget
+from PyQt6.QtCore import pyqtSignal
+
+from main.views.base_view import BaseView
+from main.views.pnl_ctrl import PanelControlView
+from main.core.chamber_manager import ChamberManager, Chamber
+
+
+class ChambersView(BaseView):
+    """
+    Muestra todas las cámaras del ChamberManager. Cada pestaña es un panel
+    de control completo con su propio puerto, motor y registro; todas usan
+    el tick compartido del gestor. Solo la pestaña visible refresca sus
+    indicadores; las ocultas acumulan los cambios y los pintan al mostrarse.
+    """
+    session_ended = pyqtSignal(int, object)   # chamber_id, datos de la sesión
+
+    def setup_ui(self):
+        self.tabs = QTabWidget()
+        self.tabs.setDocumentMode(True)
+        self.layout.setContentsMargins(0, 0, 0, 0)
+        self.layout.addWidget(self.tabs)
+        self.tabs.currentChanged.connect(self._on_current_changed)
+
+    def set_manager(self, manager: ChamberManager):
+        """Crea una pestaña por cada cámara existente y por las que se agreguen."""
+        self.manager = manager
+        for chamber in manager.chambers.values():
+            self._add_chamber_tab(chamber)
+        manager.chamber_added.connect(lambda cid: self._add_chamber_tab(manager.get_chamber(cid)))
+
+    def _add_chamber_tab(self, chamber: Chamber):
+        if chamber.view is not None:
+            return
+        view = PanelControlView(
+            serial_manager=chamber.serial_manager,
+            event_logger=chamber.event_logger,
+            tick_signal=self.manager.tick,
+            interval_scheduler=self.manager.interval_scheduler,
+            chamber_id=chamber.chamber_id,
+        )
+        chamber.view = view
+        index = self.tabs.addTab(view, chamber.name)
+        view.info_group.set_refresh_paused(self.tabs.currentWidget() is not view)
+
+        chamber.serial_manager.connection_changed.connect(
+            lambda connected, port, i=index, c=chamber: self._update_tab_title(i, c, connected, port)
+        )
+        chamber.event_logger.session_ended.connect(
+            lambda data, c=chamber: self.session_ended.emit(c.chamber_id, data)
+        )
+
+    def _on_current_changed(self, index: int):
+        current = self.tabs.widget(index)
+        for i in range(self.tabs.count()):
+            view = self.tabs.widget(i)
+            view.info_group.set_refresh_paused(view is not current)
+
+    def _update_tab_title(self, index: int, chamber: Chamber, connected: bool, port: str):
+        title = f"{chamber.name} ({port})" if connected and port else chamber.name
+        self.tabs.setTabText(index, title)
+
+    def current_chamber(self) -> Optional[Chamber]:
+        view = self.tabs.currentWidget()
+        for chamber in self.manager.chambers.values():
+            if chamber.view is view:
+                return chamber
+        return None
+
+    def refresh_data(self, session_id: Optional[int] = None):
+        pass
@@ -12,6 +12,7 @@ import os
 import csv
 
 from main.views.base_view import BaseView
+from main.utils.logger import Logger
 from main.styles.styles import AppStyles
 
 from PyQt6.QtSerialPort import QSerialPort
@@ -29,9 +30,17 @@ from main.components.header_view import HeaderWidget
 from main.utils.resource_path import get_resource_path
 
 from main.core.serial_manager import SerialManager
-from main.enums.program_enums import ModoLuz, ModoPalanca
+from main.core.tx_scheduler import TxScheduler, TxPriority
+from main.core import protocol_schema as protocol
+from main.core.program_engine import ProgramEngine
+from main.enums.program_enums import ModoLuz, ModoPalanca, DispatchMode, ProtocolMode, ParseMode, ScheduleSite
 
-from main.core.mean_generator import MeanTimeGeneratorMS, MeanTimeGeneratorSeconds, MeanTimeGeneratorInt
+from main.core.reinforcement import LeverSchedules
+from main.core.session_state import SessionState
+from main.core.schedule_offload import ScheduleOffload
+from main.core.latency_trace import LatencyTracer, WRITE_PORT, WRITE_IO_QUEUE
+from main.core.interval_scheduler import IntervalScheduler
+from main.core.qt_interval_driver import QtIntervalDriver
 
 
 ##-------------------------------------------------------------##
@@ -60,238 +69,135 @@ def seconds_to_hhmmss(total_seconds: int) -> str:
     return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
 
 
-class ProgramEngine:
-    """
-    Lógica principal del programa: estados, modos y procesamiento de comandos recibidos por UART.
-    """
-    def __init__(self, 
-                 send_cmd_callback, 
-                 check_event_palanc,
-                 prog_section:ProgramControlBox,
-                 info_group:IndicatorsSectionBox,
-                 
-                 logger):
-        self.send_cmd = send_cmd_callback
-        self.prog_section = prog_section
-        self.info_group = info_group
-        self.check_event_palanc = check_event_palanc
-        self.logger = logger
-
-            
-
-    def process_uart_line(self, line):
-        """
-        Procesa un mensaje recibido por UART.
-        """
-        if self.prog_section.get_runing_state is False:
-            return
-        
-        # Ejemplo básico de parseo
-        parts = line.split()
-        #self.logger.debug(f"[ProgramEngine] Process Line: {line}")
-        
-        for part in parts:
-            self.logger.debug(f"[ProgramEngine] RX part: {part}")
-            
-            if part.startswith("L01:"):
-                value = part.split(":")[1].strip()
-                if value.isdigit():
-                    self.info_group.update_value(IndicatorKey.LED_01_STATE, value, increment=False)
-                
-            elif part.startswith("L02:"):
-                value = part.split(":")[1].strip()
-                if value.isdigit():
-                    self.info_group.update_value(IndicatorKey.LED_02_STATE, value, increment=False)
-                
-                # Aquí actualizas UI o estado interno
-            elif part.startswith("P01:"):
-                value = part.split(":")[1].strip()
-                if value.isdigit():
-                    self._handle_palanca(IndicatorKey.LEVER_01_COUNT, int(value))
-                    
-            elif part.startswith("P02:"):
-                value = part.split(":")[1].strip()
-                if value.isdigit():
-                    self._handle_palanca(IndicatorKey.LEVER_02_COUNT, int(value))
-                    
-            elif part.startswith("IR1:"):
-                value = part.split(":")[1].strip()
-                if value.isdigit():
-                    self._handle_recompensa_food(value)
-                    
-            else:
-                self.logger.warning(f"unknow command: {part}")
-                continue
-                
-        #----ACCIONES LUEGO DE PROCESAR ---------                
-    def _handle_palanca(self,key,value):
-        
-        if key == IndicatorKey.LEVER_01_COUNT:            
- 
-            modo = self.prog_section.get_pal1_mode()   
-            if modo in [ModoPalanca.CRF , ModoPalanca.FI, ModoPalanca.FR, ModoPalanca.VI, ModoPalanca.VR]:
-                # self.plt_group.graph_left.register_pulse(self.name_plt_lf_l1)
-                self.info_group.update_value(key, value, increment=True)
-                
-            if modo in [ModoPalanca.CRF, ModoPalanca.FR, ModoPalanca.VR]:
-                self.check_event_palanc(1)
-                
-        elif key == IndicatorKey.LEVER_02_COUNT:            
- 
-            modo = self.prog_section.get_pal2_mode()   
-            if modo in [ModoPalanca.CRF , ModoPalanca.FI, ModoPalanca.FR, ModoPalanca.VI, ModoPalanca.VR]:
-                # self.plt_group.graph_left.register_pulse(self.name_plt_lf_l1)
-                self.info_group.update_value(key, value, increment=True)
-                
-            if modo in [ModoPalanca.CRF, ModoPalanca.FR, ModoPalanca.VR]:
-                self.check_event_palanc(2)
-
-    
-    def _handle_disp_food(self, value):
-        #self.logger.info(f"Comando DISP recibido: {value}")
-        if value.isdigit():
-            self.info_group.update_value(IndicatorKey.DISPENSA_COUNT, value, increment=True)
-            
-            # Agregar más comandos aquí
-    def _handle_recompensa_food(self, value):
-        if value.isdigit():
-            self.info_group.update_value(IndicatorKey.RECONPENSA_COUNT  , value, increment=True)
-
 # SerialReceiver.py
+import time
 from queue import Queue
+from main.core.batch_parser import EventBatch, create_decoder
 
 class SerialReceiver:
     """
-    Se encarga de recibir datos crudos de UART y guardarlos en una cola para su posterior procesamiento.
+    Se encarga de recibir datos crudos de UART, separarlos en líneas completas
+    (o tramas binarias si se negoció PROTO:BIN) y guardarlas en una cola, como
+    (payload, t_arrival_ns), para su posterior procesamiento.
+    Con `ParseMode.BATCH` cada lectura se encola como un solo EventBatch.
     """
-    def __init__(self, logger=None):
+    def __init__(self, logger=None, parse_mode: ParseMode = ParseMode.LINE):
         self.queue = Queue()
         self.logger = logger
+        self.decoder = create_decoder(parse_mode)
+        self.lines_ready_callback = None  # modo push: se llama tras encolar líneas
 
     def on_data_received(self, data: bytes, port_name: str = ""):
         """
         Llamado cuando llega data desde el puerto serial.
+        Una lectura puede traer media línea o varias líneas juntas.
         """
+        t_arrival_ns = time.perf_counter_ns()
         try:
             if self.logger:
                 self.logger.debug(f"Data RX {port_name}: {data}")
-                
-            line = data.decode(errors='ignore').strip()
-            if line:
-                self.queue.put(line)
-                
+
+            for item in self.decoder.feed(data, t_arrival_ns):
+                self.queue.put(item)
+            self._notify()
+
         except Exception as e:
             if self.logger:
                 self.logger.error(f"Error al decodificar datos: {e}")
-                
+
+    def on_lines_received(self, lines: list, port_name: str = ""):
+        """
+        Llamado con un lote de líneas ya separadas por el hilo de E/S.
+        """
+        for item in lines:
+            self.queue.put(item)
+        self._notify()
+
+    def _notify(self):
+        if self.lines_ready_callback is not None and not self.queue.empty():
+            self.lines_ready_callback(self.queue)
+
 # DataProcessor.py
 class DataProcessor:
     """
     Extrae mensajes de la cola y los envía al motor del programa para su interpretación.
+
+    En modo push (`dispatch`) las líneas se procesan en cuanto se encolan; si
+    llega una ráfaga, se procesan en lotes de `max_batch` cediendo el bucle de
+    eventos entre lotes para no congelar la UI.
     """
-    def __init__(self, program_engine: ProgramEngine, logger=None):
+    def __init__(self, program_engine: ProgramEngine, logger=None, max_batch: int = 64):
         self.engine = program_engine
         self.logger = logger
+        self.max_batch = max_batch
+        self._drain_scheduled = False
 
-    def process_pending(self, queue):
+    def process_pending(self, queue, max_lines: int = None) -> int:
         """
-        Procesa todos los mensajes que haya en la cola.
+        Procesa los mensajes que haya en la cola (todos, o como máximo `max_lines`).
+        Devuelve la cantidad de líneas procesadas.
         """
-        while not queue.empty():
+        processed = 0
+        while not queue.empty() and (max_lines is None or processed < max_lines):
             try:
-                line = queue.get_nowait()
-                self.engine.process_uart_line(line)
+                payload, t_arrival_ns = queue.get_nowait()
+                if isinstance(payload, str):
+                    self.engine.process_uart_line(payload, t_arrival_ns)
+                elif isinstance(payload, EventBatch):
+                    self.engine.process_batch(payload, t_arrival_ns)
+                else:
+                    self.engine.process_record(payload, t_arrival_ns)
             except Exception as e:
                 if self.logger:
                     self.logger.error(f"Error process line: {e}")
                 # print(f"[DataProcessor] Error procesando línea: {e}")
-                
-##-------------------------------------------------------------##
-from PyQt6.QtCore import QThread, pyqtSignal, QObject 
+            processed += 1
+        return processed
 
-from PyQt6.QtCore import (
-    QObject, 
-    QThread, 
-    QMetaObject, 
-    Qt, 
-    pyqtSignal, 
-    Q_ARG
-)
+    def dispatch(self, queue):
+        """
+        Procesa de inmediato las líneas recién encoladas (modo push).
+        """
+        if self._drain_scheduled:
+            return  # ya hay un drenado pendiente; respeta el orden de llegada
 
-from PyQt6.QtCore import QObject, QThread, pyqtSignal, QMutex, pyqtSlot
+        self.process_pending(queue, self.max_batch)
+        if not queue.empty():
+            self._drain_scheduled = True
+            QTimer.singleShot(0, lambda: self._drain(queue))
 
-class GeneratorManager(QObject):
-    value_ready = pyqtSignal(int, int)  # palanca_num, value
-    
-    def __init__(self):
-        super().__init__()
-        self.generators = {
-            1: MeanTimeGeneratorInt(),
-            2: MeanTimeGeneratorInt()
-        }
-        self.mutex = QMutex()
-        self.current_values = {1: 0, 2: 0}
-        
-    def get_value(self, palanca_num):
-        """Obtiene el último valor generado (thread-safe)"""
-        self.mutex.lock()
-        value = self.current_values[palanca_num]
-        self.mutex.unlock()
-        return value
-    
-    @pyqtSlot(int, result=int)
-    def get_total_value(self, palanca_num):
-        self.mutex.lock()
-        try:
-            return self.generators[palanca_num].get_total_value()
-        finally:
-            self.mutex.unlock()
-    
-    @pyqtSlot(int)  # <-- Añade este decorador
-    def generate_next(self, palanca_num):
-        """Genera el siguiente valor (ejecutar en hilo secundario)"""
-        self.mutex.lock()
-        new_value = self.generators[palanca_num].next_value()
-        self.current_values[palanca_num] = new_value
-        self.mutex.unlock()
-        self.value_ready.emit(palanca_num, new_value)
-
-    @pyqtSlot(int, int)  # <-- Añade este decorador
-    def reset_generator(self, palanca_num, target):
-        """Reinicia el generador (thread-safe)"""
-        self.mutex.lock()
-        self.generators[palanca_num].reset(target, 50, 1)
-        self.mutex.unlock()
-        
-    @pyqtSlot(int, int, int, int)  # palanca_num, target, range_pct, precision_s
-    def reset_generator(self, palanca_num, target, range_pct=50, precision_s=1):
-        """Reinicia el generador de manera thread-safe"""
-        self.mutex.lock()
-        try:
-            self.generators[palanca_num].reset(
-                target_s=target,
-                range_pct=range_pct,
-                precision_s=precision_s
-            )
-            # Generar un valor inicial inmediato
-            initial_value = self.generators[palanca_num].next_value()
-            self.current_values[palanca_num] = initial_value
-            self.value_ready.emit(palanca_num, initial_value)
-        finally:
-            self.mutex.unlock()
-            
+    def _drain(self, queue):
+        self._drain_scheduled = False
+        self.dispatch(queue)
+                
 ##-------------------------------------------------------------#
 from main.core.event_logger import EventType, EventLogger, DeviceID
 
 class PanelControlView(BaseView):
-    def __init__(self, serial_manager: SerialManager = None, event_logger: EventLogger = None, parent=None):
+    def __init__(self, serial_manager: SerialManager = None, event_logger: EventLogger = None, parent=None,
+                 dispatch_mode: DispatchMode = DispatchMode.PUSH,
+                 protocol_mode: ProtocolMode = ProtocolMode.ASCII,
+                 tick_signal=None, chamber_id: int = None,
+                 parse_mode: ParseMode = ParseMode.LINE,
+                 interval_scheduler: IntervalScheduler = None,
+                 schedule_site: ScheduleSite = ScheduleSite.HOST):
         super().__init__(serial_manager=serial_manager, event_logger=event_logger, parent=parent)
+        self.dispatch_mode = dispatch_mode
+        self.protocol_mode = protocol_mode
+        self.chamber_id = chamber_id
+        if chamber_id is not None:
+            self.logger = Logger(f"{self.__class__.__name__}.{chamber_id:02d}")
 
         
 
         # 2. Configuración de temporizadores
+        # En modo multi-cámara se usa el tick compartido del ChamberManager
         self.timer = QTimer(self)
         self.timer.timeout.connect(self._update_timer_events)
+        self._shared_tick = tick_signal is not None
+        self._ticking = False
+        if self._shared_tick:
+            tick_signal.connect(self._on_shared_tick)
         self.start_time = None
         self.end_time = None    
         self.elapsed = 0
@@ -299,23 +205,45 @@ class PanelControlView(BaseView):
         self.name_plt_rh_l1="Presiones"
         self.name_plt_lf_l1="Presiones"
         
-        self.gen_pal01 = MeanTimeGeneratorInt()
-        self.gen_pal02 = MeanTimeGeneratorInt()
+        # Programas de refuerzo, uno por palanca (se configuran al iniciar).
+        # Los plazos FI/VI van a un planificador de instantes absolutos; en
+        # multi-cámara se comparte el del ChamberManager.
+        if interval_scheduler is None:
+            self._interval_driver = QtIntervalDriver(parent=self)
+            interval_scheduler = self._interval_driver.scheduler
+        self.schedules = LeverSchedules(timer=interval_scheduler,
+                                        on_available=self._on_interval_available)
+
+        # Planificador TX del puerto (prioridad, fusión de LEDs y ritmo)
+        self.tx = TxScheduler(self.serial_manager, logger=self.logger)
+
+        # Latencia por etapas de cada refuerzo decidido en el host
+        self.tracer = LatencyTracer(
+            write_point=WRITE_IO_QUEUE if self.serial_manager.threaded else WRITE_PORT)
+        self._dispense_cmd = protocol.dispense_command()
+        self.tx.command_sent.connect(self._on_command_sent)
+
+        # Programa compilado en el firmware (solo con ScheduleSite.DEVICE)
+        self.schedule_site = schedule_site
+        self.offload = ScheduleOffload(self.send_uart_cmd, logger=self.logger)
+        self._session_config = None
         
          # 1️ Inicializar motor del programa
         self.engine = ProgramEngine(
             send_cmd_callback=self.send_uart_cmd,
             check_event_palanc = self.check_palanca_num,
             prog_section=self.prog_section,
-            info_group=self.info_group,
-            logger=self.logger
+            info_group=self.session_state,
+            logger=self.logger,
+            reply_callback=self._on_device_reply,
+            device_reinforcement_callback=self._on_device_reinforcement
         )
         
         
         
 
          # 2️ Inicializar receptor de UART
-        self.receiver = SerialReceiver(logger=self.logger)
+        self.receiver = SerialReceiver(logger=self.logger, parse_mode=parse_mode)
 
         # 3️ Inicializar procesador de datos
         self.processor = DataProcessor(self.engine, logger=self.logger)
@@ -324,89 +252,18 @@ class PanelControlView(BaseView):
         self._setup_connections()
     
 
-        # 5 Timer para procesar datos UART (cada 100 ms)
+        # 5 Despacho de datos UART: push (al llegar) o sondeo cada 100 ms
         self.timer_uart = QTimer()
         self.timer_uart.timeout.connect(lambda: self.processor.process_pending(self.receiver.queue))
-        self.timer_uart.start(100)
-        
-         # Crear worker y thread
-        self.setup_generators()
+        if self.dispatch_mode == DispatchMode.POLL:
+            self.timer_uart.start(100)
+        else:
+            self.receiver.lines_ready_callback = self.processor.dispatch
         
     def refresh_data(self, session_id: int):
         """Actualiza todos los datos de la vista con la sesión especificada"""
         pass
     
-    # En tu PanelControlView
-    def setup_generators(self):
-        self.gen_manager = GeneratorManager()
-        self.gen_thread = QThread()
-
-        # Mover el manager al hilo secundario
-        self.gen_manager.moveToThread(self.gen_thread)
-
-        # Conectar señales
-        self.gen_manager.value_ready.connect(self.handle_generated_value)
-
-        # Iniciar el hilo
-        self.gen_thread.start()
-
-        # Generar valores iniciales
-        QMetaObject.invokeMethod(self.gen_manager, "generate_next", 
-                                Qt.ConnectionType.QueuedConnection,
-                                Q_ARG(int, 1))
-        
-        QMetaObject.invokeMethod(self.gen_manager, "generate_next", 
-                                Qt.ConnectionType.QueuedConnection,
-                                Q_ARG(int, 2))
-
-    def handle_generated_value(self, palanca_num, value):
-        """Maneja los valores generados (se ejecuta en el hilo principal)"""
-        self.logger.info(f"gen 01: {palanca_num}: {value}")
-            
-        
-
-    def reset_generators_config(self):
-        """Reinicia ambos generadores con la configuración actual"""
-        # Configuración palanca 1
-        if self.prog_section.get_pal1_mode() in [ModoPalanca.VI, ModoPalanca.VR]:
-            target = self.prog_section.get_pal1_time()
-            QMetaObject.invokeMethod(
-                self.gen_manager,
-                "reset_generator",
-                Qt.ConnectionType.QueuedConnection,
-                Q_ARG(int, 1),
-                Q_ARG(int, target),
-                Q_ARG(int, 50),  # range_pct
-                Q_ARG(int, 1)    # precision_s
-            )
-        
-        # Configuración palanca 2
-        if self.prog_section.get_pal2_mode() in [ModoPalanca.VI, ModoPalanca.VR]:
-            target = self.prog_section.get_pal2_time()
-            QMetaObject.invokeMethod(
-                self.gen_manager,
-                "reset_generator",
-                Qt.ConnectionType.QueuedConnection,
-                Q_ARG(int, 2),
-                Q_ARG(int, target),
-                Q_ARG(int, 50),  # range_pct
-                Q_ARG(int, 1)    # precision_s
-            )
-            
-    def request_new_value(self, palanca_num):
-        """Solicita un nuevo valor de manera thread-safe"""
-        try:
-            QMetaObject.invokeMethod(
-                self.gen_manager,
-                "generate_next",
-                Qt.ConnectionType.QueuedConnection,
-                Q_ARG(int, palanca_num)
-            )
-        except RuntimeError as e:
-            print(f"Error al invocar generate_next: {e}")
-            # Puedes agregar aquí un fallback síncrono si es necesario
-            return self.gen_manager.get_value(palanca_num)
-            
     def setup_ui(self):
         """Configura la interfaz de usuario de la vista de inicio"""
         try:
@@ -474,9 +331,11 @@ class PanelControlView(BaseView):
             bot_layout.setContentsMargins(0, 0, 0, 0)
             bot_layout.setSpacing(5)
             
-            # Pasar el event_logger al IndicatorsSectionBox
+            # Estado de la sesión (contadores, latencia, RPM) y su vista
             # Usa self.event_logger que ahora está inicializado
-            self.info_group = IndicatorsSectionBox(event_logger=self.event_logger)
+            self.session_state = SessionState(self.event_logger)
+            self.info_group = IndicatorsSectionBox(event_logger=self.event_logger,
+                                                   state=self.session_state)
         
             self.plt_group = PlotGroupBox()
 
@@ -517,8 +376,12 @@ class PanelControlView(BaseView):
         # Conectar señales del serial manager
         self.serial_manager.ports_updated.connect(self._on_ports_updated)
         self.serial_manager.data_received.connect(self.receiver.on_data_received)
+        self.serial_manager.lines_received.connect(self.receiver.on_lines_received)
         
         self.serial_manager.connection_changed.connect(self.update_uart_status)
+        self.serial_manager.connection_changed.connect(self._on_connection_changed)
+        self.serial_manager.link_down.connect(self._on_link_down)
+        self.serial_manager.link_restored.connect(self._on_link_restored)
         self.serial_manager.data_sent.connect(self.handle_serial_dsent)
         self.serial_manager.error_occurred.connect(self._handle_error_uart)
     
@@ -555,6 +418,51 @@ class PanelControlView(BaseView):
             self.stop_program()
             self.uart_section.update_list_port(self.serial_manager.get_list_ports())
     
+    def _on_connection_changed(self, connected: bool, port_name: str = ""):
+        """Negocia el protocolo al abrir el puerto y vuelve a ASCII al cerrarlo"""
+        if connected:
+            self._negotiate_protocol()
+        else:
+            self.receiver.decoder.reset()
+            self.tx.clear()
+            self.tracer.discard_open()
+
+    def _on_link_down(self, port_name: str):
+        """Corte transitorio del puerto: la sesión sigue abierta mientras se reconecta"""
+        self.logger.warning(f"Enlace caído en {port_name}, reconectando...")
+        self.receiver.decoder.reset()
+        self.tx.clear()
+        self.tracer.discard_open()
+        self.uart_section.setTitle("Conexión UART: Reconectando...")
+        if self.event_logger.is_session_active():
+            self.event_logger.log_event(
+                EventType.SYSTEM_EVENT, DeviceID.SYSTEM, "LINK_DOWN",
+                metadata={"port": port_name}
+            )
+
+    def _on_link_restored(self, port_name: str, outage_s: float):
+        """Puerto recuperado: se renegocia el protocolo y se reenvía la configuración"""
+        self.logger.info(f"Enlace recuperado en {port_name} tras {outage_s:.3f} s")
+        self.uart_section.update_uart_status(True)
+        self._negotiate_protocol()
+        if self.event_logger.is_session_active():
+            self.event_logger.log_event(
+                EventType.SYSTEM_EVENT, DeviceID.SYSTEM, "LINK_UP",
+                metadata={"port": port_name, "outage_sec": round(outage_s, 3)}
+            )
+        if self.prog_section.get_runing_state():
+            self._send_led_config()
+            self._push_schedule_offload()
+
+    def _negotiate_protocol(self):
+        """Solicita el protocolo binario; si el firmware no responde se sigue en ASCII"""
+        if self.protocol_mode != ProtocolMode.BINARY:
+            return
+        if self.serial_manager.threaded:
+            self.serial_manager.request_binary_protocol()
+        else:
+            self.serial_manager.send_data_bytes(self.receiver.decoder.start_negotiation())
+
     def _toggle_uart(self):
         """Manejar clic en el botón de conexión"""
         if self.serial_manager.is_connected():
@@ -577,31 +485,36 @@ class PanelControlView(BaseView):
         
         
     def _send_current_config(self):
-        #------------------------------------#
+        led_01_tx, led_02_tx = self._send_led_config()
         
+        self._configure_schedules()
+        self.logger.info(f"Config Led-01: {led_01_tx}, Led-02: {led_02_tx}")
+
+    def _configure_schedules(self):
+        """Crea el programa de refuerzo de cada palanca con la configuración actual"""
+        self.schedules.configure(1, self.prog_section.get_pal1_mode(), self.prog_section.get_pal1_time())
+        self.schedules.configure(2, self.prog_section.get_pal2_mode(), self.prog_section.get_pal2_time())
+        self.schedules.start()
+
+    def _send_led_config(self):
+        """Envía el estado de los LEDs del programa actual (también al reconectar)"""
         # config led 01 mode
         led_01_tx = self.prog_section.get_led1_mode()
-        if led_01_tx == ModoLuz.APAGADO:
-            self.send_uart_cmd("LED1:OFF",50)
-        elif led_01_tx == ModoLuz.ENCENDIDO:
-            self.send_uart_cmd("LED1:ON",50)
+        if led_01_tx in (ModoLuz.APAGADO, ModoLuz.ENCENDIDO):
+            self.send_uart_cmd(protocol.led_command(1, led_01_tx == ModoLuz.ENCENDIDO))
         elif led_01_tx == ModoLuz.INTERMITENTE:
             l01_time = self.prog_section.get_led1_time()
             pass
         
         #config led 02 mode
         led_02_tx = self.prog_section.get_led2_mode()
-        if led_02_tx == ModoLuz.APAGADO:
-            self.send_uart_cmd("LED2:OFF",100)
-        elif led_02_tx == ModoLuz.ENCENDIDO:
-            self.send_uart_cmd("LED2:ON",100)
+        if led_02_tx in (ModoLuz.APAGADO, ModoLuz.ENCENDIDO):
+            self.send_uart_cmd(protocol.led_command(2, led_02_tx == ModoLuz.ENCENDIDO))
         elif led_02_tx == ModoLuz.INTERMITENTE:
             l02_time = self.prog_section.get_led2_time()
             pass
         
-        #config palanca 01 mode
-        self.reset_generators_config() 
-        self.logger.info(f"Config Led-01: {led_01_tx}, Led-02: {led_02_tx}")
+        return led_01_tx, led_02_tx
         
 
     def start_program(self):
@@ -613,10 +526,15 @@ class PanelControlView(BaseView):
 
         # Limpia todo antes de iniciar sesión
         self.info_group.reset_all()
+        self.tracer.reset()
 
         # Inicia la sesión
         #self.info_group.start_session(self.prog_section.get_program_config())
-        self.event_logger.start_session(self.prog_section.get_program_config())
+        config = self.prog_section.get_program_config()
+        config['seed'] = self.schedules.new_seed()   # secuencias VR/VI reproducibles
+        config['schedule_site'] = self.schedule_site.value
+        self._session_config = config
+        self.event_logger.start_session(config)
         
         self.elapsed = 0
         self.logger.info("Iniciando programa...")
@@ -640,18 +558,18 @@ class PanelControlView(BaseView):
         self.info_group.set_start_time(self.start_time)
         
         self.logger.info(f"Programa iniciado a las {self.start_time.toString('hh:mm:ss')}")
-        self.timer.start(1000)
+        self._start_tick()
         
         self.prog_section.btn_start.setEnabled(False)
         self.prog_section.btn_stop.setEnabled(True)
         self._send_current_config()
+        self._push_schedule_offload()
 
   
         if self.event_logger.is_session_active():
             sesion_id = self.event_logger.get_current_session_id()
             val_id_txt = f"{sesion_id:03d}"
-            # Aquí usamos setText directamente para no loguear nada
-            self.info_group.labels[IndicatorKey.SESSION_ID].setText(val_id_txt)
+            self.session_state.update_value(IndicatorKey.SESSION_ID, val_id_txt, log=False)
 
     
     def stop_program(self):
@@ -661,6 +579,9 @@ class PanelControlView(BaseView):
         
         
         self.prog_section.set_runing_state(False)
+        # Latencia de refuerzo para el reporte (antes de que set_end_time cierre la sesión)
+        if self.event_logger.is_session_active():
+            self.event_logger.set_session_metadata("reinforcement_latency", self.tracer.summary())
         self.end_time = QDateTime.currentDateTime()
         self.info_group.set_end_time(self.end_time)
         
@@ -670,22 +591,35 @@ class PanelControlView(BaseView):
             self.event_logger.end_session()
             
             
-        self.timer.stop()
+        self._stop_tick()
+        self.schedules.stop()
         self._update_timer_events(final=True)
         self.prog_section.update_uart_status(self.serial_manager.is_connected())
         
         if self.elapsed < 60:
-            val_in_rpm = self.info_group.get_val_response_rate()
-            val_cp1 = self.info_group.get_val_pal01_count()
-            val_cp2 = self.info_group.get_val_pal02_count()
-            value_end_RPM = (val_cp1 + val_cp2) - val_in_rpm
-            self.info_group.update_value(IndicatorKey.RESPONSE_RATE_VAL, int(value_end_RPM))
+            self.session_state.update_value(IndicatorKey.RESPONSE_RATE_VAL,
+                                            self.session_state.responses_per_minute(self.elapsed))
         
-        self.send_uart_cmd("LED1:OFF", 0)
-        self.send_uart_cmd("LED2:OFF", 20)
+        self.offload.stop()
+        self.send_uart_cmd(protocol.led_command(1, False))
+        self.send_uart_cmd(protocol.led_command(2, False))
 
        
 
+    def _start_tick(self):
+        if self._shared_tick:
+            self._ticking = True
+        else:
+            self.timer.start(1000)
+
+    def _stop_tick(self):
+        self._ticking = False
+        self.timer.stop()
+
+    def _on_shared_tick(self):
+        if self._ticking:
+            self._update_timer_events()
+
     def _update_timer_events(self, final=False):
         """Actualiza eventos basados en tiempo cada segundo"""
         if self.start_time:
@@ -694,30 +628,25 @@ class PanelControlView(BaseView):
             self.info_group.set_run_time(seconds_to_hhmmss(self.elapsed))
             
             
+            if self.tracer.count:
+                self.session_state.update_value(IndicatorKey.REINFORCE_LATENCY, self.tracer.readout())
+
             if self.elapsed % 60==0:
-                val_in_rpm = self.info_group.get_val_response_rate()
-                val_cp1 = self.info_group.get_val_pal01_count()
-                val_cp2 = self.info_group.get_val_pal02_count()
-                
-                value_end_RPM = (val_cp1 + val_cp2) - val_in_rpm
-                self.info_group.update_value(IndicatorKey.RESPONSE_RATE_VAL, int(value_end_RPM))
+                # Respuestas del minuto que acaba de cerrar (bins del estado)
+                self.session_state.update_value(IndicatorKey.RESPONSE_RATE_VAL,
+                                                self.session_state.responses_per_minute(self.elapsed))
                  
-            # #--------------------------------------------------------
-            mode_pal1 = self.prog_section.get_pal1_mode()
-            mode_pal2 = self.prog_section.get_pal2_mode()
-            
-            if mode_pal1 in [ModoPalanca.FI, ModoPalanca.VI]:
-                self.check_palanca_num(1)
-                    
-            if mode_pal2 in [ModoPalanca.FI, ModoPalanca.VI]:
-                self.check_palanca_num(2)
             
     
-    def send_uart_cmd(self, command: str, delay_ms: int = 50):
-        """Envía un comando con un delay mínimo"""
+    def send_uart_cmd(self, command: str, priority: TxPriority = None):
+        """Encola un comando en el planificador TX (sin bloquear)"""
         if not self.serial_manager or not self.serial_manager.is_connected():
             return
-        QTimer.singleShot(delay_ms, lambda: self.serial_manager.send_data_str(command))
+
+        coalesce_key = None
+        if priority is None:
+            priority, coalesce_key = protocol.tx_route(command)
+        self.tx.submit(command, priority, coalesce_key=coalesce_key)
 
         
     
@@ -732,188 +661,76 @@ class PanelControlView(BaseView):
         if not self.prog_section.get_runing_state():
             self.logger.warning("Program not runing, ignore all data")
             return
-        # Procesar datos en un hilo separado
-        palabras = data_tx.split()
-        
-        # Procesar cada palabra
-        for palabra in palabras:
-            
-            if 'DISP:' in palabra:
-                try:
-                    _, value = palabra.split(':', 1)
-                    value = value.strip()
-                    if value.isdigit():
-                        self.engine._handle_disp_food(value)
-                except Exception as e:
-                    self.logger.error(f"Error procesando DISP: {str(e)}")
+        # Un write puede llevar varios comandos; solo las dispensas cuentan
+        for command in data_tx.splitlines():
+            spec, value = protocol.decode_command(command)
+            if spec is not None and spec.name == "dispense":
+                self.engine._handle_disp_food(value)
   
     
-    def check_palanca_num(self, num: int):
-        # Solicitar generación de nuevo valor
-        
-        if num not in [1,2]:
+    def check_palanca_num(self, num: int, t_arrival_ns: int = None):
+        """Respuesta en la palanca `num`: la grafica y la evalúa con su programa de refuerzo"""
+        if not self.prog_section.get_runing_state():
             return
-        
-        # Obtener el último valor disponible (puede ser el anterior hasta que se actualice)
-        if num==1:
-            self.actions_palanca_01()
-        else:
-            self.actions_palanca_02()
-                    
-    def actions_palanca_01(self):
-        
-        if self.prog_section.get_runing_state() is False:
+
+        if self.offload.active:
+            # Decide el firmware: solo se grafica (el refuerzo llega como R0n)
+            count = self.session_state.lever_01 if num == 1 else self.session_state.lever_02
+            self._plot_response(num, count)
             return
-        
-        mode_fun  =  self.prog_section.get_pal1_mode()
-        last_event = self.info_group.get_last_p01_event()
-        
-        last_count_val = self.info_group.get_val_pal01_count()
-        last_point = self.plt_group.graph_left.get_last_point(self.name_plt_lf_l1)
-
-        if last_point is None or last_count_val != last_point[1]:
-            if last_event and mode_fun in [
-                ModoPalanca.CRF,
-                ModoPalanca.FI,
-                ModoPalanca.FR,
-                ModoPalanca.VI,
-                ModoPalanca.VR
-            ]:
-                self.plt_group.graph_left.add_data_point(
-                    self.name_plt_lf_l1,
-                    self.elapsed,
-                    last_count_val
-                )
-                self.logger.info(f"PLOT NEW DATA P1: {self.elapsed},{last_count_val}")
-                
-                val_latency = self.info_group.get_val_latency()
-                if val_latency<=0:
-                    now = QDateTime.currentDateTime()
-                    pas_time_ms = self.start_time.msecsTo(now)
-                    past_time_sec_txt = f"{pas_time_ms/1000:.2f}" 
-                    self.info_group.update_value(IndicatorKey.LATENCY_VAL, past_time_sec_txt)
-                    
-                
-        match mode_fun:
-            case ModoPalanca.CRF:
-                if last_event:
-                    self.send_uart_cmd(f"DISP:1", 10)
-                    self.info_group.set_last_p01_event(False)
-            
-            case ModoPalanca.FI:
-                interval = self.prog_section.get_pal1_time()
-                count_val = self.elapsed
-                if last_event and ( count_val % interval == 0) and count_val != 0:
-                    self.send_uart_cmd("DISP:1", 10)
-                    self.info_group.set_last_p01_event(False)
-            
-            case ModoPalanca.FR:
-                interval = self.prog_section.get_pal1_time()
-                count_val = self.info_group.get_val_pal01_count()
-                if last_event and (count_val % interval == 0) and count_val != 0:
-                    self.send_uart_cmd("DISP:1", 10)
-                    self.info_group.set_last_p01_event(False)
-            
-            case ModoPalanca.VI:
-                interval = self.gen_manager.get_value(1) 
-                count_val = self.elapsed
-                           
-                if count_val > interval:
-                    self.gen_manager.generate_next(1)
-                else:
-                    if last_event and (count_val % interval == 0) and count_val != 0:
-                        self.send_uart_cmd("DISP:1", 10)
-                        self.info_group.set_last_p01_event(False)
-                        
-            case ModoPalanca.VR:
-                interval = self.gen_manager.get_value(1) 
-                count_val = self.info_group.get_val_pal01_count()
-                            
-                if count_val > interval:
-                    self.gen_manager.generate_next(1)
-                else:
-                    if last_event and (count_val % interval == 0) and count_val != 0:
-                        self.send_uart_cmd("DISP:1", 10)
-                        self.info_group.set_last_p01_event(False)
-                        
-            case _:
-                self.logger.warning(f"Mode not found {mode_fun} -> state:{last_event}")  
-                
-    def actions_palanca_02(self):
-        if self.prog_section.get_runing_state() is False:
+
+        schedule = self.schedules.get(num)
+        if schedule is None:
             return
-        
-        mode_fun  =  self.prog_section.get_pal2_mode()
-        last_event = self.info_group.get_last_p02_event()
-        
-        last_count_val = self.info_group.get_val_pal02_count()
-        last_point = self.plt_group.graph_right.get_last_point(self.name_plt_rh_l1)
-
-        if last_point is None or last_count_val != last_point[1]:
-            if last_event and mode_fun in [
-                ModoPalanca.CRF,
-                ModoPalanca.FI,
-                ModoPalanca.FR,
-                ModoPalanca.VI,
-                ModoPalanca.VR
-            ]:
-                self.plt_group.graph_right.add_data_point(
-                    self.name_plt_rh_l1,
-                    self.elapsed,
-                    last_count_val
-                )
-                self.logger.info(f"PLOT NEW DATA P2: {self.elapsed},{last_count_val}")
-                
-                val_latency = self.info_group.get_val_latency()
-                if val_latency<=0:
-                    now = QDateTime.currentDateTime()
-                    pas_time_ms = self.start_time.msecsTo(now)
-                    self.info_group.update_value(IndicatorKey.LATENCY_VAL, pas_time_ms)
-                
-        
-        match mode_fun:
-            case ModoPalanca.CRF:
-                if last_event:
-                    self.send_uart_cmd(f"DISP:1", 10)
-                    self.info_group.set_last_p02_event(False)
-            
-            case ModoPalanca.FI:
-                interval = self.prog_section.get_pal2_time()
-                count_val = self.elapsed
-                
-                if last_event and ( count_val % interval == 0) and count_val != 0:
-                    self.send_uart_cmd("DISP:1", 10)
-                    self.info_group.set_last_p02_event(False)
-            
-            case ModoPalanca.FR:
-                interval = self.prog_section.get_pal2_time()
-                count_val = self.info_group.get_val_pal02_count()
-                if last_event and (count_val % interval == 0) and count_val != 0:
-                    self.send_uart_cmd("DISP:1", 10)
-                    self.info_group.set_last_p02_event(False)
-            
-            case ModoPalanca.VI:
-                interval = self.gen_manager.get_value(2) 
-                count_val = self.elapsed
-                           
-                if count_val > interval:
-                    self.gen_manager.generate_next(2)
-                else:
-                    if last_event and (count_val % interval == 0) and count_val != 0:
-                        self.send_uart_cmd("DISP:1", 10)
-                        self.info_group.set_last_p02_event(False)
-                        
-            case ModoPalanca.VR:
-                interval = self.gen_manager.get_value(2) 
-                count_val = self.info_group.get_val_pal02_count()
-                            
-                if count_val > interval:
-                    self.gen_manager.generate_next(2)
-                else:
-                    if last_event and (count_val % interval == 0) and count_val != 0:
-                        self.send_uart_cmd("DISP:1", 10)
-                        self.info_group.set_last_p02_event(False)    
-            case _:
-                self.logger.warning(f"Mode not found {mode_fun} -> state:{last_event}")         
+
+        if schedule.on_response(t_arrival_ns=t_arrival_ns):
+            self.tracer.begin(num, t_arrival_ns, self.engine.t_dispatch_ns)
+            self._reinforce(num)
+        self._plot_response(num, schedule.responses)
+
+    def _on_interval_available(self, num: int, deadline: float):
+        """El intervalo FI/VI de la palanca `num` se cumplió: la próxima respuesta se refuerza"""
+        self.logger.debug(f"Intervalo P{num} disponible (retraso "
+                          f"{(self.schedules.clock() - deadline) * 1000:.2f} ms)")
+
+    def _push_schedule_offload(self):
+        """Envía el programa compilado al firmware; si no lo confirma, decide el host"""
+        if self.schedule_site != ScheduleSite.DEVICE or self._session_config is None:
+            return
+        self.offload.push(self._session_config, self.schedules.seed)
+        QTimer.singleShot(int(self.offload.ack_timeout_s * 1000), self.offload.check_timeout)
+
+    def _on_command_sent(self, command: str, latency_us: int, retry: int):
+        if command == self._dispense_cmd and retry == 0:
+            self.tracer.written()
+
+    def _on_device_reply(self, line: str) -> bool:
+        return self.offload.on_device_line(line) or self.tx.on_device_reply(line)
+
+    def _on_device_reinforcement(self, num: int):
+        """Refuerzo entregado por el firmware (R01/R02)"""
+        self.logger.debug(f"Refuerzo P{num} decidido por el firmware")
+        if num == 1:
+            self.session_state.set_last_p01_event(False)
+        else:
+            self.session_state.set_last_p02_event(False)
+
+    def _reinforce(self, num: int):
+        self.tracer.enqueued()
+        self.send_uart_cmd(self._dispense_cmd)
+        if not self.serial_manager.is_connected():
+            self.tracer.discard_open()
+        if num == 1:
+            self.session_state.set_last_p01_event(False)
+        else:
+            self.session_state.set_last_p02_event(False)
+
+    def _plot_response(self, num: int, count: int):
+        if num == 1:
+            graph, name = self.plt_group.graph_left, self.name_plt_lf_l1
+        else:
+            graph, name = self.plt_group.graph_right, self.name_plt_rh_l1
+        graph.add_data_point(name, self.elapsed, count)
+        self.logger.info(f"PLOT NEW DATA P{num}: {self.elapsed},{count}")
           
     
\ No newline at end of file
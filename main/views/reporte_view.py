@@ -41,10 +41,10 @@ from main.components.pdf_builder import PDFBuilder  # La clase que te proporcion
 from PyQt6.QtCore import QTimer
 import pandas as pd
 from typing import List, Dict, Optional
-import numpy as np
 
 from main.views.sections.plot_dinamic import DynamicMultiPlot
 from main.core.event_logger import EventType, EventLogger, DeviceID
+from main.core.latency_trace import histogram_lines
 
 
 
@@ -234,6 +234,11 @@ class ReporteView(BaseView):
             f"Palanca 02: {len(session_data.get('lever2_presses', []))} activaciones",
             f"Recompensas: {len(session_data.get('reward_times', []))} entregas"
         ]
+
+        # Latencia presión -> DISP:1 registrada por el LatencyTracer de la sesión
+        latency = session_data.get("metadata", {}).get("reinforcement_latency")
+        if latency is not None:
+            log_lines += ["--- Latencia de refuerzo ---", *histogram_lines(latency)]
         
         self.log_section.update_logs("\n".join(log_lines))
 
@@ -203,24 +203,43 @@
 #         self.last_p02_event = state
 
 from PyQt6.QtWidgets import QGroupBox, QFormLayout, QLabel
-from PyQt6.QtCore import Qt, QDateTime
+from PyQt6.QtCore import Qt, QDateTime, QTimer
 from main.styles.styles import AppStyles
 from main.enums.indicators_enum import IndicatorKey
-from main.core.event_logger import EventLogger, EventType, DeviceID
+from main.core.event_logger import EventLogger
+from main.core.session_state import SessionState
+from main.components.led_indicator import LedIndicator
 
 class IndicatorsSectionBox(QGroupBox):
-    def __init__(self, event_logger: EventLogger):
+    """
+    Vista de un SessionState: las escrituras van al estado y solo marcan el
+    indicador como sucio. Un tick fijo de REFRESH_MS (~30 Hz) pinta el
+    último valor de cada indicador sucio, una vez por cuadro, y se detiene
+    cuando no hay cambios. Con `set_refresh_paused(True)` (pestaña oculta)
+    solo se acumulan los sucios y se pintan al reanudar. Los getters leen el
+    estado, nunca las etiquetas.
+    """
+    REFRESH_MS = 33
+    _LED_KEYS = (IndicatorKey.LED_01_STATE, IndicatorKey.LED_02_STATE)
+
+    def __init__(self, event_logger: EventLogger, state: SessionState = None):
         super().__init__("Indicadores de Sesión")
         
         # Usamos composición en lugar de herencia
         self.event_logger = event_logger # if event_logger is not None else EventLogger()
+        self.state = state if state is not None else SessionState(event_logger)
         
         self.setStyleSheet(AppStyles.groupbox_style("#e67e22"))
         self.labels = {}
         self._init_ui()
-        
-        self.last_p01_event = False
-        self.last_p02_event = False
+
+        self._dirty = set()
+        self._paused = False
+        self._rendered = {key: label.text() for key, label in self.labels.items()}
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setInterval(self.REFRESH_MS)
+        self._refresh_timer.timeout.connect(self._refresh)
+        self.state.on_change = self.mark_dirty
 
     def _init_ui(self):
         form_layout = QFormLayout()
@@ -235,6 +254,7 @@ class IndicatorsSectionBox(QGroupBox):
             IndicatorKey.END_TIME: "--:--:--",
             IndicatorKey.RUN_TIME: "00:00:00",
             IndicatorKey.LATENCY_VAL: "0",
+            IndicatorKey.REINFORCE_LATENCY: "--",
             IndicatorKey.RESPONSE_RATE_VAL: "0",
             IndicatorKey.LEVER_01_COUNT: "0",
             IndicatorKey.LEVER_02_COUNT: "0",
@@ -254,73 +274,62 @@ class IndicatorsSectionBox(QGroupBox):
         label.setStyleSheet(AppStyles.LABEL_KEY_STYLE)
         label.setMinimumWidth(100)
 
-        value_label = QLabel(default)
-        value_label.setAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
-        value_label.setMinimumWidth(200)
-
-        if key in [IndicatorKey.LED_01_STATE, IndicatorKey.LED_02_STATE]:
-            style = AppStyles.LABEL_LED_ON_STYLE if default == "ON" else AppStyles.LABEL_LED_OFF_STYLE
-            value_label.setStyleSheet(style)
+        if key in self._LED_KEYS:
+            value_label = LedIndicator(default == "ON")
         else:
+            value_label = QLabel(default)
             value_label.setStyleSheet(AppStyles.LABEL_VALUE_STYLE)
+        value_label.setAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+        value_label.setMinimumWidth(200)
 
         layout.addRow(label, value_label)
         self.labels[key] = value_label
-    
-    def update_value(self, key: IndicatorKey, new_value=None, increment: bool = False, log: bool = True):
-        if key not in self.labels:
-            return
 
-        if increment and key in [IndicatorKey.LEVER_01_COUNT,
-                                IndicatorKey.LEVER_02_COUNT,
-                                IndicatorKey.DISPENSA_COUNT,
-                                IndicatorKey.RECONPENSA_COUNT]:
-            try:
-                current = int(self.labels[key].text())
-                new_value = current + 1
-            except ValueError:
-                new_value = 1
-
-        if key in [IndicatorKey.LED_01_STATE, IndicatorKey.LED_02_STATE]:
-            event_value = int(new_value)
-            display_value = "ON" if event_value == 1 else "OFF"
-            self.labels[key].setText(display_value)
-
-            style = AppStyles.LABEL_LED_ON_STYLE if event_value == 1 else AppStyles.LABEL_LED_OFF_STYLE
-            self.labels[key].setStyleSheet(style)
-
-            if log:
-                device = DeviceID.LED_01 if key == IndicatorKey.LED_01_STATE else DeviceID.LED_02
-                self.event_logger.log_event(EventType.LED_CHANGE, device, event_value)
-
-        elif key == IndicatorKey.LEVER_01_COUNT:
-            self.labels[key].setText(str(new_value))
-            if log:
-                self.event_logger.log_event(EventType.LEVER_PRESS, DeviceID.LEVER_01, new_value)
-            self.last_p01_event = bool(new_value)
-
-        elif key == IndicatorKey.LEVER_02_COUNT:
-            self.labels[key].setText(str(new_value))
-            if log:
-                self.event_logger.log_event(EventType.LEVER_PRESS, DeviceID.LEVER_02, new_value)
-            self.last_p02_event = bool(new_value)
-
-        elif key == IndicatorKey.DISPENSA_COUNT:
-            self.labels[key].setText(str(new_value))
-            if log:
-                self.event_logger.log_event(EventType.FOOD_DISPENSE, DeviceID.DISPENSADOR, new_value)
-
-        elif key == IndicatorKey.RECONPENSA_COUNT:
-            self.labels[key].setText(str(new_value))
-            if log:
-                self.event_logger.log_event(EventType.FOOD_RECOMPENSE, DeviceID.RECOMPENSA, new_value)
-
-        else:
-            self.labels[key].setText(str(new_value))
+    # ----------------------------
+    # Refresco de la vista
+    # ----------------------------
+    def mark_dirty(self, key: IndicatorKey):
+        self._dirty.add(key)
+        if not self._paused and not self._refresh_timer.isActive():
+            self._refresh_timer.start()
+
+    def set_refresh_paused(self, paused: bool):
+        self._paused = paused
+        if paused:
+            self._refresh_timer.stop()
+        elif self._dirty:
+            self._refresh()
+            self._refresh_timer.start()
+
+    def _refresh(self):
+        if not self._dirty:
+            self._refresh_timer.stop()   # sin cambios en un cuadro: el tick se duerme
+            return
+        dirty, self._dirty = self._dirty, set()
+        for key in dirty:
+            label = self.labels.get(key)
+            if label is None:
+                continue
+            text = self.state.display(key)
+            if text == self._rendered.get(key):
+                continue
+            self._rendered[key] = text
+            if key in self._LED_KEYS:
+                label.set_on(text == "ON")
+            else:
+                label.setText(text)
+
+    # ----------------------------
+    # Escritura (delegada al estado)
+    # ----------------------------
+    def update_value(self, key: IndicatorKey, new_value=None, increment: bool = False, log: bool = True,
+                     t_arrival_ns: int = None):
+        self.state.update_value(key, new_value, increment, log, t_arrival_ns)
 
     def set_start_time(self, dt: QDateTime):
         if not self.event_logger.is_session_active():
             self.event_logger.start_session()
+        self.state.start()
         self.update_value(IndicatorKey.START_TIME, dt.toString("dd/MM/yyyy HH:mm:ss"))
 
     def set_end_time(self, dt: QDateTime):
@@ -334,49 +343,39 @@ class IndicatorsSectionBox(QGroupBox):
     def reset_all(self):
         if self.event_logger.is_session_active():
             self.event_logger.end_session()
+        self.state.reset_all()
 
-        for key in self.labels:
-            default = (
-                "0" if ("COUNT" in key.name or "VAL" in key.name or "LED" in key.name)
-                else "N/A" if key == IndicatorKey.SESSION_ID
-                else "--:--:--"
-            )
-            self.update_value(key, default, log=False)
-
-        self.last_p01_event = False
-        self.last_p02_event = False
-
-    # Métodos de acceso (getters)
+    # Métodos de acceso (getters): leen el estado
     def get_val_pal01_count(self):
-        return int(self.labels[IndicatorKey.LEVER_01_COUNT].text())
+        return self.state.get_val_pal01_count()
     
     def get_val_pal02_count(self):
-        return int(self.labels[IndicatorKey.LEVER_02_COUNT].text())
+        return self.state.get_val_pal02_count()
     
     def get_val_food_count(self):
-        return int(self.labels[IndicatorKey.RECONPENSA_COUNT].text())
+        return self.state.get_val_food_count()
     
     def get_val_latency(self):
-        return float(self.labels[IndicatorKey.LATENCY_VAL].text())
+        return self.state.get_val_latency()
     
     def get_val_response_rate(self):
-        return float(self.labels[IndicatorKey.RESPONSE_RATE_VAL].text())
+        return self.state.get_val_response_rate()
     
     def get_val_led01_state(self):
-        return self.labels[IndicatorKey.LED_01_STATE].text()    
+        return self.state.get_val_led01_state()
     
     def get_val_led02_state(self):
-        return self.labels[IndicatorKey.LED_02_STATE].text()
+        return self.state.get_val_led02_state()
     
     # Métodos para eventos de palanca
     def get_last_p01_event(self):
-        return self.last_p01_event
+        return self.state.get_last_p01_event()
     
     def set_last_p01_event(self, state: bool):
-        self.last_p01_event = state
+        self.state.set_last_p01_event(state)
     
     def get_last_p02_event(self):
-        return self.last_p02_event
+        return self.state.get_last_p02_event()
     
     def set_last_p02_event(self, state: bool):
-        self.last_p02_event = state
\ No newline at end of file
+        self.state.set_last_p02_event(state)
@@ -38,3 +38,7 @@ class LogsSection(QGroupBox):
         layout.setStretch(1, 1)  # bot_container
         
         self.setLayout(layout)
+
+    def update_logs(self, text: str):
+        """Texto del reporte de la sesión (resumen, latencias); el usuario puede agregar sus observaciones"""
+        self.logs_area.setPlainText(text)
@@ -1,21 +1,23 @@
-from PyQt6.QtCore import QTimer, QObject, pyqtSignal
+from PyQt6.QtCore import QObject, pyqtSignal
 
 from main.core.serial_model import SerialPortModel
+from main.core.port_discovery import PortDiscovery
 
 class SerialMonitor(QObject):
     ports_updated = pyqtSignal(list)
     status_changed = pyqtSignal(bool)
 
-    def __init__(self, serial_model:SerialPortModel, interval_ms=2000):
+    def __init__(self, serial_model:SerialPortModel, discovery: PortDiscovery = None):
         super().__init__()
         self.serial_model = serial_model
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.scan_ports)
-        self.timer.start(interval_ms)
-        self.last_ports = []
+        self.discovery = discovery or PortDiscovery.instance()
+        self.discovery.ports_changed.connect(self._on_ports_changed)
+        self.last_ports = self.discovery.get_port_names()
 
     def scan_ports(self):
-        ports = self.serial_model.get_port_names()
+        self.discovery.refresh()
+
+    def _on_ports_changed(self, ports):
         if ports != self.last_ports:
             self.last_ports = ports
             self.ports_updated.emit(ports)